@@ -0,0 +1,65 @@
+# coding: utf-8
+"""
+Compares :meth:`jsl.Document.validate_many` to validating records one by one.
+
+Usage::
+
+    $ python benchmarks/batch_validation.py [--records 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl import validation
+
+
+class Event(jsl.Document):
+    user_id = jsl.IntField(minimum=0, required=True)
+    amount = jsl.NumberField(minimum=0, maximum=10000, multiple_of=0.01)
+    quantity = jsl.IntField(minimum=1, maximum=1000)
+    score = jsl.NumberField(minimum=0, maximum=1, exclusive_maximum=True)
+    name = jsl.StringField(min_length=1, max_length=64, required=True)
+    country = jsl.StringField(min_length=2, max_length=2)
+    tags = jsl.ArrayField(jsl.StringField(), max_items=5)
+
+
+def make_records(n, seed=0):
+    rng = random.Random(seed)
+    return [{
+        'user_id': rng.randint(-1, 10 ** 6),
+        'amount': round(rng.uniform(0, 10001), 2),
+        'quantity': rng.randint(0, 1000),
+        'score': rng.random(),
+        'name': 'x' * rng.randint(0, 70),
+        'country': rng.choice(['US', 'DE', 'USA']),
+        'tags': ['a'] * rng.randint(0, 6),
+    } for _ in range(n)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks batch validation.')
+    parser.add_argument('--records', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    records = make_records(args.records)
+    validator = Event.get_validator()
+
+    cases = [
+        ('one by one', lambda: [validator.is_valid(record) for record in records]),
+        ('validate_many', lambda: Event.validate_many(records)),
+    ]
+    if validation.numpy is None:
+        print('NumPy is not installed, validate_many checks records one by one')
+    for name, function in cases:
+        elapsed = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        print('{0:<20} {1:>10.0f} records/s'.format(name, len(records) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+# coding: utf-8
+"""
+The schema generation benchmarks for pytest-benchmark::
+
+    $ pytest benchmarks/bench_generation.py --benchmark-json=results.json
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shapes import get_cases
+
+
+pytest.importorskip('pytest_benchmark')
+
+CASES = get_cases()
+
+
+@pytest.mark.parametrize('name,function', CASES, ids=[name for name, _ in CASES])
+def test_generation(benchmark, name, function):
+    benchmark(function)
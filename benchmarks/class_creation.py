@@ -0,0 +1,76 @@
+# coding: utf-8
+"""
+Measures the cost of creating :class:`jsl.Document` subclasses
+of different shapes through :class:`jsl.document.DocumentMeta`.
+
+Usage::
+
+    $ python benchmarks/class_creation.py [number of documents per shape]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl import registry
+
+
+class BaseOptions(object):
+    title = 'Base'
+    additional_properties = True
+
+
+def flat(i, n_fields=10):
+    attrs = dict(('field_{0}'.format(j), jsl.StringField(max_length=j)) for j in range(n_fields))
+    return type('Flat{0}'.format(i), (jsl.Document,), attrs)
+
+
+def wide(i):
+    return flat(i, n_fields=100)
+
+
+def nested(i):
+    attrs = {
+        'name': jsl.StringField(required=True),
+        'tags': jsl.ArrayField(jsl.StringField(), unique_items=True),
+        'meta': jsl.DictField(properties={
+            'created_at': jsl.DateTimeField(),
+            'children': jsl.ArrayField(jsl.DocumentField('self')),
+            'parent': jsl.OneOfField([jsl.DocumentField('self'), jsl.IntField()]),
+        }),
+    }
+    return type('Nested{0}'.format(i), (jsl.Document,), attrs)
+
+
+def with_options(i):
+    class Options(BaseOptions):
+        description = 'Document #{0}'.format(i)
+        definition_id = 'with_options_{0}'.format(i)
+    attrs = {'Options': Options, 'id': jsl.IntField(required=True)}
+    return type('WithOptions{0}'.format(i), (jsl.Document,), attrs)
+
+
+def inherited(i, _cache={}):
+    if 'parent' not in _cache:
+        _cache['parent'] = with_options('Parent')
+    attrs = {'name': jsl.StringField(), 'child': jsl.DocumentField('self')}
+    return type('Inherited{0}'.format(i), (_cache['parent'],), attrs)
+
+
+SHAPES = [flat, wide, nested, with_options, inherited]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print('{0:<14} {1:>14}'.format('shape', 'us per class'))
+    for shape in SHAPES:
+        counter = iter(range(n))
+        seconds = timeit.timeit(lambda: shape(next(counter)), number=n)
+        print('{0:<14} {1:>14.1f}'.format(shape.__name__, seconds / n * 1e6))
+        registry.clear()
+
+
+if __name__ == '__main__':
+    main()
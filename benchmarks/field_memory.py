@@ -0,0 +1,75 @@
+# coding: utf-8
+"""
+Reports the memory taken by a single field instance and compares it
+with the same attributes stored in an instance ``__dict__``
+(the layout fields had before they declared ``__slots__``).
+
+Usage::
+
+    $ python benchmarks/field_memory.py [number of instances]
+"""
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from jsl import fields
+from jsl.roles import Var
+from jsl.scope import ResolutionScope
+
+
+class DictLayout(object):
+    """An object holding the same attributes in a ``__dict__``."""
+
+    def __init__(self, obj):
+        for cls in type(obj).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                setattr(self, name, getattr(obj, name))
+
+
+FACTORIES = [
+    ('StringField', lambda: fields.StringField(min_length=1, max_length=10)),
+    ('IntField', lambda: fields.IntField(minimum=0, maximum=10)),
+    ('BooleanField', lambda: fields.BooleanField(required=True)),
+    ('ArrayField', lambda: fields.ArrayField(None, min_items=1)),
+    ('DictField', lambda: fields.DictField(properties={})),
+    ('OneOfField', lambda: fields.OneOfField([])),
+    ('DocumentField', lambda: fields.DocumentField('self')),
+    ('Var', lambda: Var({'role': 1})),
+    ('ResolutionScope', lambda: ResolutionScope(base='http://example.com/')),
+]
+
+
+def bytes_per_instance(create, n):
+    """Returns the average number of bytes allocated by ``create()``,
+    not counting the attribute values, which are shared by all the instances.
+    """
+    instances = [None] * n
+    gc.collect()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    for i in range(n):
+        instances[i] = create()
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename'))
+    del instances
+    return float(size) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print('{0:<16} {1:>10} {2:>10} {3:>8}'.format('class', '__slots__', '__dict__', 'saved'))
+    for name, factory in FACTORIES:
+        prototype = factory()
+        slotted = bytes_per_instance(lambda: copy.copy(prototype), n)
+        with_dict = bytes_per_instance(lambda: DictLayout(prototype), n)
+        print('{0:<16} {1:>10.1f} {2:>10.1f} {3:>7.0f}%'.format(
+            name, slotted, with_dict, 100 * (1 - slotted / with_dict)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# coding: utf-8
+"""
+Measures how much private memory a forked worker allocates when it serves
+the schemas of all the registered documents, with and without
+:func:`jsl.warmup` in the master process. Linux only.
+
+Usage::
+
+    $ python benchmarks/fork_warmup.py [number of documents]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl import registry
+
+
+def private_dirty_kb():
+    total = 0
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                total += int(line.split()[1])
+    return total
+
+
+def create_documents(n):
+    documents = []
+    for i in range(n):
+        attrs = dict(
+            ('field_{0}'.format(j), jsl.StringField(enum=['a', 'b', 'c'], max_length=j))
+            for j in range(20)
+        )
+        attrs['nested'] = jsl.DocumentField(documents[-1] if documents else 'self')
+        documents.append(type('Document{0}'.format(i), (jsl.Document,), attrs))
+    return documents
+
+
+def measure_worker():
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        before = private_dirty_kb()
+        for document_cls in registry.iter_documents():
+            document_cls.get_cached_schema()
+        after = private_dirty_kb()
+        os.write(write_fd, str(after - before).encode('ascii'))
+        os._exit(0)
+    os.close(write_fd)
+    growth = int(os.read(read_fd, 64).decode('ascii'))
+    os.waitpid(pid, 0)
+    return growth
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    documents = create_documents(n)
+    print('documents: {0}'.format(len(documents)))
+    print('worker private memory growth without warmup: {0} kB'.format(measure_worker()))
+    jsl.warmup(freeze_gc=True)
+    print('worker private memory growth after warmup: {0} kB'.format(measure_worker()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# coding: utf-8
+"""
+Compares the format checkers of :mod:`jsl.formats` to implementations based on
+regular expressions (for IPv4, which jsl checks by a regular expression, to splitting
+the address into integers) and to the checkers of jsonschema, if it's installed.
+
+Usage::
+
+    $ python benchmarks/format_checkers.py [--number 200000]
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from jsl import formats
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+
+_DATE_TIME_REGEX = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})[Tt](\d{2}):(\d{2}):(\d{2})(\.\d+)?([Zz]|[+-]\d{2}:\d{2})\Z')
+_EMAIL_REGEX = re.compile(r'^[^@\s]+@[^@\s.]+(\.[^@\s.]+)*\Z')
+_URI_REGEX = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:([A-Za-z0-9\-._~:/?#\[\]@!$&'()*+,;=]|%[0-9A-Fa-f]{2})*\Z")
+
+
+def is_ipv4_split(instance):
+    parts = instance.split('.')
+    return len(parts) == 4 and all(
+        part.isdigit() and len(part) <= 3 and int(part) <= 255 and (part == '0' or part[0] != '0')
+        for part in parts)
+
+
+def is_date_time_regex(instance):
+    match = _DATE_TIME_REGEX.match(instance)
+    if match is None:
+        return False
+    try:
+        datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return False
+    return int(match.group(4)) <= 23 and int(match.group(5)) <= 59 and int(match.group(6)) <= 60
+
+
+CASES = [
+    # format, instances, the jsl checker, an alternative checker
+    ('ipv4', ['192.168.0.1', '10.0.0.255', '256.0.0.1', '1.2.3'],
+     formats.is_ipv4, is_ipv4_split),
+    ('date-time', ['2015-01-01T12:30:00Z', '1996-12-19T16:39:57.123-08:00', '2015-02-30T00:00:00Z', '2015-01-01'],
+     formats.is_date_time, is_date_time_regex),
+    ('email', ['john@example.com', 'john.smith@mail.example.org', 'john@', 'john'],
+     formats.is_email, lambda instance: _EMAIL_REGEX.match(instance) is not None),
+    ('uri', ['http://example.com/path?query=1#fragment', 'urn:isbn:0451450523', 'example.com', 'http://a/%7'],
+     formats.is_uri, lambda instance: _URI_REGEX.match(instance) is not None),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks format checkers.')
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    reference_checker = jsonschema.FormatChecker() if jsonschema is not None else None
+    for format, instances, checker, regex_checker in CASES:
+        implementations = [('jsl', checker), ('split' if format == 'ipv4' else 'regex', regex_checker)]
+        if reference_checker is not None and format in reference_checker.checkers:
+            implementations.append(('jsonschema', lambda instance: reference_checker.conforms(instance, format)))
+        for name, function in implementations:
+            elapsed = timeit.timeit(lambda: [function(instance) for instance in instances], number=args.number)
+            print('{0:<10} {1:<12} {2:>12.0f} checks/s'.format(
+                format, name, args.number * len(instances) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# coding: utf-8
+"""
+Measures how :func:`jsl.parallel.iter_file_errors` scales with the number of processes.
+
+Usage::
+
+    $ python benchmarks/parallel_validation.py [--lines 500000] [--max-processes 8]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl import parallel, streaming
+
+
+class Event(jsl.Document):
+    user_id = jsl.IntField(minimum=0, required=True)
+    amount = jsl.NumberField(minimum=0, maximum=10000)
+    name = jsl.StringField(min_length=1, max_length=64, required=True)
+    country = jsl.StringField(enum=['US', 'DE', 'FR'])
+    tags = jsl.ArrayField(jsl.StringField(), max_items=5)
+
+
+def write_events(path, n, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for _ in range(n):
+            f.write(json.dumps({
+                'user_id': rng.randint(-1, 10 ** 6),
+                'amount': round(rng.uniform(0, 10001), 2),
+                'name': 'x' * rng.randint(0, 70),
+                'country': rng.choice(['US', 'DE', 'FR', 'GB']),
+                'tags': ['a'] * rng.randint(0, 6),
+            }))
+            f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks parallel file validation.')
+    parser.add_argument('--lines', type=int, default=500000)
+    parser.add_argument('--max-processes', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=4 * 1024 * 1024)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'events.ndjson')
+        write_events(path, args.lines)
+        print('{0} lines, {1:.1f} MB'.format(args.lines, os.path.getsize(path) / 1024.0 / 1024.0))
+
+        start = timeit.default_timer()
+        for _ in streaming.iter_file_errors(path, Event):
+            pass
+        baseline = timeit.default_timer() - start
+        print('{0:<20} {1:>10.0f} lines/s'.format('streaming', args.lines / baseline))
+
+        processes = 1
+        while processes <= args.max_processes:
+            start = timeit.default_timer()
+            for _ in parallel.iter_file_errors(path, Event, processes=processes, chunk_size=args.chunk_size):
+                pass
+            elapsed = timeit.default_timer() - start
+            print('{0:<20} {1:>10.0f} lines/s    {2:.2f}x'.format(
+                '{0} process(es)'.format(processes), args.lines / elapsed, baseline / elapsed))
+            processes *= 2
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
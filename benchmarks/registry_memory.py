@@ -0,0 +1,52 @@
+# coding: utf-8
+"""
+Creates and drops lots of documents (as a per-tenant schema builder would do)
+with :class:`jsl.factory.DocumentFactory` and reports the resident set size along
+the way. The registry references the documents of a factory weakly, so once
+the factory evicts them, they are collected and RSS must stay flat. Linux only.
+
+Usage::
+
+    $ python benchmarks/registry_memory.py [number of documents]
+"""
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from jsl import registry
+from jsl.factory import DocumentFactory
+
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+
+
+def create_and_drop(factory, i):
+    document_cls = factory.create('Tenant{0}'.format(i), {'fields': {
+        'name': {'type': 'string', 'required': True, 'enum': ['a', 'b', 'c']},
+        'children': {'type': 'array', 'items': {'type': 'document', 'document': 'self'}},
+        'value': {'type': 'number', 'minimum': 0},
+    }})
+    document_cls.get_cached_schema()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    step = max(n // 10, 1)
+    factory = DocumentFactory(maxsize=100)
+    print('{0:>10} {1:>10} {2:>12}'.format('created', 'RSS, kB', 'registered'))
+    for i in range(n):
+        create_and_drop(factory, i)
+        if (i + 1) % step == 0:
+            gc.collect()
+            print('{0:>10} {1:>10} {2:>12}'.format(
+                i + 1, rss_kb(), len(list(registry.iter_documents()))))
+
+
+if __name__ == '__main__':
+    main()
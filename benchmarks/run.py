@@ -0,0 +1,87 @@
+# coding: utf-8
+"""
+A standalone runner for the schema generation benchmarks (see ``benchmarks/shapes.py``).
+
+Usage::
+
+    $ python benchmarks/run.py [--output results.json] [--compare baseline.json]
+                               [--repeat 5] [--filter wide]
+
+Results are written as JSON, so runs of different jsl versions can be compared
+with ``--compare``.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from shapes import get_cases
+
+
+def measure(function, repeat, min_time=0.2):
+    """Returns per-call timings (in seconds) of ``repeat`` rounds,
+    each round taking at least ``min_time`` seconds.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time and number < 1e6:
+        number *= 2
+    return [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+
+def summarize(timings):
+    mean = sum(timings) / len(timings)
+    variance = sum((t - mean) ** 2 for t in timings) / len(timings)
+    return {
+        'min': min(timings),
+        'median': sorted(timings)[len(timings) // 2],
+        'mean': mean,
+        'stdev': math.sqrt(variance),
+        'rounds': len(timings),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs jsl schema generation benchmarks.')
+    parser.add_argument('--output', help='a file to write JSON results to')
+    parser.add_argument('--compare', help='a file with JSON results to compare with')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='run only cases containing this string')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = dict((result['name'], result) for result in json.load(f)['results'])
+
+    results = []
+    for name, function in get_cases():
+        if args.filter not in name:
+            continue
+        result = dict(summarize(measure(function, args.repeat)), name=name)
+        results.append(result)
+        line = '{0:<40} {1:>12.1f} us'.format(name, result['min'] * 1e6)
+        if name in baseline:
+            line += '  {0:>6.2f}x'.format(baseline[name]['min'] / result['min'])
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'jsl_version': jsl.__version__,
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# coding: utf-8
+"""
+A load test of :class:`jsl.serving.SchemaServer`. Starts the WSGI application
+on a local threaded test server and measures requests per second for plain,
+compressed and conditional (304 Not Modified) requests.
+
+Usage::
+
+    $ python benchmarks/serve_load.py [--requests 2000] [--concurrency 8]
+"""
+import argparse
+import os
+import sys
+import threading
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from wsgiref.simple_server import make_server, WSGIRequestHandler, WSGIServer
+
+try:
+    from http.client import HTTPConnection
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from httplib import HTTPConnection
+    from SocketServer import ThreadingMixIn
+
+from jsl.serving import SchemaServer
+import shapes
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def run_clients(port, path, headers, requests, concurrency):
+    """Sends ``requests`` requests from ``concurrency`` threads.
+    Returns the number of requests per second and a set of response statuses.
+    """
+    per_thread = requests // concurrency
+    statuses = set()
+    lock = threading.Lock()
+
+    def client():
+        local_statuses = set()
+        for _ in range(per_thread):
+            connection = HTTPConnection('127.0.0.1', port)
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            local_statuses.add(response.status)
+            connection.close()
+        with lock:
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = timeit.default_timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = timeit.default_timer() - start
+    return per_thread * concurrency / elapsed, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load tests the jsl schema server.')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    document_cls = shapes.wide(n_fields=200)
+    app = SchemaServer()
+    app.warmup(modes=('documentation', 'wire'))
+    path = '/' + document_cls.get_definition_id()
+    artifact = app.cache.get(document_cls)
+
+    server = make_server('127.0.0.1', 0, app,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    port = server.server_address[1]
+
+    cases = [
+        ('identity', path, {}),
+        ('gzip', path, {'Accept-Encoding': 'gzip'}),
+        ('gzip, wire mode', path + '?mode=wire', {'Accept-Encoding': 'gzip'}),
+        ('If-None-Match (304)', path, {'If-None-Match': artifact.get_etag()}),
+    ]
+    print('{0} bytes, {1} gzipped'.format(len(artifact.body), len(artifact.get_body('gzip'))))
+    for name, case_path, headers in cases:
+        rps, statuses = run_clients(port, case_path, headers, args.requests, args.concurrency)
+        print('{0:<30} {1:>10.0f} req/s    statuses: {2}'.format(
+            name, rps, ', '.join(str(status) for status in sorted(statuses))))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
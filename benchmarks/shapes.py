@@ -0,0 +1,121 @@
+# coding: utf-8
+"""
+Documents of different shapes and the benchmark cases built on them.
+Shared by ``benchmarks/run.py`` and ``benchmarks/bench_generation.py``.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl.fields import RECURSIVE_REFERENCE_CONSTANT
+from jsl.roles import Var
+
+
+MODULE = 'benchmarks.shapes'
+
+
+def _document(name, attrs, base=jsl.Document):
+    attrs = dict(attrs, __module__=MODULE)
+    return type(name, (base,), attrs)
+
+
+def wide(n_fields=1000):
+    """A document with ``n_fields`` fields of different types."""
+    attrs = {}
+    for i in range(n_fields):
+        kind = i % 4
+        if kind == 0:
+            field = jsl.StringField(min_length=1, max_length=i, title='Field {0}'.format(i))
+        elif kind == 1:
+            field = jsl.IntField(minimum=0, maximum=i, required=True)
+        elif kind == 2:
+            field = jsl.ArrayField(jsl.StringField(enum=['a', 'b', 'c']), unique_items=True)
+        else:
+            field = jsl.BooleanField(description='Flag {0}'.format(i))
+        attrs['field_{0}'.format(i)] = field
+    return _document('Wide', attrs)
+
+
+def deep(depth=50):
+    """A chain of ``depth`` documents, each inlining the next one."""
+    document_cls = _document('Deep0', {'leaf': jsl.StringField()})
+    for i in range(1, depth):
+        document_cls = _document('Deep{0}'.format(i), {
+            'name': jsl.StringField(),
+            'child': jsl.DocumentField(document_cls),
+            'nested': jsl.DictField(properties={'value': jsl.NumberField()}),
+        })
+    return document_cls
+
+
+def recursive(n_documents=20):
+    """Documents referencing themselves and each other by name."""
+    document_cls = None
+    for i in range(n_documents):
+        document_cls = _document('Recursive{0}'.format(i), {
+            'name': jsl.StringField(),
+            'children': jsl.ArrayField(jsl.DocumentField(RECURSIVE_REFERENCE_CONSTANT)),
+            'next': jsl.DocumentField('Recursive{0}'.format(i + 1 if i + 1 < n_documents else 0)),
+        })
+    return document_cls
+
+
+def dag(levels=10):
+    """Levels of documents, where each document inlines both documents of the next
+    level, so the inline expansion grows as ``2 ** levels``.
+    """
+    next_level = [_document('DagLeaf', {'value': jsl.IntField()})] * 2
+    for level in range(levels):
+        next_level = [
+            _document('Dag{0}x{1}'.format(level, i), {
+                'left': jsl.DocumentField(next_level[0]),
+                'right': jsl.DocumentField(next_level[1]),
+                'name': jsl.StringField(),
+            })
+            for i in range(2)
+        ]
+    return next_level[0]
+
+
+def roles(n_fields=200):
+    """A document whose fields and their arguments depend on roles."""
+    attrs = {}
+    for i in range(n_fields):
+        attrs['field_{0}'.format(i)] = Var({
+            'response': jsl.StringField(
+                required=Var({'response': True}),
+                title=Var({'response': 'Field {0}'.format(i)}),
+                max_length=Var({'response': i, 'request': i * 2}),
+            ),
+            'request': jsl.IntField(minimum=Var({'request': 0})),
+        }, roles_to_pass_down=['response', 'request'])
+    return _document('Roles', attrs)
+
+
+def get_cases():
+    """Returns a list of ``(name, function)`` pairs, each function being a benchmark case.
+    The cases use only the public API, so the results of different versions can be compared.
+    """
+    wide_cls = wide()
+    deep_cls = deep()
+    recursive_cls = recursive()
+    dag_cls = dag()
+    roles_cls = roles()
+
+    cases = []
+    for shape, document_cls in [('wide', wide_cls), ('deep', deep_cls), ('recursive', recursive_cls),
+                                ('dag', dag_cls), ('roles', roles_cls)]:
+        cases.append(('{0}.get_schema'.format(shape),
+                      lambda document_cls=document_cls: document_cls.get_schema()))
+        cases.append(('{0}.get_schema(ordered=True)'.format(shape),
+                      lambda document_cls=document_cls: document_cls.get_schema(ordered=True)))
+    cases.extend([
+        ('roles.get_schema(role=response)', lambda: roles_cls.get_schema(role='response')),
+        ('roles.get_schema(role=request)', lambda: roles_cls.get_schema(role='request')),
+        ('wide.walk', lambda: list(wide_cls.walk())),
+        ('dag.walk(through_document_fields=True)',
+         lambda: list(dag_cls.walk(through_document_fields=True))),
+    ])
+    return cases
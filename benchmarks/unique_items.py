@@ -0,0 +1,63 @@
+# coding: utf-8
+"""
+Compares checking ``uniqueItems`` on large arrays of objects by hashing
+(:class:`jsl.validation.Validator`) to comparing the items pairwise.
+The times of the validator include validating the items against their schema.
+
+Usage::
+
+    $ python benchmarks/unique_items.py [--sizes 1000,10000,100000] [--max-pairwise-size 5000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jsl
+from jsl.validation import json_equal
+
+
+class Item(jsl.Document):
+    id = jsl.IntField(required=True)
+    name = jsl.StringField()
+    tags = jsl.ArrayField(jsl.StringField())
+
+
+class Order(jsl.Document):
+    items = jsl.ArrayField(jsl.DocumentField(Item), unique_items=True)
+
+
+def make_items(n):
+    return [{'id': i, 'name': 'item-{0}'.format(i), 'tags': ['a', 'b']} for i in range(n)]
+
+
+def has_unique_items_pairwise(items):
+    for i, item in enumerate(items):
+        for other_item in items[i + 1:]:
+            if json_equal(item, other_item):
+                return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks uniqueItems checking.')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--max-pairwise-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    validator = Order.get_validator()
+    for size in [int(size) for size in args.sizes.split(',')]:
+        order = {'items': make_items(size)}
+        cases = [('hashing', lambda: validator.is_valid(order))]
+        if size <= args.max_pairwise_size:
+            cases.append(('pairwise', lambda: has_unique_items_pairwise(order['items'])))
+        for name, function in cases:
+            elapsed = min(timeit.repeat(function, number=1, repeat=args.repeat))
+            print('{0:>8} items  {1:<10} {2:>10.4f} s'.format(size, name, elapsed))
+
+
+if __name__ == '__main__':
+    main()
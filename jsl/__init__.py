@@ -18,3 +18,5 @@ __version_info__ = tuple(int(i) for i in __version__.split('.'))
 
 from .document import Document
 from .fields import *
+from .cache import warmup
+
@@ -0,0 +1,57 @@
+# coding: utf-8
+"""
+The implementation of :mod:`jsl.asgi`. Kept in a separate module because its syntax
+is invalid on the Python versions older than 3.5.
+"""
+import asyncio
+import functools
+
+from .serving import SchemaServer
+
+
+class ASGISchemaApp(object):
+    """An ASGI application serving schemas the same way as :class:`.serving.SchemaServer`.
+
+    :param server:
+        A server to handle the requests. A new one is created if not specified.
+    :type server: :class:`.serving.SchemaServer`
+    :param executor:
+        An executor to handle the requests in, so that generating the schemas
+        missing from the cache does not block the event loop. The default
+        executor of the loop is used if not specified.
+    :type executor: :class:`concurrent.futures.Executor`
+    """
+
+    def __init__(self, server=None, executor=None):
+        self.server = server if server is not None else SchemaServer()
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported scope type: {0!r}'.format(scope['type']))
+
+        headers = dict((name.decode('latin-1').lower(), value.decode('latin-1'))
+                       for name, value in scope.get('headers', ()))
+        status, response_headers, body = await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(
+                self.server.handle, scope['method'], scope['path'],
+                query_string=scope.get('query_string', b'').decode('latin-1'), headers=headers))
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in response_headers],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
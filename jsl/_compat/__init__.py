@@ -7,11 +7,13 @@ import sys
 
 IS_PY3 = sys.version_info[0] == 3
 string_types = (str, ) if IS_PY3 else (basestring, )
+integer_types = (int, ) if IS_PY3 else (int, long)
 
 if IS_PY3:
-    from urllib.parse import urljoin, urlunsplit, urlsplit
+    from urllib.parse import urljoin, urlunsplit, urlsplit, parse_qs, unquote
 else:
-    from urlparse import urljoin, urlunsplit, urlsplit
+    from urlparse import urljoin, urlunsplit, urlsplit, parse_qs
+    from urllib import unquote
 
 
 def iterkeys(obj, **kwargs):
@@ -64,4 +66,11 @@ def urldefrag(url):
 try:
     from collections import OrderedDict
 except ImportError:
-    from .ordereddict import OrderedDict
\ No newline at end of file
+    from .ordereddict import OrderedDict
+
+# Plain dicts preserve insertion order since Python 3.7 and are cheaper
+# to build than OrderedDicts, so they are used for ordered schemas
+if sys.version_info >= (3, 7):
+    ordered_dict = dict
+else:
+    ordered_dict = OrderedDict
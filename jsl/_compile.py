@@ -0,0 +1,117 @@
+# coding: utf-8
+"""
+A base of the compilers of the functions processing instances of documents
+(see :mod:`.projection` and :mod:`.defaults`).
+"""
+import re
+
+from ._compat import iteritems
+from .fields import ArrayField, DictField, DocumentField
+from .roles import maybe_resolve_2
+
+
+def identity(value):
+    return value
+
+
+class FieldCompiler(object):
+    """Walks the fields of a document, resolving their roles once, and builds
+    a function of every field processing its values. A function of a field is None
+    if the values of the field are left as they are.
+
+    The subclasses build the functions of :class:`.DictField` s and :class:`.ArrayField` s
+    from the functions of their subfields; the values of the other fields are left
+    as they are, including the values of "of" fields, as it's not known which
+    of the fields describes them.
+    """
+
+    def __init__(self):
+        self._documents = {}
+
+    def compile_document(self, document_cls, role):
+        key = (document_cls, role)
+        if key in self._documents:
+            return self._documents[key]
+        # recursive documents refer to the function being compiled
+        compiled = []
+        self._documents[key] = lambda value: compiled[0](value)
+        function = self.compile_field(document_cls._field, role)
+        compiled.append(function or identity)
+        self._documents[key] = function
+        return function
+
+    def compile_field(self, field, role):
+        if isinstance(field, DocumentField):
+            return self.compile_document(field.get_document_cls(role=role), role)
+        if isinstance(field, DictField):
+            return self._compile_dict_field(field, role)
+        if isinstance(field, ArrayField):
+            return self._compile_array_field(field, role)
+        return None
+
+    def _compile_subfield(self, field, role):
+        # additional_properties and additional_items may be booleans
+        if field is None or isinstance(field, bool):
+            return None
+        return self.compile_field(field, role)
+
+    def _compile_dict_field(self, field, role):
+        properties, properties_role = maybe_resolve_2(field.properties, role)
+        compiled_properties = []
+        for prop, prop_field in iteritems(properties or {}):
+            prop_field, prop_role = maybe_resolve_2(prop_field, properties_role)
+            if prop_field is not None:
+                compiled_properties.append((prop, prop_field, prop_role, self.compile_field(prop_field, prop_role)))
+        pattern_properties, pattern_properties_role = maybe_resolve_2(field.pattern_properties, role)
+        compiled_pattern_properties = []
+        for pattern, prop_field in iteritems(pattern_properties or {}):
+            prop_field, prop_role = maybe_resolve_2(prop_field, pattern_properties_role)
+            if prop_field is not None:
+                compiled_pattern_properties.append((re.compile(pattern), self.compile_field(prop_field, prop_role)))
+        additional_properties, additional_properties_role = maybe_resolve_2(field.additional_properties, role)
+        return self._make_dict_function(
+            compiled_properties, frozenset(properties or ()), compiled_pattern_properties,
+            additional_properties is not False,
+            self._compile_subfield(additional_properties, additional_properties_role))
+
+    def _make_dict_function(self, properties, declared, pattern_properties, allows_additional,
+                            additional_function):
+        """Returns a function processing the values of a :class:`.DictField` or None.
+
+        :param properties: a list of tuples of a property name, its field, its role and its function
+        :param declared: a set of the names of the properties, including those hidden from the role
+        :param pattern_properties: a list of pairs of a compiled regex and a function
+        :param allows_additional: if the additional properties are allowed
+        :param additional_function: a function of the additional properties
+        """
+        raise NotImplementedError()
+
+    def _compile_array_field(self, field, role):
+        items, items_role = maybe_resolve_2(field.items, role)
+        if isinstance(items, (list, tuple)):
+            item_functions = []
+            for item in items:
+                item, item_role = maybe_resolve_2(item, items_role)
+                item_functions.append(None if item is None else self.compile_field(item, item_role))
+            additional_items, additional_items_role = maybe_resolve_2(field.additional_items, role)
+            additional_function = self._compile_subfield(additional_items, additional_items_role)
+            if additional_function is None and not any(item_functions):
+                return None
+            return self._make_tuple_function(item_functions, additional_function)
+
+        function = None if items is None else self.compile_field(items, items_role)
+        if function is None:
+            return None
+        return self._make_list_function(function)
+
+    def _make_tuple_function(self, item_functions, additional_function):
+        """Returns a function processing the values of an :class:`.ArrayField` whose
+        items are described by a list of fields. Some of the functions may be None.
+        """
+        raise NotImplementedError()
+
+    def _make_list_function(self, function):
+        """Returns a function processing the values of an :class:`.ArrayField` whose
+        items are described by a single field with the function ``function``.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,253 @@
+# coding: utf-8
+"""
+Schema complexity analysis.
+
+Reports, for documents and roles, how large their schemas are compared to their
+definitions, to catch changes that make schemas blow up (usually because of
+a widely reused :class:`~.fields.DocumentField` without ``as_ref``).
+
+Can be used from the command line::
+
+    $ python -m jsl.analysis myapp.resources --role response --threshold 10
+
+The command analyzes all the registered documents defined in the given modules,
+prints a report and exits with status 1 if some documents exceed the threshold.
+"""
+import argparse
+import importlib
+import json
+import sys
+import timeit
+
+from . import registry
+from .fields import DocumentField, DEFAULT_ROLE
+from .profiling import Profiler
+from ._compat import itervalues
+
+
+DEFAULT_EXPANSION_THRESHOLD = 10.0
+"""The default maximum allowed :attr:`SchemaReport.expansion_factor`."""
+
+_SCHEMA_DICT_KEYWORDS = ('properties', 'patternProperties', 'definitions')
+_SCHEMA_KEYWORDS = ('additionalProperties', 'additionalItems', 'items', 'not')
+_SCHEMA_LIST_KEYWORDS = ('items', 'oneOf', 'anyOf', 'allOf')
+
+
+def _iter_subschemas(schema):
+    for keyword in _SCHEMA_DICT_KEYWORDS:
+        if isinstance(schema.get(keyword), dict):
+            for subschema in itervalues(schema[keyword]):
+                yield subschema
+    for keyword in _SCHEMA_KEYWORDS:
+        if isinstance(schema.get(keyword), dict):
+            yield schema[keyword]
+    for keyword in _SCHEMA_LIST_KEYWORDS:
+        if isinstance(schema.get(keyword), list):
+            for subschema in schema[keyword]:
+                yield subschema
+
+
+class _InliningProfiler(Profiler):
+    """Also remembers the schemas of nested documents the :class:`~.fields.DocumentField` s
+    have expanded inline, to find them in the resulting schema.
+    """
+
+    def __init__(self):
+        super(_InliningProfiler, self).__init__()
+        self.inlined_schemas = []
+
+    def _call(self, key, target, func, args, kwargs):
+        rv = super(_InliningProfiler, self)._call(key, target, func, args, kwargs)
+        if isinstance(target, DocumentField) and '$ref' not in rv[1]:
+            self.inlined_schemas.append(rv[1])
+        return rv
+
+
+def _count_inlines(schema, inlined_schemas):
+    """Returns the number of (sub)schemas in ``schema`` which are
+    among ``inlined_schemas`` (compared by identity).
+    """
+    inlined_ids = set(id(inlined_schema) for inlined_schema in inlined_schemas)
+    inlines = 0
+    stack = [schema]
+    while stack:
+        schema = stack.pop()
+        if id(schema) in inlined_ids:
+            inlines += 1
+        stack.extend(_iter_subschemas(schema))
+    return inlines
+
+
+def measure_schema(schema):
+    """Returns a tuple of the number of (sub)schemas in ``schema``,
+    the number of references among them and the maximum nesting depth.
+    """
+    nodes = refs = max_depth = 0
+    stack = [(schema, 1)]
+    while stack:
+        schema, depth = stack.pop()
+        nodes += 1
+        if '$ref' in schema:
+            refs += 1
+        max_depth = max(max_depth, depth)
+        stack.extend((subschema, depth + 1) for subschema in _iter_subschemas(schema))
+    return nodes, refs, max_depth
+
+
+class SchemaReport(object):
+    """Complexity metrics of a document schema for a role.
+
+    :ivar document_cls: the document
+    :ivar role: the role
+    :ivar fields: a number of fields of the document and all the documents it uses
+        (each document is counted once, :class:`~.fields.DocumentField` s are not counted)
+    :ivar nodes: a number of (sub)schemas in the resulting schema
+    :ivar max_depth: the maximum nesting depth of the resulting schema
+    :ivar inlines: a number of nested documents expanded inline in the resulting schema
+    :ivar refs: a number of references (``{"$ref": ...}``) in the resulting schema
+    :ivar definitions: a number of definitions in the resulting schema
+    :ivar byte_size: a size of the resulting schema serialized into compact JSON
+    :ivar generation_time: time taken by :meth:`~.Document.get_schema`, in seconds
+    :ivar expansion_factor: ``nodes / fields``
+    :ivar threshold: the maximum allowed expansion factor
+    """
+
+    def __init__(self, document_cls, role, fields, nodes, max_depth, inlines, refs,
+                 definitions, byte_size, generation_time, threshold=DEFAULT_EXPANSION_THRESHOLD):
+        self.document_cls = document_cls
+        self.role = role
+        self.fields = fields
+        self.nodes = nodes
+        self.max_depth = max_depth
+        self.inlines = inlines
+        self.refs = refs
+        self.definitions = definitions
+        self.byte_size = byte_size
+        self.generation_time = generation_time
+        self.expansion_factor = float(nodes) / max(fields, 1)
+        self.threshold = threshold
+
+    @property
+    def exceeds_threshold(self):
+        return self.expansion_factor > self.threshold
+
+    def as_dict(self):
+        """Returns the report as a JSON-serializable dictionary."""
+        return {
+            'document': self.document_cls.get_definition_id(),
+            'role': self.role,
+            'fields': self.fields,
+            'nodes': self.nodes,
+            'max_depth': self.max_depth,
+            'inlines': self.inlines,
+            'refs': self.refs,
+            'definitions': self.definitions,
+            'byte_size': self.byte_size,
+            'generation_time': self.generation_time,
+            'expansion_factor': self.expansion_factor,
+            'exceeds_threshold': self.exceeds_threshold,
+        }
+
+
+def count_fields(document_cls, role=DEFAULT_ROLE):
+    """Returns a number of fields of ``document_cls`` and all the documents it uses,
+    counting every document once and not counting :class:`~.fields.DocumentField` s
+    and the implicit root fields of the documents.
+    """
+    documents = set([document_cls])
+    for field in document_cls.walk(role=role, through_document_fields=True,
+                                   visited_documents=frozenset([document_cls])):
+        if isinstance(field, DocumentField):
+            documents.add(field.get_document_cls(role=role))
+    return sum(1 for document in documents for field in document.walk(role=role)
+               if field is not document._field and not isinstance(field, DocumentField))
+
+
+def analyze(document_cls, role=DEFAULT_ROLE, threshold=DEFAULT_EXPANSION_THRESHOLD):
+    """Analyzes the schema of ``document_cls`` for ``role``.
+
+    :rtype: :class:`SchemaReport`
+    """
+    start = timeit.default_timer()
+    schema = document_cls.get_schema(role=role)
+    generation_time = timeit.default_timer() - start
+
+    # the documents placed into the definitions are generated more than once
+    # if they are referenced more than once, so the inlines are looked up
+    # in the resulting schema rather than counted as they are generated
+    with _InliningProfiler() as profiler:
+        profiled_schema = document_cls.get_schema(role=role)
+    inlines = _count_inlines(profiled_schema, profiler.inlined_schemas)
+
+    nodes, refs, max_depth = measure_schema(schema)
+    return SchemaReport(
+        document_cls=document_cls,
+        role=role,
+        fields=count_fields(document_cls, role=role),
+        nodes=nodes,
+        max_depth=max_depth,
+        inlines=inlines,
+        refs=refs,
+        definitions=len(schema.get('definitions', {})),
+        byte_size=len(json.dumps(schema, separators=(',', ':')).encode('utf-8')),
+        generation_time=generation_time,
+        threshold=threshold,
+    )
+
+
+def analyze_documents(documents=None, roles=(DEFAULT_ROLE,), threshold=DEFAULT_EXPANSION_THRESHOLD):
+    """Analyzes ``documents`` (all the registered documents by default) for every role.
+
+    :rtype: list of :class:`SchemaReport`
+    """
+    if documents is None:
+        documents = sorted(registry.iter_documents(), key=lambda d: d.get_definition_id())
+    return [analyze(document_cls, role=role, threshold=threshold)
+            for document_cls in documents for role in roles]
+
+
+def format_reports(reports):
+    """Returns ``reports`` formatted as a text table. Documents exceeding
+    the threshold are marked with an asterisk.
+    """
+    lines = ['  {0:<40} {1:<10} {2:>7} {3:>7} {4:>6} {5:>7} {6:>6} {7:>6} {8:>9} {9:>10} {10:>9}'.format(
+        'document', 'role', 'fields', 'nodes', 'depth', 'inlines', 'refs', 'defs',
+        'bytes', 'time, ms', 'expansion')]
+    for r in reports:
+        lines.append('{0} {1:<40} {2:<10} {3:>7} {4:>7} {5:>6} {6:>7} {7:>6} {8:>6} {9:>9} '
+                     '{10:>10.3f} {11:>9.2f}'.format(
+                         '*' if r.exceeds_threshold else ' ', r.document_cls.get_definition_id(),
+                         r.role, r.fields, r.nodes, r.max_depth, r.inlines, r.refs, r.definitions,
+                         r.byte_size, r.generation_time * 1e3, r.expansion_factor))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m jsl.analysis',
+        description='Reports the complexity of schemas of the documents defined in the given modules.')
+    parser.add_argument('modules', nargs='+', help='modules to import and analyze')
+    parser.add_argument('--role', action='append', dest='roles',
+                        help='a role to analyze (may be repeated)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_EXPANSION_THRESHOLD,
+                        help='the maximum allowed expansion factor')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        importlib.import_module(module)
+    documents = sorted(
+        (d for d in registry.iter_documents()
+         if any(d.__module__ == m or d.__module__.startswith(m + '.') for m in args.modules)),
+        key=lambda d: d.get_definition_id())
+    reports = analyze_documents(documents, roles=args.roles or [DEFAULT_ROLE],
+                                threshold=args.threshold)
+    if args.json:
+        print(json.dumps([r.as_dict() for r in reports], indent=2, sort_keys=True))
+    else:
+        print(format_reports(reports))
+    return 1 if any(r.exceeds_threshold for r in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+# coding: utf-8
+"""
+An ASGI application serving schemas. Requires Python 3.7+: importing
+this module on older versions raises :class:`ImportError`.
+"""
+import sys
+
+if sys.version_info < (3, 7):
+    raise ImportError('jsl.asgi requires Python 3.7+')
+
+from ._asgi import ASGISchemaApp  # noqa
@@ -0,0 +1,136 @@
+# coding: utf-8
+"""
+Limits on the size of generated schemas.
+"""
+import collections
+import contextlib
+import threading
+import timeit
+
+
+INLINE = 'inline'
+REFERENCE = 'reference'
+REFERENCE_EXISTING = 'reference_existing'
+
+_local = threading.local()
+
+
+class ExpansionBudgetExceeded(RuntimeError):
+    """Raised when a schema generation exceeds its :class:`ExpansionBudget`.
+
+    :ivar path: a list of definition ids of the documents being expanded,
+        the last one being the document whose expansion exceeded the budget
+    """
+
+    def __init__(self, reason, path):
+        self.reason = reason
+        self.path = path
+        super(ExpansionBudgetExceeded, self).__init__(
+            'Schema expansion budget exceeded ({0}) at {1}'.format(reason, ' -> '.join(path)))
+
+
+class ExpansionBudget(collections.namedtuple(
+        'ExpansionBudget', ['max_nodes', 'max_depth', 'max_time', 'fallback_to_ref'])):
+    """Limits on a single schema generation. The limits are checked whenever
+    a nested document is about to be expanded inline. A budget is immutable.
+
+    :param max_nodes:
+        The maximum number of fields to expand (every field counts once
+        for every time its document is expanded).
+    :type max_nodes: int
+    :param max_depth:
+        The maximum number of nested documents expanded into each other.
+    :type max_depth: int
+    :param max_time:
+        The maximum generation time, in seconds.
+    :type max_time: float
+    :param fallback_to_ref:
+        If False, :class:`ExpansionBudgetExceeded` is raised once any of the limits
+        is exceeded. If True, the document whose expansion exceeds the budget,
+        and every document expanded after that, are placed into the definitions
+        (once each) and referenced instead of being inlined.
+    :type fallback_to_ref: bool
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, max_nodes=None, max_depth=None, max_time=None, fallback_to_ref=False):
+        return super(ExpansionBudget, cls).__new__(cls, max_nodes, max_depth, max_time, fallback_to_ref)
+
+    # budgets are immutable and compared by their limits, so that equal budgets
+    # share the schemas cached by :meth:`.Document.get_cached_schema`
+    def __eq__(self, other):
+        # not equal to plain tuples of the same limits
+        return isinstance(other, ExpansionBudget) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+
+class BudgetState(object):
+    """The usage of an :class:`ExpansionBudget` by a schema generation."""
+
+    def __init__(self, budget, timer=timeit.default_timer):
+        self.budget = budget
+        self.nodes = 0
+        self.path = []
+        self.referenced = set()
+        self._timer = timer
+        self._start = timer()
+
+    def _get_exceeded_limit(self, nodes):
+        budget = self.budget
+        if budget.max_nodes is not None and self.nodes + nodes > budget.max_nodes:
+            return 'max_nodes={0}'.format(budget.max_nodes)
+        if budget.max_depth is not None and len(self.path) + 1 > budget.max_depth:
+            return 'max_depth={0}'.format(budget.max_depth)
+        if budget.max_time is not None and self._timer() - self._start > budget.max_time:
+            return 'max_time={0}'.format(budget.max_time)
+        return None
+
+    def check(self, definition_id, nodes):
+        """Accounts an expansion of a document consisting of ``nodes`` fields.
+
+        Returns :data:`INLINE` if the document can be expanded, :data:`REFERENCE` if
+        it must be placed into the definitions and referenced or :data:`REFERENCE_EXISTING`
+        if it has already been placed into the definitions.
+
+        :raises: :class:`ExpansionBudgetExceeded`
+        """
+        if definition_id in self.referenced:
+            self.nodes += 1
+            return REFERENCE_EXISTING
+        exceeded_limit = self._get_exceeded_limit(nodes) if self.path else None
+        if exceeded_limit is None:
+            self.nodes += nodes
+            return INLINE
+        if not self.budget.fallback_to_ref:
+            raise ExpansionBudgetExceeded(exceeded_limit, self.path + [definition_id])
+        self.referenced.add(definition_id)
+        self.nodes += 1
+        return REFERENCE
+
+
+def get_current_state():
+    """Returns the :class:`BudgetState` of the schema generation
+    running in the current thread, if it has a budget.
+    """
+    return getattr(_local, 'state', None)
+
+
+@contextlib.contextmanager
+def apply_budget(budget):
+    """A context manager applying ``budget`` to schema generations in the current thread.
+    Does nothing if ``budget`` is None.
+    """
+    if budget is None:
+        yield None
+        return
+    previous_state = get_current_state()
+    _local.state = state = BudgetState(budget)
+    try:
+        yield state
+    finally:
+        _local.state = previous_state
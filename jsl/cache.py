@@ -0,0 +1,170 @@
+# coding: utf-8
+"""
+Caching utilities safe to use from multiple threads.
+"""
+import gc
+import sys
+import threading
+
+from .roles import DEFAULT_ROLE
+
+
+class _Call(object):
+    """A computation of a single cache key that is in progress."""
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.event = threading.Event()
+        self.value = None
+        self.exc_info = None
+
+    def wait(self):
+        self.event.wait()
+        if self.exc_info is not None:
+            raise self.exc_info[1]
+        return self.value
+
+
+class SingleFlightCache(object):
+    """A cache that computes a value for every key only once, even if the value is requested
+    by many threads at the same time: one thread computes, the others wait and share
+    the result. Reading a computed value does not acquire any locks.
+
+    :param get_version:
+        An optional callable returning the current version of the data the cached values
+        are derived from. A value computed for an older version is considered missing.
+    :type get_version: callable
+    """
+
+    def __init__(self, get_version=None):
+        self._get_version = get_version
+        self._entries = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        return self._get_version() if self._get_version is not None else None
+
+    def peek(self, key, default=None):
+        """Returns the up-to-date value cached for ``key`` or ``default``
+        if there is no such value. Never computes anything.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == self._current_version():
+            return entry[1]
+        return default
+
+    def get(self, key, create):
+        """Returns the value cached for ``key``. If there is no such value,
+        calls ``create`` (once for all the concurrent callers) and caches the result.
+
+        If ``create`` raises an exception, it's propagated to all the callers waiting
+        for the value and nothing is cached.
+        """
+        version = self._current_version()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return self._call(key, create, version, store=True)
+
+    def call(self, key, create):
+        """Calls ``create`` once for all the concurrent callers requesting ``key``
+        and returns its result to all of them, without caching it.
+        """
+        return self._call(key, create, None, store=False)
+
+    def _call(self, key, create, version, store):
+        with self._lock:
+            entry = self._entries.get(key) if store else None
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            if call.thread is threading.current_thread():
+                # a reentrant request from the computation itself
+                return create()
+            return call.wait()
+
+        try:
+            value = create()
+        except BaseException:
+            call.exc_info = sys.exc_info()
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+            raise
+        with self._lock:
+            if store:
+                self._entries[key] = (version, value)
+            del self._calls[key]
+        call.value = value
+        call.event.set()
+        return value
+
+    def clear(self):
+        """Removes all the cached values."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def warmup(registry=None, roles=(DEFAULT_ROLE,), orderings=(False,), validators=False, projectors=False,
+           defaults_fillers=False, freeze_gc=False):
+    """Eagerly builds all the cached structures of the registered documents:
+    schemas for every role and ordering, recursiveness flags and, optionally,
+    validators, projectors and defaults fillers.
+
+    Intended to be called in a master process before forking workers (i.e., under
+    gunicorn's ``preload_app``), so that the workers only read the prebuilt structures
+    and share them with the master copy-on-write. Note that a change of
+    the registry made after the warmup which may change how the document names
+    resolve (such as redefining a document) invalidates the cached structures.
+
+    :param registry:
+        A registry to take the documents from. Defaults to :mod:`jsl.registry`.
+    :param roles:
+        Roles to build the schemas for.
+    :type roles: iterable of strings
+    :param orderings:
+        Values of the ``ordered`` argument to build the schemas for.
+    :type orderings: iterable of bools
+    :param validators:
+        If True, validators (see :meth:`.Document.get_validator`) are compiled
+        for every role too.
+    :type validators: bool
+    :param projectors:
+        If True, projectors (see :meth:`.Document.compile_projector`) are compiled
+        for every role too.
+    :type projectors: bool
+    :param defaults_fillers:
+        If True, defaults fillers (see :meth:`.Document.compile_defaults_filler`)
+        are compiled for every role too.
+    :type defaults_fillers: bool
+    :param freeze_gc:
+        If True, :func:`gc.freeze` is called after the warmup (Python 3.7+ only),
+        so the garbage collector does not touch the prebuilt objects in the workers.
+    :type freeze_gc: bool
+    """
+    if registry is None:
+        from . import registry
+    for document_cls in registry.iter_documents():
+        document_cls.is_recursive()
+        for role in roles:
+            document_cls.is_recursive(role=role)
+            for ordered in orderings:
+                document_cls.get_cached_schema(role=role, ordered=ordered)
+            if validators:
+                document_cls.get_validator(role=role)
+            if projectors:
+                document_cls.compile_projector(role=role)
+            if defaults_fillers:
+                document_cls.compile_defaults_filler(role=role)
+    if freeze_gc and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
@@ -0,0 +1,112 @@
+# coding: utf-8
+"""
+Filling instances with the default values of the fields.
+"""
+import copy
+import functools
+import numbers
+
+from ._compat import iteritems, string_types
+from ._compile import FieldCompiler, identity
+from .fields import BaseSchemaField, DocumentField
+from .roles import DEFAULT_ROLE, maybe_resolve
+
+
+_NO_DEFAULT = object()
+
+
+def compile_defaults_filler(document_cls, role=DEFAULT_ROLE):
+    """Returns a function that inserts the default values into an instance
+    of the document for ``role``. See :meth:`.Document.compile_defaults_filler`.
+    """
+    return _Compiler().compile_document(document_cls, role) or identity
+
+
+def _is_immutable(value):
+    return isinstance(value, (string_types, numbers.Number))
+
+
+class _Compiler(FieldCompiler):
+    """Resolves the defaults of the fields once and builds a filler of every field:
+    a function inserting the defaults into a value in place.
+    """
+
+    def _compile_default(self, field, role):
+        """Returns a pair of a default value (:data:`_NO_DEFAULT` if there is none)
+        and a function making it, if it has to be made for every insertion.
+        """
+        if isinstance(field, DocumentField):
+            # the default of a document is its Options.default
+            field = field.get_document_cls(role=role)._field
+        if not isinstance(field, BaseSchemaField):
+            return _NO_DEFAULT, None
+        default = maybe_resolve(field._default, role)
+        if callable(default):
+            return _NO_DEFAULT, functools.partial(field.get_default, role=role)
+        default = field.get_default(role=role)
+        if default is None:
+            return _NO_DEFAULT, None
+        if _is_immutable(default):
+            return default, None
+        # every instance gets its own copy of a mutable default
+        return _NO_DEFAULT, functools.partial(copy.deepcopy, default)
+
+    def _make_dict_function(self, properties, declared, pattern_properties, allows_additional,
+                            additional_function):
+        compiled_properties = []
+        for prop, prop_field, prop_role, filler in properties:
+            default, make_default = self._compile_default(prop_field, prop_role)
+            if default is not _NO_DEFAULT or make_default is not None or filler is not None:
+                compiled_properties.append((prop, default, make_default, filler))
+        if not any(filler for _, filler in pattern_properties) and additional_function is None:
+            pattern_properties = None
+        if not compiled_properties and pattern_properties is None:
+            return None
+
+        def fill(value):
+            if not isinstance(value, dict):
+                return value
+            for prop, default, make_default, filler in compiled_properties:
+                if prop not in value:
+                    if make_default is not None:
+                        value[prop] = make_default()
+                    elif default is not _NO_DEFAULT:
+                        value[prop] = default
+                    else:
+                        continue
+                if filler is not None:
+                    filler(value[prop])
+            if pattern_properties is not None:
+                for prop, prop_value in iteritems(value):
+                    if prop in declared:
+                        continue
+                    for regex, filler in pattern_properties:
+                        if regex.search(prop):
+                            if filler is not None:
+                                filler(prop_value)
+                            break
+                    else:
+                        if additional_function is not None:
+                            additional_function(prop_value)
+            return value
+        return fill
+
+    def _make_tuple_function(self, item_functions, additional_function):
+        def fill(value):
+            if not isinstance(value, list):
+                return value
+            for index, item in enumerate(value):
+                filler = item_functions[index] if index < len(item_functions) else additional_function
+                if filler is not None:
+                    filler(item)
+            return value
+        return fill
+
+    def _make_list_function(self, function):
+        def fill(value):
+            if not isinstance(value, list):
+                return value
+            for item in value:
+                function(item)
+            return value
+        return fill
@@ -1,18 +1,45 @@
 # coding: utf-8
 import inspect
+import sys
 
-from . import registry
-from .fields import BaseField, DocumentField, DictField, DEFAULT_ROLE
+from . import registry, modes, validation, projection, defaults, budget as budget_
+from .cache import SingleFlightCache
+from .fields import BaseField, DocumentField, DictField, DEFAULT_ROLE, defer_setting_owner
 from .roles import Var
 from .scope import ResolutionScope
-from ._compat import iteritems, itervalues, with_metaclass, OrderedDict
+from ._compat import iteritems, itervalues, with_metaclass, OrderedDict, ordered_dict
 
 
-def _set_owner_to_document_fields(cls):
-    for field_ in cls.walk(through_document_fields=False, visited_documents=set([cls])):
-        if isinstance(field_, DocumentField):
-            field_.set_owner(cls)
-    return
+def _iter_options(options):
+    """Yields name-value pairs of public non-None attributes
+    of an options container instance.
+    """
+    for cls in type(options).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if not name.startswith('_'):
+                value = getattr(options, name, None)
+                if value is not None:
+                    yield name, value
+    for name, value in iteritems(getattr(options, '__dict__', {})):
+        if not name.startswith('_') and value is not None:
+            yield name, value
+
+
+def _iter_options_class_attrs(options_cls):
+    """Yields name-value pairs of public non-None attributes of an ``Options`` class,
+    including the inherited ones. An attribute set to None in a subclass
+    overrides the inherited value.
+    """
+    attrs = {}
+    for cls in reversed(inspect.getmro(options_cls)):
+        if cls is object:
+            continue
+        for name, value in iteritems(vars(cls)):
+            if not name.startswith('_'):
+                attrs[name] = value
+    for name, value in iteritems(attrs):
+        if value is not None:
+            yield name, value
 
 
 class Options(object):
@@ -31,6 +58,9 @@ class Options(object):
         An URI of the JSON Schema meta-schema.
     :type schema_uri: str
     """
+    __slots__ = ('pattern_properties', 'additional_properties', 'min_properties', 'max_properties',
+                 'title', 'description', 'default', 'enum', 'id', 'definition_id', 'schema_uri')
+
     def __init__(self, additional_properties=False, pattern_properties=None,
                  min_properties=None, max_properties=None,
                  title=None, description=None,
@@ -61,6 +91,13 @@ class DocumentMeta(type):
     Must be a subclass of :class:`~.Options`.
     """
 
+    if sys.version_info < (3, 6):
+        @classmethod
+        def __prepare__(mcs, name, bases):
+            # keep the class body in definition order, so the document
+            # properties are ordered the same way they are defined
+            return OrderedDict()
+
     def __new__(mcs, name, bases, attrs):
         fields = mcs.collect_fields(bases, attrs)
         options_data = mcs.collect_options(bases, attrs)
@@ -83,20 +120,22 @@ class DocumentMeta(type):
         attrs['_field'] = dictfield
         attrs['walk'] = dictfield.walk
         attrs['iter_fields'] = dictfield.iter_fields
+        attrs['_cache'] = SingleFlightCache(get_version=registry.get_version)
 
         klass = type.__new__(mcs, name, bases, attrs)
+        defer_setting_owner(klass)
         registry.put_document(klass.__name__, klass, module=klass.__module__)
-        _set_owner_to_document_fields(klass)
         return klass
 
     @classmethod
     def collect_fields(mcs, bases, attrs):
         """
         Collects fields from the current class and its parent classes.
+        The fields are ordered by definition, the inherited ones go first.
 
         :rtype: a dictionary mapping field names to :class:`~jsl.document.BaseField` s
         """
-        fields = {}
+        fields = ordered_dict()
         # fields from parent classes:
         for base in reversed(bases):
             if hasattr(base, '_fields'):
@@ -118,14 +157,10 @@ class DocumentMeta(type):
         # options from parent classes:
         for base in reversed(bases):
             if hasattr(base, '_options'):
-                for key, value in inspect.getmembers(base._options):
-                    if not key.startswith('_') and value is not None:
-                        options[key] = value
+                options.update(_iter_options(base._options))
         # options from the current class:
         if 'Options' in attrs:
-            for key, value in inspect.getmembers(attrs['Options']):
-                if not key.startswith('_') and value is not None:
-                    options[key] = value
+            options.update(_iter_options_class_attrs(attrs['Options']))
         return options
 
     @classmethod
@@ -156,12 +191,34 @@ class Document(with_metaclass(DocumentMeta)):
     @classmethod
     def is_recursive(cls, role=DEFAULT_ROLE):
         """Returns if the document is recursive, i.e. has a DocumentField pointing to itself."""
-        for field in cls.walk(through_document_fields=True, visited_documents=set([cls])):
-            if isinstance(field, DocumentField):
-                if field.get_document_cls(role=role) == cls:
-                    return True
+        return cls._cache.get(('is_recursive', role), lambda: cls._is_recursive(role=role))
+
+    @classmethod
+    def _is_recursive(cls, role=DEFAULT_ROLE):
+        # visit every nested document once: walking through document fields
+        # would visit a document once for every path leading to it
+        documents_to_visit = [cls]
+        visited_documents = set(documents_to_visit)
+        while documents_to_visit:
+            document_cls = documents_to_visit.pop()
+            for field in document_cls.walk():
+                if isinstance(field, DocumentField):
+                    if field.get_document_cls(role=role) == cls:
+                        return True
+                    nested_document_cls = field.get_document_cls()
+                    if nested_document_cls not in visited_documents:
+                        visited_documents.add(nested_document_cls)
+                        documents_to_visit.append(nested_document_cls)
         return False
 
+    @classmethod
+    def _count_own_fields(cls, role=DEFAULT_ROLE):
+        """Returns a number of fields of the document, not counting
+        :class:`DocumentField` s and fields of the nested documents.
+        """
+        return cls._cache.get(('own_fields_count', role), lambda: sum(
+            1 for field in cls.walk(role=role) if not isinstance(field, DocumentField)))
+
     @classmethod
     def get_definition_id(cls):
         """Returns a unique string to be used as a key for this document
@@ -170,18 +227,28 @@ class Document(with_metaclass(DocumentMeta)):
         return cls._options.definition_id or '{0}.{1}'.format(cls.__module__, cls.__name__)
 
     @classmethod
-    def get_schema(cls, role=DEFAULT_ROLE, ordered=False):
+    def get_schema(cls, role=DEFAULT_ROLE, ordered=False, budget=None, mode=modes.DOCUMENTATION_MODE):
         """Returns a JSON schema (draft v4) of the document.
 
         :arg ordered:
-            If True, the resulting schema is an OrderedDict and its properties are ordered
-            in a sensible way, which makes it more readable.
+            If True, the resulting schema properties are ordered in a sensible way,
+            which makes it more readable. The schema is a plain dict on Python 3.7+
+            (which preserves insertion order) and an OrderedDict otherwise.
+        :arg budget:
+            Limits on the expansion of nested documents.
+        :type budget: :class:`.budget.ExpansionBudget`
+        :arg mode:
+            :data:`.modes.DOCUMENTATION_MODE` or :data:`.modes.WIRE_MODE`. In the latter,
+            the annotations (``title``, ``description`` and ``default``) are omitted.
+        :type mode: str
         """
-        definitions, schema = cls.get_definitions_and_schema(
-            role=role, ordered=ordered,
-            scope=ResolutionScope(base=cls._options.id, current=cls._options.id)
-        )
-        rv = OrderedDict() if ordered else {}
+        with modes.apply_mode(mode):
+            with budget_.apply_budget(budget):
+                definitions, schema = cls.get_definitions_and_schema(
+                    role=role, ordered=ordered,
+                    scope=ResolutionScope(base=cls._options.id, current=cls._options.id)
+                )
+        rv = ordered_dict() if ordered else {}
         if cls._options.id:
             rv['id'] = cls._options.id
         if cls._options.schema_uri is not None:
@@ -191,6 +258,107 @@ class Document(with_metaclass(DocumentMeta)):
         rv.update(schema)
         return rv
 
+    @classmethod
+    def get_cached_schema(cls, role=DEFAULT_ROLE, ordered=False, budget=None,
+                          mode=modes.DOCUMENTATION_MODE):
+        """Returns the same schema as :meth:`get_schema`, but generates it only once
+        for every role, ordering, budget and mode. Concurrent callers wait for a single
+        generation and share its result. The cache is invalidated when a change of the registry
+        may change how the document names resolve (see :func:`.registry.get_version`).
+
+        The returned schema is shared, so it must not be modified.
+
+        A schema generated with a ``max_time`` budget depends on how fast the generation
+        went, so it is not cached; only the concurrent callers share it.
+        """
+        key = ('schema', role, ordered, budget, mode)
+        create = lambda: cls.get_schema(role=role, ordered=ordered, budget=budget, mode=mode)
+        if budget is not None and budget.max_time is not None:
+            return cls._cache.call(key, create)
+        return cls._cache.get(key, create)
+
+    @classmethod
+    def get_validator(cls, role=DEFAULT_ROLE, adaptive_branches=False, format_checker=None):
+        """Returns a :class:`.validation.Validator` of the document schema for ``role``.
+        The validator is compiled only once and shared, the same way as
+        :meth:`get_cached_schema` is.
+
+        :param adaptive_branches:
+            If True, returns a validator which reorders the subschemas of ``anyOf`` s
+            by how often they match (see :class:`.validation.Validator`).
+            It is shared separately from the other one.
+        :param format_checker:
+            If specified, returns a validator checking the formats of the fields
+            such as :class:`.EmailField` (see :mod:`.formats`), shared by the checkers
+            of the same functions (see :meth:`.formats.FormatChecker.get_key`). A validator
+            is compiled for every distinct set of functions, so they should be defined once
+            rather than created for every call.
+        :type format_checker: :class:`.formats.FormatChecker`
+        """
+        key = ('adaptive_validator' if adaptive_branches else 'validator', role)
+        if format_checker is not None:
+            key += (format_checker.get_key(),)
+        return cls._cache.get(key, lambda: validation.Validator(
+            cls.get_cached_schema(role=role, mode=modes.WIRE_MODE), adaptive_branches=adaptive_branches,
+            format_checker=format_checker))
+
+    @classmethod
+    def validate_many(cls, records, role=DEFAULT_ROLE, format_checker=None):
+        """Validates many records against the document schema for ``role`` at once
+        (see :class:`.validation.BatchValidator`).
+
+        :param records: a sequence of records
+        :param format_checker: see :meth:`get_validator`
+        :rtype: :class:`.validation.BatchResult`
+        """
+        key = ('batch_validator', role)
+        if format_checker is not None:
+            key += (format_checker.get_key(),)
+        batch_validator = cls._cache.get(key, lambda: validation.BatchValidator(
+            cls.get_validator(role=role, format_checker=format_checker)))
+        return batch_validator.validate(records)
+
+    @classmethod
+    def compile_projector(cls, role=DEFAULT_ROLE):
+        """Returns a function that, given an instance of the document (a dict), returns
+        a new dict containing only the properties present in the document schema
+        for ``role``, such as to strip the fields a role must not see from a response.
+
+        The projection goes through :class:`.DictField` s, :class:`.ArrayField` s and
+        :class:`.DocumentField` s, resolving :class:`.Var` s the same way as
+        :meth:`get_schema` does. The roles are resolved once, when the function is compiled,
+        and the function is cached for every role until the registry changes.
+
+        The properties a schema allows without declaring them (``additional_properties``
+        other than False) are kept. The values of the other fields, including
+        :class:`.OneOfField` s and the like, are not copied.
+        """
+        return cls._cache.get(('projector', role), lambda: projection.compile_projector(cls, role=role))
+
+    @classmethod
+    def compile_defaults_filler(cls, role=DEFAULT_ROLE):
+        """Returns a function that, given an instance of the document (a dict), inserts
+        the defaults of the fields (see :meth:`.BaseSchemaField.get_default`) for ``role``
+        in place of the absent properties and returns the instance.
+
+        The defaults are inserted recursively through :class:`.DictField` s,
+        :class:`.ArrayField` s and :class:`.DocumentField` s. The roles and the defaults are
+        resolved once, when the function is compiled: only callable defaults are called
+        for every insertion, and mutable defaults are deep-copied, so the instances do not
+        share them.
+        """
+        return cls._cache.get(('defaults_filler', role), lambda: defaults.compile_defaults_filler(cls, role=role))
+
+    @classmethod
+    def fill_defaults_many(cls, records, role=DEFAULT_ROLE):
+        """Inserts the defaults into many records (see :meth:`compile_defaults_filler`).
+
+        :param records: an iterable of records
+        :returns: a list of the records
+        """
+        fill = cls.compile_defaults_filler(role=role)
+        return [fill(record) for record in records]
+
     @classmethod
     def get_definitions_and_schema(cls, role=DEFAULT_ROLE, scope=ResolutionScope(),
                                    ordered=False, ref_documents=None):
@@ -200,8 +368,9 @@ class Document(with_metaclass(DocumentMeta)):
         containing definitions that are referenced from the schema.
 
         :arg ordered:
-            If True, the resulting schema is an OrderedDict and its properties are ordered
-            in a sensible way, which makes it more readable.
+            If True, the resulting schema properties are ordered in a sensible way,
+            which makes it more readable. The schema is a plain dict on Python 3.7+
+            (which preserves insertion order) and an OrderedDict otherwise.
         :type ordered: bool
         :arg scope:
             Current resolution scope.
@@ -215,15 +384,31 @@ class Document(with_metaclass(DocumentMeta)):
         """
         is_recursive = cls.is_recursive()
 
-        if is_recursive:
+        # a document exceeding the expansion budget is placed into the definitions
+        # and referenced, the same way as a recursive one
+        budget_state = budget_.get_current_state()
+        if budget_state is not None:
+            decision = budget_state.check(cls.get_definition_id(), cls._count_own_fields(role=role))
+            if decision == budget_.REFERENCE_EXISTING:
+                return {}, scope.create_ref(cls.get_definition_id())
+            as_ref = is_recursive or decision == budget_.REFERENCE
+            budget_state.path.append(cls.get_definition_id())
+        else:
+            as_ref = is_recursive
+
+        if as_ref:
             ref_documents = set(ref_documents) if ref_documents else set()
             ref_documents.add(cls)
             scope = scope.replace(output=scope._base)
 
-        definitions, schema = cls._field.get_definitions_and_schema(
-            role=role, scope=scope, ordered=ordered, ref_documents=ref_documents)
+        try:
+            definitions, schema = cls._field.get_definitions_and_schema(
+                role=role, scope=scope, ordered=ordered, ref_documents=ref_documents)
+        finally:
+            if budget_state is not None:
+                budget_state.path.pop()
 
-        if is_recursive:
+        if as_ref:
             definition_id = cls.get_definition_id()
             definitions[definition_id] = schema
             schema = scope.create_ref(definition_id)
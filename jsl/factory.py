@@ -0,0 +1,181 @@
+# coding: utf-8
+"""
+Creating documents from declarative specifications.
+"""
+import hashlib
+import itertools
+import json
+import threading
+
+from . import registry, fields
+from .document import Document
+from ._compat import iteritems, string_types, OrderedDict
+
+
+class DocumentFactory(object):
+    """Creates :class:`~.Document` subclasses from specifications and memoizes them,
+    so that equal specifications produce the same class. At most ``maxsize``
+    classes are kept; the least recently used ones are dropped. The registry
+    references the created classes weakly, so a dropped class leaves it once it
+    is not used anywhere else, without invalidating the schemas cached for the
+    other documents. Using a class also counts as using the classes its
+    ``"document"`` fields refer to, so they are not evicted before it.
+
+    A specification is a JSON-like dictionary with two optional keys:
+    ``"fields"``, a dictionary mapping property names to field specifications,
+    and ``"options"``, a dictionary of document options (see :class:`~.Options`).
+
+    A field specification is a dictionary with a ``"type"`` key (one of
+    :attr:`field_types`) and the field arguments. The arguments that take fields
+    (``items``, ``additional_items``, ``properties``, ``pattern_properties``,
+    ``additional_properties``, ``fields`` and ``field``) take field specifications
+    instead. The document of a ``"document"`` field is specified by name::
+
+        factory = DocumentFactory(maxsize=100)
+        User = factory.create('User', {
+            'options': {'title': 'User'},
+            'fields': {
+                'login': {'type': 'string', 'required': True, 'max_length': 32},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+                'manager': {'type': 'document', 'document': 'self'},
+            },
+        })
+
+    If several classes with the same name are alive at the same time,
+    the registry resolves the name to the most recently created one.
+
+    :param maxsize:
+        The maximum number of classes to keep.
+    :type maxsize: int
+    :param base:
+        A base class for the created documents.
+    :param module:
+        A value of ``__module__`` for the created documents. It is used as
+        a prefix of their definition ids and registry names.
+    :type module: str
+    """
+    field_types = {
+        'boolean': fields.BooleanField,
+        'string': fields.StringField,
+        'email': fields.EmailField,
+        'ipv4': fields.IPv4Type,
+        'date-time': fields.DateTimeField,
+        'uri': fields.UriField,
+        'number': fields.NumberField,
+        'integer': fields.IntField,
+        'array': fields.ArrayField,
+        'object': fields.DictField,
+        'oneOf': fields.OneOfField,
+        'anyOf': fields.AnyOfField,
+        'allOf': fields.AllOfField,
+        'not': fields.NotField,
+        'document': fields.DocumentField,
+    }
+    """A mapping from field specification types to field classes."""
+
+    def __init__(self, maxsize=1024, base=Document, module=__name__):
+        self.maxsize = maxsize
+        self.base = base
+        self.module = module
+        self._documents = OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(name, spec):
+        """Returns a key identifying the ``spec`` of a document named ``name``."""
+        canonical = json.dumps([name, spec], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def create(self, name, spec):
+        """Returns a document class named ``name`` described by ``spec``,
+        creating it if an equal specification has not been seen yet.
+        """
+        key = self.get_key(name, spec)
+        with self._lock:
+            document_cls = self._documents.pop(key, None)
+            if document_cls is None:
+                document_cls = self._create_document(name, spec)
+                self._keys[document_cls] = key
+            # (re)insert to mark the class as the most recently used
+            self._documents[key] = document_cls
+            self._touch_dependencies(document_cls, set([document_cls]))
+            excess = len(self._documents) - self.maxsize
+            if excess > 0:
+                evicted_keys = list(itertools.islice((k for k in self._documents if k != key), excess))
+                for evicted_key in evicted_keys:
+                    self._evict(self._documents.pop(evicted_key))
+        return document_cls
+
+    def _touch_dependencies(self, document_cls, visited):
+        # the documents referred to are reinserted after the documents referring to them,
+        # so that they are less recently used only if they are not referred to anymore
+        for field in document_cls.walk(through_document_fields=False,
+                                       visited_documents=frozenset([document_cls])):
+            if not isinstance(field, fields.DocumentField):
+                continue
+            try:
+                dependency_cls = field.get_document_cls()
+            except (KeyError, ValueError):
+                # not created yet
+                continue
+            dependency_key = self._keys.get(dependency_cls)
+            if dependency_key is None or dependency_cls in visited:
+                continue
+            visited.add(dependency_cls)
+            self._documents[dependency_key] = self._documents.pop(dependency_key)
+            self._touch_dependencies(dependency_cls, visited)
+
+    def _create_document(self, name, spec):
+        attrs = dict((prop, self.build_field(field_spec))
+                     for prop, field_spec in iteritems(spec.get('fields', {})))
+        if spec.get('options'):
+            attrs['Options'] = type('Options', (object,), dict(spec['options']))
+        attrs['__module__'] = self.module
+        document_cls = type(self.base)(str(name), (self.base,), attrs)
+        # the registry must not keep the classes the factory has dropped
+        registry.put_document(document_cls.__name__, document_cls, module=document_cls.__module__, weak=True)
+        return document_cls
+
+    def _evict(self, document_cls):
+        del self._keys[document_cls]
+
+    def build_field(self, spec):
+        """Creates a field from a field specification.
+
+        :raises: ValueError
+        """
+        kwargs = dict(spec)
+        type_ = kwargs.pop('type', None)
+        try:
+            field_cls = self.field_types[type_]
+        except (KeyError, TypeError):
+            raise ValueError('Unknown field type: {0!r}'.format(type_))
+
+        for key in ('items', 'additional_items', 'additional_properties', 'field'):
+            if isinstance(kwargs.get(key), dict):
+                kwargs[key] = self.build_field(kwargs[key])
+        if isinstance(kwargs.get('items'), (list, tuple)):
+            kwargs['items'] = [self.build_field(item) for item in kwargs['items']]
+        if 'fields' in kwargs:
+            kwargs['fields'] = [self.build_field(field) for field in kwargs['fields']]
+        for key in ('properties', 'pattern_properties'):
+            if kwargs.get(key) is not None:
+                kwargs[key] = dict((prop, self.build_field(field_spec))
+                                   for prop, field_spec in iteritems(kwargs[key]))
+        if field_cls is fields.DocumentField:
+            document = kwargs.pop('document', None)
+            if not isinstance(document, string_types):
+                raise ValueError('A document field must specify a document name.')
+            kwargs['document_cls'] = document
+        return field_cls(**kwargs)
+
+    def clear(self):
+        """Evicts all the classes."""
+        with self._lock:
+            while self._documents:
+                _, document_cls = self._documents.popitem(last=False)
+                self._evict(document_cls)
+
+    def __len__(self):
+        return len(self._documents)
@@ -1,15 +1,22 @@
 # coding: utf-8
+import collections
 import re
 import sre_constants
+import threading
+import weakref
 
-from . import registry
+from . import registry, modes
 from .roles import maybe_resolve, maybe_resolve_2, DEFAULT_ROLE, maybe_resolve_all_roles
 from .scope import ResolutionScope
-from ._compat import iteritems, iterkeys, itervalues, string_types, OrderedDict
+from ._compat import iteritems, iterkeys, itervalues, string_types, ordered_dict
 
 
 RECURSIVE_REFERENCE_CONSTANT = 'self'
 
+# Documents whose DocumentFields are not yet bound to them (see :func:`defer_setting_owner`).
+_documents_to_set_owner = collections.deque()
+_documents_to_set_owner_lock = threading.Lock()
+
 
 def _validate_regex(regex):
     """
@@ -27,9 +34,14 @@ class BaseField(object):
     """A base class for fields in a JSL :class:`.document.Document`.
     Instances of this class may be added to a document to define its properties.
 
+    Fields declare ``__slots__`` to keep their instances small. A subclass may
+    declare ``__slots__`` for its own attributes too; if it does not, its instances
+    simply get a ``__dict__`` and work as usual.
+
     :param required:
         If the field is required, defaults to False.
     """
+    __slots__ = ('required',)
 
     def __init__(self, required=False):
         self.required = required
@@ -46,8 +58,9 @@ class BaseField(object):
             A role. TODO
         :type role: string
         :arg ordered:
-            If True, the resulting schema is an OrderedDict and its properties are ordered
-            in a sensible way, which makes it more readable.
+            If True, the resulting schema properties are ordered in a sensible way,
+            which makes it more readable. The schema is a plain dict on Python 3.7+
+            (which preserves insertion order) and an OrderedDict otherwise.
         :type ordered: bool
         :arg scope:
             Current resolution scope.
@@ -68,8 +81,9 @@ class BaseField(object):
             A role. TODO
         :type role: string
         :arg ordered:
-            If True, the resulting schema is an OrderedDict and its properties are ordered
-            in a sensible way, which makes it more readable.
+            If True, the resulting schema properties are ordered in a sensible way,
+            which makes it more readable. The schema is a plain dict on Python 3.7+
+            (which preserves insertion order) and an OrderedDict otherwise.
         :type ordered: bool
         """
         definitions, schema = self.get_definitions_and_schema(ordered=ordered, role=role)
@@ -112,6 +126,7 @@ class BaseSchemaField(BaseField):
         A detailed explanation about the purpose of the data described by this field.
     :type description: string or :class:`Var`
     """
+    __slots__ = ('id', 'title', 'description', '_enum', '_default')
 
     def __init__(self, id='', default=None, enum=None, title=None, description=None, **kwargs):
         self.id = id
@@ -136,27 +151,33 @@ class BaseSchemaField(BaseField):
     def _update_schema_with_common_fields(self, schema, id='', role=DEFAULT_ROLE):
         if id:
             schema['id'] = id
-        title = maybe_resolve(self.title, role)
-        if title is not None:
-            schema['title'] = title
-        description = maybe_resolve(self.description, role)
-        if description is not None:
-            schema['description'] = description
+        # the annotations do not affect validation and are omitted in the wire mode
+        include_annotations = modes.includes_annotations()
+        if include_annotations:
+            title = maybe_resolve(self.title, role)
+            if title is not None:
+                schema['title'] = title
+            description = maybe_resolve(self.description, role)
+            if description is not None:
+                schema['description'] = description
         enum = self.get_enum(role=role)
         if enum:
+            # every schema gets its own list, so modifying it does not affect the field
             schema['enum'] = list(enum)
-        default = self.get_default(role=role)
-        if default is not None:
-            schema['default'] = default
+        if include_annotations:
+            default = self.get_default(role=role)
+            if default is not None:
+                schema['default'] = default
         return schema
 
 
 class BooleanField(BaseSchemaField):
     """A boolean field."""
+    __slots__ = ()
 
     def get_definitions_and_schema(self, role=DEFAULT_ROLE, scope=ResolutionScope(), ordered=False, ref_documents=None):
         id, scope = scope.alter(self.id)
-        schema = (OrderedDict if ordered else dict)(type='boolean')
+        schema = (ordered_dict if ordered else dict)(type='boolean')
         schema = self._update_schema_with_common_fields(schema, id=id, role=role)
         return {}, schema
 
@@ -177,6 +198,7 @@ class StringField(BaseSchemaField):
         A maximum length.
     :type max_length: int or :class:`Var`
     """
+    __slots__ = ('pattern', 'format', 'max_length', 'min_length')
     _FORMAT = None
 
     def __init__(self, pattern=None, format=None, min_length=None, max_length=None, **kwargs):
@@ -191,7 +213,7 @@ class StringField(BaseSchemaField):
 
     def get_definitions_and_schema(self, role=DEFAULT_ROLE, scope=ResolutionScope(), ordered=False, ref_documents=None):
         id, scope = scope.alter(self.id)
-        schema = (OrderedDict if ordered else dict)(type='string')
+        schema = (ordered_dict if ordered else dict)(type='string')
         schema = self._update_schema_with_common_fields(schema, id=id, role=role)
 
         pattern = maybe_resolve(self.pattern, role)
@@ -211,21 +233,25 @@ class StringField(BaseSchemaField):
 
 class EmailField(StringField):
     """An email field."""
+    __slots__ = ()
     _FORMAT = 'email'
 
 
 class IPv4Type(StringField):
     """An IPv4 field."""
+    __slots__ = ()
     _FORMAT = 'ipv4'
 
 
 class DateTimeField(StringField):
     """An ISO 8601 formatted date-time field."""
+    __slots__ = ()
     _FORMAT = 'date-time'
 
 
 class UriField(StringField):
     """A URI field."""
+    __slots__ = ()
     _FORMAT = 'uri'
 
 
@@ -248,6 +274,7 @@ class NumberField(BaseSchemaField):
         Whether a value is allowed to exactly equal the maximum.
     :type exclusive_maximum: bool or :class:`Var`
     """
+    __slots__ = ('multiple_of', 'minimum', 'exclusive_minimum', 'maximum', 'exclusive_maximum')
     _NUMBER_TYPE = 'number'
 
     def __init__(self, multiple_of=None, minimum=None, maximum=None,
@@ -261,7 +288,7 @@ class NumberField(BaseSchemaField):
 
     def get_definitions_and_schema(self, role=DEFAULT_ROLE, scope=ResolutionScope(), ordered=False, ref_documents=None):
         id, scope = scope.alter(self.id)
-        schema = (OrderedDict if ordered else dict)(type=self._NUMBER_TYPE)
+        schema = (ordered_dict if ordered else dict)(type=self._NUMBER_TYPE)
         schema = self._update_schema_with_common_fields(schema, id=id, role=role)
         multiple_of = maybe_resolve(self.multiple_of, role)
         if multiple_of is not None:
@@ -283,6 +310,7 @@ class NumberField(BaseSchemaField):
 
 class IntField(NumberField):
     """An integer field."""
+    __slots__ = ()
     _NUMBER_TYPE = 'integer'
 
 
@@ -311,6 +339,7 @@ class ArrayField(BaseSchemaField):
         by the :class:`BaseField` passed using this argument.
     :type additional_items: bool or :class:`BaseField` or :class:`Var`
     """
+    __slots__ = ('items', 'min_items', 'max_items', 'unique_items', 'additional_items')
 
     def __init__(self, items, min_items=None, max_items=None, unique_items=False,
                  additional_items=None, **kwargs):
@@ -324,7 +353,7 @@ class ArrayField(BaseSchemaField):
     def get_definitions_and_schema(self, role=DEFAULT_ROLE, scope=ResolutionScope(), ordered=False, ref_documents=None):
         id, scope = scope.alter(self.id)
         nested_definitions = {}
-        schema = (OrderedDict if ordered else dict)(type='array')
+        schema = (ordered_dict if ordered else dict)(type='array')
 
         items, items_role = maybe_resolve_2(self.items, role)
         if items is not None:
@@ -400,6 +429,8 @@ class DictField(BaseSchemaField):
         A maximum number of properties
     :type max_properties: int or :class:`Var`
     """
+    __slots__ = ('properties', 'pattern_properties', 'additional_properties',
+                 'min_properties', 'max_properties')
 
     def __init__(self, properties=None, pattern_properties=None, additional_properties=None,
                  min_properties=None, max_properties=None, **kwargs):
@@ -412,7 +443,7 @@ class DictField(BaseSchemaField):
 
     def _process_properties(self, properties, scope, ordered=False, ref_documents=None, role=DEFAULT_ROLE):
         nested_definitions = {}
-        schema = OrderedDict() if ordered else {}
+        schema = ordered_dict() if ordered else {}
         required = []
         for prop, field in iteritems(properties):
             field, field_role = maybe_resolve_2(field, role)
@@ -428,7 +459,7 @@ class DictField(BaseSchemaField):
 
     def get_definitions_and_schema(self, role=DEFAULT_ROLE, scope=ResolutionScope(), ordered=False, ref_documents=None):
         nested_definitions = {}
-        schema = (OrderedDict if ordered else dict)(type='object')
+        schema = (ordered_dict if ordered else dict)(type='object')
         id, scope = scope.alter(self.id)
         schema = self._update_schema_with_common_fields(schema, id=id, role=role)
 
@@ -489,6 +520,7 @@ class DictField(BaseSchemaField):
 
 
 class BaseOfField(BaseSchemaField):
+    __slots__ = ('fields',)
     _KEYWORD = None
 
     def __init__(self, fields, **kwargs):
@@ -509,7 +541,7 @@ class BaseOfField(BaseSchemaField):
                     role=field_role, scope=scope, ordered=ordered, ref_documents=ref_documents)
                 nested_definitions.update(field_definitions)
                 one_of.append(field_schema)
-        schema = OrderedDict() if ordered else {}
+        schema = ordered_dict() if ordered else {}
         schema[self._KEYWORD] = one_of
         schema = self._update_schema_with_common_fields(schema, id=id)
         return nested_definitions, schema
@@ -526,6 +558,7 @@ class OneOfField(BaseOfField):
     :param fields: a list of fields, exactly one of which describes the data
     :type fields: list whose elements are :class:`BaseField` s or :class:`Var` s
     """
+    __slots__ = ()
     _KEYWORD = 'oneOf'
 
 
@@ -534,6 +567,7 @@ class AnyOfField(BaseOfField):
     :param fields: a list of fields, at least one of which describes the data
     :type fields: list whose elements are :class:`BaseField` s or :class:`Var` s
     """
+    __slots__ = ()
     _KEYWORD = 'anyOf'
 
 
@@ -542,6 +576,7 @@ class AllOfField(BaseOfField):
     :param fields: a list of fields, all of which describe the data
     :type fields: list whose elements are :class:`BaseField` s or :class:`Var` s
     """
+    __slots__ = ()
     _KEYWORD = 'allOf'
 
 
@@ -550,6 +585,7 @@ class NotField(BaseSchemaField):
     :param field: a field to negate
     :type field: :class:`BaseField`
     """
+    __slots__ = ('field',)
 
     def __init__(self, field, **kwargs):
         self.field = field
@@ -564,7 +600,7 @@ class NotField(BaseSchemaField):
         else:
             field_definitions = {}
             field_schema = {}
-        schema = OrderedDict() if ordered else {}
+        schema = ordered_dict() if ordered else {}
         schema['not'] = field_schema
         schema = self._update_schema_with_common_fields(schema, id=id, role=role)
         return field_definitions, schema
@@ -581,6 +617,7 @@ class DocumentField(BaseField):
         the field schema is just a reference to it: ``{"$ref": "#/definitions/..."}``.
         Makes a resulting schema more readable.
     """
+    __slots__ = ('_document_cls', 'owner_cls', 'as_ref', '_resolved_documents')
 
     def __init__(self, document_cls, as_ref=False, **kwargs):
         """
@@ -589,6 +626,7 @@ class DocumentField(BaseField):
         self._document_cls = document_cls
         self.owner_cls = None
         self.as_ref = as_ref
+        self._resolved_documents = {}
         super(DocumentField, self).__init__(**kwargs)
 
     def iter_fields(self, role=DEFAULT_ROLE):
@@ -626,6 +664,7 @@ class DocumentField(BaseField):
         self.owner_cls = owner_cls
 
     def get_document_cls(self, role=DEFAULT_ROLE):
+        set_deferred_owners()
         document_cls = maybe_resolve(self._document_cls, role)
         if isinstance(document_cls, string_types):
             if document_cls == RECURSIVE_REFERENCE_CONSTANT:
@@ -633,11 +672,44 @@ class DocumentField(BaseField):
                     raise ValueError('owner_cls is not set')
                 return self.owner_cls
             else:
+                name = document_cls
                 try:
-                    return registry.get_document(document_cls)
+                    document_cls = registry.get_document(name)
                 except KeyError:
                     if self.owner_cls is None:
                         raise ValueError('owner_cls is not set')
-                    return registry.get_document(document_cls, module=self.owner_cls.__module__)
+                    document_cls = registry.get_document(name, module=self.owner_cls.__module__)
+                # keep the document alive while the field is, even if it's registered weakly
+                self._resolved_documents[name] = document_cls
+                return document_cls
         else:
             return document_cls
+
+
+def _set_owner_to_document_fields(document_cls):
+    for field_ in document_cls.walk(through_document_fields=False,
+                                    visited_documents=frozenset([document_cls])):
+        if isinstance(field_, DocumentField):
+            field_.set_owner(document_cls)
+
+
+def defer_setting_owner(document_cls):
+    """Schedules making ``document_cls`` the owner of its :class:`DocumentField` s.
+    Owners of all the scheduled documents are set, in the order of scheduling,
+    right before the first :meth:`DocumentField.get_document_cls` call.
+    """
+    _documents_to_set_owner.append(weakref.ref(document_cls))
+
+
+def set_deferred_owners():
+    """Sets the owners scheduled by :func:`defer_setting_owner`."""
+    if not _documents_to_set_owner:
+        return
+    with _documents_to_set_owner_lock:
+        while _documents_to_set_owner:
+            # a document leaves the queue only after its fields are bound,
+            # so that other threads wait for the lock until then
+            document_cls = _documents_to_set_owner[0]()
+            if document_cls is not None:
+                _set_owner_to_document_fields(document_cls)
+            _documents_to_set_owner.popleft()
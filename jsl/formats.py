@@ -0,0 +1,165 @@
+# coding: utf-8
+"""
+Checkers of the string formats declared by :class:`.EmailField`, :class:`.IPv4Type`,
+:class:`.DateTimeField` and :class:`.UriField`.
+
+The date-time, email and URI checkers are hand-written rather than built on regular
+expressions or date parsing libraries: they only look at characters at fixed positions
+and use the string and set methods implemented in C (see ``benchmarks/format_checkers.py``).
+"""
+import re
+import string
+
+from .fields import EmailField, IPv4Type, DateTimeField, UriField
+from ._compat import iteritems
+
+
+_DIGITS = '0123456789'
+_HEX_DIGITS = frozenset(string.hexdigits)
+_WHITESPACE = frozenset(string.whitespace)
+_MAX_DAYS = {'01': '31', '02': '29', '03': '31', '04': '30', '05': '31', '06': '30',
+             '07': '31', '08': '31', '09': '30', '10': '31', '11': '30', '12': '31'}
+
+
+def _is_digits(value):
+    return bool(value) and not value.strip(_DIGITS)
+
+
+# a single match of an anonymous regular expression is faster in CPython than splitting
+# the string and converting the octets to integers
+_IPV4_REGEX = re.compile(r'(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}'
+                         r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\Z')
+
+
+def is_ipv4(instance):
+    """Returns if a string is an IPv4 address in the dotted-decimal notation.
+    Octets with leading zeros are rejected, as they are read as octal numbers by some software.
+    """
+    return _IPV4_REGEX.match(instance) is not None
+
+
+def _is_leap_year(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def is_date_time(instance):
+    """Returns if a string is a date-time as defined by RFC 3339, section 5.6,
+    such as ``1985-04-12T23:20:50.52Z`` or ``1996-12-19T16:39:57-08:00``.
+    """
+    # date-fullyear "-" date-month "-" date-mday "T" time-hour ":" time-minute ":" time-second
+    if len(instance) < 20 or instance[4] != '-' or instance[7] != '-' or instance[10] not in 'Tt' or \
+            instance[13] != ':' or instance[16] != ':':
+        return False
+    month, day = instance[5:7], instance[8:10]
+    hour, minute, second = instance[11:13], instance[14:16], instance[17:19]
+    if not _is_digits(instance[:4] + month + day + hour + minute + second):
+        return False
+    # the two-digit fields are compared as strings; a leap second is allowed
+    max_day = _MAX_DAYS.get(month)
+    if max_day is None or not '01' <= day <= max_day or hour > '23' or minute > '59' or second > '60' or \
+            (day == '29' and month == '02' and not _is_leap_year(int(instance[:4]))):
+        return False
+
+    offset = instance[19:]
+    if offset[0] == '.':
+        # time-secfrac
+        fraction_end = len(offset) - len(offset[1:].lstrip(_DIGITS))
+        if fraction_end == 1:
+            return False
+        offset = offset[fraction_end:]
+    if offset == 'Z' or offset == 'z':
+        return True
+    # ("+" / "-") time-hour ":" time-minute
+    return (len(offset) == 6 and offset[0] in '+-' and offset[3] == ':' and
+            _is_digits(offset[1:3] + offset[4:]) and offset[1:3] <= '23' and offset[4:] <= '59')
+
+
+def is_email(instance):
+    """Returns if a string looks like an email address: a non-empty local part
+    and a domain of non-empty labels, without whitespace.
+    """
+    local_part, at, domain = instance.rpartition('@')
+    if not at or not local_part or not domain or len(local_part) > 64 or len(domain) > 255:
+        return False
+    if not _WHITESPACE.isdisjoint(instance):
+        return False
+    return domain[0] != '.' and domain[-1] != '.' and '..' not in domain
+
+
+# unreserved, reserved (RFC 3986, section 2) and "%" of the percent-encoded octets
+_URI_CHARACTERS = frozenset(string.ascii_letters + string.digits + "-._~:/?#[]@!$&'()*+,;=%")
+_SCHEME_CHARACTERS = frozenset(string.ascii_letters + string.digits + '+-.')
+
+
+def is_uri(instance):
+    """Returns if a string is an absolute URI as defined by RFC 3986,
+    such as ``http://example.com/path?query#fragment``.
+    """
+    scheme, colon, rest = instance.partition(':')
+    if not colon or not scheme or scheme[0] not in string.ascii_letters or \
+            not _SCHEME_CHARACTERS.issuperset(scheme) or not _URI_CHARACTERS.issuperset(rest):
+        return False
+    position = rest.find('%')
+    while position != -1:
+        if rest[position + 1:position + 2] not in _HEX_DIGITS or rest[position + 2:position + 3] not in _HEX_DIGITS:
+            return False
+        position = rest.find('%', position + 3)
+    return True
+
+
+DEFAULT_CHECKERS = {
+    EmailField._FORMAT: is_email,
+    IPv4Type._FORMAT: is_ipv4,
+    DateTimeField._FORMAT: is_date_time,
+    UriField._FORMAT: is_uri,
+}
+"""The checkers of the formats of the jsl fields."""
+
+
+class FormatChecker(object):
+    """A collection of functions checking if a string is of a format. A format checker
+    passed to :class:`.validation.Validator` makes it check the ``format`` keyword;
+    the formats the checker does not know are not checked.
+
+    :param checkers:
+        A dict mapping formats to functions taking a string and returning a bool.
+        Defaults to :data:`DEFAULT_CHECKERS`.
+    :type checkers: dict
+    """
+
+    def __init__(self, checkers=None):
+        self.checkers = dict(DEFAULT_CHECKERS if checkers is None else checkers)
+
+    def register(self, format, function=None):
+        """Registers a function checking strings of ``format``.
+        Can be used as a decorator::
+
+            checker = FormatChecker()
+
+            @checker.register('even')
+            def is_even(instance):
+                return instance.isdigit() and int(instance) % 2 == 0
+        """
+        if function is None:
+            def decorator(function):
+                self.checkers[format] = function
+                return function
+            return decorator
+        self.checkers[format] = function
+        return function
+
+    def get_checker(self, format):
+        """Returns a function checking strings of ``format`` or None if the format is unknown."""
+        return self.checkers.get(format)
+
+    def get_key(self):
+        """Returns a hashable snapshot of the registered checkers. The validators compiled
+        by :meth:`.Document.get_validator` are shared by the format checkers with equal keys,
+        so registering a checker makes the document compile a new validator.
+        """
+        return frozenset(iteritems(self.checkers))
+
+    def conforms(self, instance, format):
+        """Returns if a string is of ``format``. Returns True if the format is unknown."""
+        checker = self.checkers.get(format)
+        return checker is None or checker(instance)
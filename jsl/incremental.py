@@ -0,0 +1,420 @@
+# coding: utf-8
+"""
+Validation of a single large JSON document while it's being parsed.
+
+The document is read from a stream chunk by chunk and turned into a sequence of
+parsing events. The events are checked against the schema as they arrive, so objects
+and arrays are never built in memory, except for the values that have to be seen
+as a whole: the ones validated against ``allOf``, ``anyOf``, ``oneOf``, ``not``,
+``enum`` or ``uniqueItems`` and the ones matched by several subschemas at once.
+"""
+import codecs
+import json
+import re
+
+from .roles import DEFAULT_ROLE
+from .validation import ValidationError
+from ._compat import iteritems, string_types
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+SCALAR = 'scalar'
+START_MAP = 'start_map'
+MAP_KEY = 'map_key'
+END_MAP = 'end_map'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*"')
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+_NUMBER_CHARS = re.compile(r'[-+0-9.eE]*')
+_LITERALS = (('true', True), ('false', False), ('null', None))
+
+
+def _decode_string(token):
+    return json.loads(token) if '\\' in token else token[1:-1]
+
+
+class _Tokenizer(object):
+    """Splits a stream of JSON text into tokens."""
+
+    def __init__(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self.offset = 0
+        """The number of characters before the current position."""
+
+    def _read(self):
+        chunk = self._stream.read(self._chunk_size)
+        if isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self._eof = True
+        self.offset += self._position
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return text
+
+    def _error(self):
+        return ValueError('Invalid JSON at character {0}'.format(self.offset + self._position))
+
+    def __iter__(self):
+        while True:
+            position = self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            buffer = self._buffer
+            if position == len(buffer):
+                if self._eof:
+                    return
+                self._read()
+                continue
+            char = buffer[position]
+            if char in '{}[]:,':
+                self._position = position + 1
+                yield char, None
+            elif char == '"':
+                match = _STRING.match(buffer, position)
+                while match is None and not self._eof:
+                    # the string may be incomplete, read until a quote which may close it
+                    while '"' not in self._read() and not self._eof:
+                        pass
+                    buffer = self._buffer
+                    match = _STRING.match(buffer, 0)
+                if match is None:
+                    raise self._error()
+                self._position = match.end()
+                yield SCALAR, _decode_string(match.group())
+            elif char == '-' or '0' <= char <= '9':
+                while _NUMBER_CHARS.match(buffer, self._position).end() == len(buffer) and not self._eof:
+                    # the number may continue in the next chunk
+                    self._read()
+                    buffer = self._buffer
+                match = _NUMBER.match(buffer, self._position)
+                if match is None:
+                    raise self._error()
+                self._position = match.end()
+                token = match.group()
+                yield SCALAR, float(token) if match.group(1) or match.group(2) else int(token)
+            else:
+                for name, value in _LITERALS:
+                    while len(buffer) - self._position < len(name) and \
+                            name.startswith(buffer[self._position:]) and not self._eof:
+                        self._read()
+                        buffer = self._buffer
+                    if buffer.startswith(name, self._position):
+                        self._position += len(name)
+                        yield SCALAR, value
+                        break
+                else:
+                    raise self._error()
+
+
+_VALUE, _VALUE_OR_END, _KEY, _KEY_OR_END, _COLON, _COMMA_OR_END, _DONE = range(7)
+
+
+def iter_events(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Parses JSON text from a stream (opened in binary or text mode)
+    and yields parsing events: ``(event, value)`` pairs, where the event is one of
+    :data:`SCALAR`, :data:`START_MAP`, :data:`MAP_KEY`, :data:`END_MAP`,
+    :data:`START_ARRAY` and :data:`END_ARRAY`.
+
+    :raises: ValueError if the text is not valid JSON
+    """
+    tokenizer = _Tokenizer(stream, chunk_size=chunk_size)
+    stack = []
+    state = _VALUE
+    for token, value in tokenizer:
+        if state == _DONE:
+            raise tokenizer._error()
+        elif state == _COLON:
+            if token != ':':
+                raise tokenizer._error()
+            state = _VALUE
+            continue
+        elif state == _KEY or state == _KEY_OR_END:
+            if token == '}' and state == _KEY_OR_END:
+                stack.pop()
+                yield END_MAP, None
+            elif token == SCALAR and isinstance(value, string_types):
+                yield MAP_KEY, value
+                state = _COLON
+                continue
+            else:
+                raise tokenizer._error()
+        elif state == _COMMA_OR_END:
+            if token == ',':
+                state = _KEY if stack[-1] == '{' else _VALUE
+                continue
+            elif token == '}' and stack[-1] == '{':
+                stack.pop()
+                yield END_MAP, None
+            elif token == ']' and stack[-1] == '[':
+                stack.pop()
+                yield END_ARRAY, None
+            else:
+                raise tokenizer._error()
+        elif token == ']' and state == _VALUE_OR_END:
+            stack.pop()
+            yield END_ARRAY, None
+        elif token == '{':
+            stack.append('{')
+            yield START_MAP, None
+            state = _KEY_OR_END
+            continue
+        elif token == '[':
+            stack.append('[')
+            yield START_ARRAY, None
+            state = _VALUE_OR_END
+            continue
+        elif token == SCALAR:
+            yield SCALAR, value
+        else:
+            raise tokenizer._error()
+        # a value has ended
+        state = _COMMA_OR_END if stack else _DONE
+    if state != _DONE:
+        raise ValueError('Unexpected end of JSON')
+
+
+def _build(event, value, events):
+    """Builds a value starting with ``event``, consuming its events."""
+    if event == SCALAR:
+        return value
+    root = {} if event == START_MAP else []
+    stack = [root]
+    key = None
+    keys = []
+    for event, value in events:
+        container = stack[-1]
+        if event == MAP_KEY:
+            key = value
+            continue
+        if event == END_MAP or event == END_ARRAY:
+            stack.pop()
+            if not stack:
+                return root
+            key = keys.pop()
+            continue
+        if event == SCALAR:
+            item = value
+        else:
+            item = {} if event == START_MAP else []
+        if isinstance(container, dict):
+            container[key] = item
+        else:
+            container.append(item)
+        if event != SCALAR:
+            keys.append(key)
+            stack.append(item)
+
+
+def _skip(event, events):
+    """Consumes the events of a value starting with ``event``."""
+    if event == SCALAR:
+        return
+    depth = 1
+    for event, _ in events:
+        if event == START_MAP or event == START_ARRAY:
+            depth += 1
+        elif event == END_MAP or event == END_ARRAY:
+            depth -= 1
+            if not depth:
+                return
+
+
+_MATERIALIZED_KEYWORDS = ('enum', 'allOf', 'anyOf', 'oneOf', 'not')
+
+
+class _Plan(object):
+    """The parts of a schema used to validate objects and arrays, prepared once."""
+    __slots__ = ('schema', 'materialize', 'types', 'properties', 'patterns',
+                 'additional_properties', 'required', 'required_set')
+
+    def __init__(self, validator, schema):
+        while '$ref' in schema:
+            schema = validator.resolve(schema['$ref'])
+        self.schema = schema
+        self.materialize = (any(keyword in schema for keyword in _MATERIALIZED_KEYWORDS) or
+                            bool(schema.get('uniqueItems')))
+        types = schema.get('type')
+        self.types = [types] if isinstance(types, string_types) else types
+        self.properties = schema.get('properties', {})
+        self.patterns = [(re.compile(pattern), subschema)
+                         for pattern, subschema in iteritems(schema.get('patternProperties', {}))]
+        self.additional_properties = schema.get('additionalProperties', True)
+        self.required = schema.get('required', ())
+        self.required_set = frozenset(self.required)
+
+
+class IncrementalValidator(object):
+    """Validates JSON documents while parsing them, against the schema
+    of a :class:`.validation.Validator`. Finds the same errors as
+    :meth:`.validation.Validator.get_errors` (the same paths and keywords), though
+    not necessarily in the same order; the invalid objects and arrays are
+    abbreviated in the error messages.
+
+    :type validator: :class:`.validation.Validator`
+    """
+
+    def __init__(self, validator):
+        self.validator = validator
+        self._plans = {}
+
+    def iter_errors(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yields :class:`.validation.ValidationError` s of a document read from ``stream``
+        as soon as they are found.
+
+        :raises: ValueError if the stream does not contain valid JSON
+        """
+        events = iter_events(stream, chunk_size=chunk_size)
+        for event, value in events:
+            for error in self._iter_value_errors(event, value, events, self.validator.schema, []):
+                yield error
+
+    def is_valid(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Returns if a document read from ``stream`` is valid.
+        Stops reading at the first error.
+        """
+        for _ in self.iter_errors(stream, chunk_size=chunk_size):
+            return False
+        return True
+
+    def _get_plan(self, schema):
+        plan = self._plans.get(id(schema))
+        if plan is None:
+            plan = self._plans[id(schema)] = _Plan(self.validator, schema)
+        return plan
+
+    def _iter_node_errors(self, instance, schema, path):
+        node = self.validator.compile(schema)
+        if not node.validate(instance, None, None):
+            errors = []
+            node.validate(instance, tuple(path), errors)
+            for error in errors:
+                yield error
+
+    def _iter_value_errors(self, event, value, events, schema, path):
+        if event == SCALAR:
+            return self._iter_node_errors(value, schema, path)
+        plan = self._get_plan(schema)
+        if plan.materialize:
+            return self._iter_node_errors(_build(event, value, events), plan.schema, path)
+        if event == START_MAP:
+            return self._iter_object_errors(events, plan, path)
+        return self._iter_array_errors(events, plan, path)
+
+    def _iter_type_errors(self, plan, type_, description, path):
+        if plan.types is not None and type_ not in plan.types:
+            yield ValidationError('{0} is not of type {1}'.format(
+                description, ', '.join(repr(t) for t in plan.types)), path, 'type')
+
+    def _iter_object_errors(self, events, plan, path):
+        for error in self._iter_type_errors(plan, 'object', '<object>', path):
+            yield error
+        schema = plan.schema
+        properties = plan.properties
+        patterns = plan.patterns
+        additional_properties = plan.additional_properties
+        required = plan.required
+        required_set = plan.required_set
+        found = set()
+        extras = []
+        count = 0
+        for event, key in events:
+            if event == END_MAP:
+                break
+            event, value = next(events)
+            count += 1
+            if key in required_set:
+                found.add(key)
+            subschemas = []
+            if key in properties:
+                subschemas.append(properties[key])
+            for regex, subschema in patterns:
+                if regex.search(key):
+                    subschemas.append(subschema)
+            if not subschemas:
+                if additional_properties is False:
+                    extras.append(key)
+                elif isinstance(additional_properties, dict):
+                    subschemas.append(additional_properties)
+            path.append(key)
+            if not subschemas:
+                _skip(event, events)
+            elif len(subschemas) == 1:
+                for error in self._iter_value_errors(event, value, events, subschemas[0], path):
+                    yield error
+            else:
+                instance = _build(event, value, events)
+                for subschema in subschemas:
+                    for error in self._iter_node_errors(instance, subschema, path):
+                        yield error
+            path.pop()
+
+        for prop in required:
+            if prop not in found:
+                yield ValidationError('{0!r} is a required property'.format(prop), path, 'required')
+        if extras:
+            yield ValidationError('Additional properties are not allowed ({0} {1} unexpected)'.format(
+                ', '.join(repr(extra) for extra in extras),
+                'was' if len(extras) == 1 else 'were'), path, 'additionalProperties')
+        if 'minProperties' in schema and count < schema['minProperties']:
+            yield ValidationError('<object> does not have enough properties', path, 'minProperties')
+        if 'maxProperties' in schema and count > schema['maxProperties']:
+            yield ValidationError('<object> has too many properties', path, 'maxProperties')
+
+    def _iter_array_errors(self, events, plan, path):
+        for error in self._iter_type_errors(plan, 'array', '<array>', path):
+            yield error
+        schema = plan.schema
+        items = schema.get('items', {})
+        additional_items = schema.get('additionalItems', True)
+        extras = 0
+        count = 0
+        for event, value in events:
+            if event == END_ARRAY:
+                break
+            if isinstance(items, dict):
+                subschema = items
+            elif count < len(items):
+                subschema = items[count]
+            elif isinstance(additional_items, dict):
+                subschema = additional_items
+            else:
+                subschema = None
+                if additional_items is False:
+                    extras += 1
+            path.append(count)
+            if subschema is None:
+                _skip(event, events)
+            else:
+                for error in self._iter_value_errors(event, value, events, subschema, path):
+                    yield error
+            path.pop()
+            count += 1
+
+        if extras:
+            yield ValidationError('Additional items are not allowed ({0} unexpected)'.format(extras),
+                                  path, 'additionalItems')
+        if 'minItems' in schema and count < schema['minItems']:
+            yield ValidationError('<array> is too short', path, 'minItems')
+        if 'maxItems' in schema and count > schema['maxItems']:
+            yield ValidationError('<array> is too long', path, 'maxItems')
+
+
+def iter_errors(stream, document_cls, role=DEFAULT_ROLE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Validates a JSON document read from ``stream`` against the schema of
+    ``document_cls`` for ``role`` without building the document in memory
+    (see :class:`IncrementalValidator`) and yields :class:`.validation.ValidationError` s.
+
+    :raises: ValueError if the stream does not contain valid JSON
+    """
+    validator = IncrementalValidator(document_cls.get_validator(role=role))
+    return validator.iter_errors(stream, chunk_size=chunk_size)
@@ -0,0 +1,58 @@
+# coding: utf-8
+"""
+Schema generation modes.
+"""
+import contextlib
+import json
+import threading
+
+
+DOCUMENTATION_MODE = 'documentation'
+"""The default mode: schemas contain the annotations (``title``, ``description``
+and ``default``)."""
+WIRE_MODE = 'wire'
+"""A compact mode for schemas that are only used for validation:
+the annotations are omitted."""
+
+MODES = (DOCUMENTATION_MODE, WIRE_MODE)
+
+_local = threading.local()
+
+
+def get_current_mode():
+    """Returns the mode of the schema generation running in the current thread."""
+    return getattr(_local, 'mode', DOCUMENTATION_MODE)
+
+
+def includes_annotations():
+    """Returns if the schema generation running in the current thread
+    must include the annotations.
+    """
+    return get_current_mode() != WIRE_MODE
+
+
+@contextlib.contextmanager
+def apply_mode(mode):
+    """A context manager applying ``mode`` to schema generations in the current thread.
+
+    :raises: ValueError if the mode is unknown
+    """
+    if mode not in MODES:
+        raise ValueError('Unknown mode: {0!r}'.format(mode))
+    previous_mode = get_current_mode()
+    _local.mode = mode
+    try:
+        yield mode
+    finally:
+        _local.mode = previous_mode
+
+
+def dumps(schema, mode=DOCUMENTATION_MODE):
+    """Serializes ``schema`` to a JSON string. In :data:`WIRE_MODE`
+    the string is minified.
+    """
+    if mode not in MODES:
+        raise ValueError('Unknown mode: {0!r}'.format(mode))
+    if mode == WIRE_MODE:
+        return json.dumps(schema, separators=(',', ':'))
+    return json.dumps(schema)
@@ -0,0 +1,130 @@
+# coding: utf-8
+"""
+Validation of large files of JSON documents (one per line) by a pool of processes.
+"""
+import mmap
+import multiprocessing
+import os
+
+from . import modes
+from .roles import DEFAULT_ROLE
+from .streaming import check_line
+from .validation import Validator
+
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# the state of a worker process, see :func:`_init_worker`
+_validator = None
+_files = {}
+
+
+def split_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Splits a file into byte ranges of about ``chunk_size`` bytes, every range
+    ending right after a newline (or at the end of the file).
+
+    :rtype: list of (start, end) tuples
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    ranges = []
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                if end < size:
+                    newline = data.find(b'\n', end - 1)
+                    end = size if newline == -1 else newline + 1
+                ranges.append((start, end))
+                start = end
+        finally:
+            data.close()
+    return ranges
+
+
+def _init_worker(schema):
+    """Compiles the validator once per worker process."""
+    global _validator
+    _validator = Validator(schema)
+
+
+def _get_mmap(path):
+    # every worker maps the file once and reads the ranges from the shared page cache
+    if path not in _files:
+        f = open(path, 'rb')
+        _files[path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _files[path][1]
+
+
+def _validate_range(args):
+    """Validates lines in a byte range of a file by the validator of the worker
+    process (see :func:`_validate_lines`).
+    """
+    path, start, end = args
+    return _validate_lines(_validator, _get_mmap(path), start, end)
+
+
+def _validate_lines(validator, data, start, end):
+    """Validates lines in a byte range of ``data``. Returns a number of the lines
+    and a list of (line number within the range, errors) pairs.
+    """
+    results = []
+    line_count = 0
+    position = start
+    while position < end:
+        newline = data.find(b'\n', position, end)
+        line_end = end if newline == -1 else newline + 1
+        line_count += 1
+        errors = check_line(validator, data[position:line_end])
+        if errors is not None:
+            results.append((line_count, errors))
+        position = line_end
+    return line_count, results
+
+
+def iter_file_errors(path, document_cls, role=DEFAULT_ROLE, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """The same as :func:`.streaming.iter_file_errors`, but the file is split into
+    chunks of about ``chunk_size`` bytes on line boundaries and the chunks are
+    validated by a pool of ``processes`` processes (the number of CPUs by default).
+    Yields (line number, errors) pairs in the order of lines.
+
+    Every worker compiles the validator once and reads the file through a memory
+    map, so no data but the results is passed between the processes.
+    """
+    schema = document_cls.get_cached_schema(role=role, mode=modes.WIRE_MODE)
+    ranges = [(path, start, end) for start, end in split_file(path, chunk_size=chunk_size)]
+    if processes == 1:
+        # validated in this process, which may validate other files in other threads,
+        # so neither the validator nor the map is kept in the globals of the module
+        if not ranges:
+            return
+        validator = document_cls.get_validator(role=role)
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                results = (_validate_lines(validator, data, start, end) for _, start, end in ranges)
+                for line_number, errors in _merge(results):
+                    yield line_number, errors
+            finally:
+                data.close()
+        return
+
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(schema,))
+    try:
+        for line_number, errors in _merge(pool.imap(_validate_range, ranges)):
+            yield line_number, errors
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _merge(results):
+    """Turns line numbers within the ranges into line numbers within the file."""
+    offset = 0
+    for line_count, range_results in results:
+        for line_number, errors in range_results:
+            yield offset + line_number, errors
+        offset += line_count
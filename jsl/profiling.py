@@ -0,0 +1,214 @@
+# coding: utf-8
+"""
+Opt-in instrumentation of schema generation.
+
+Example::
+
+    from jsl.profiling import profile
+
+    with profile() as profiler:
+        Task.get_schema()
+    print(profiler.format_table())
+    with open('schema.folded', 'w') as f:
+        f.write(profiler.format_collapsed_stacks())
+
+The instrumentation is installed by patching ``get_definitions_and_schema``
+of :class:`~.Document` and the field classes only while the profiler is active,
+so it adds no overhead otherwise. Only the schemas generated by the thread
+that has started the profiler are recorded.
+"""
+import threading
+import timeit
+
+from .document import Document
+from .fields import BaseField
+from ._compat import iteritems, itervalues
+
+
+_METHOD_NAME = 'get_definitions_and_schema'
+
+
+def _iter_subclasses(cls):
+    yield cls
+    for subclass in cls.__subclasses__():
+        for subclass_ in _iter_subclasses(subclass):
+            yield subclass_
+
+
+def count_nodes(value):
+    """Returns the number of JSON values in ``value``, including itself."""
+    if isinstance(value, dict):
+        return 1 + sum(count_nodes(v) for v in itervalues(value))
+    if isinstance(value, (list, tuple)):
+        return 1 + sum(count_nodes(v) for v in value)
+    return 1
+
+
+class Stats(object):
+    """Statistics of the calls made for a document or a field type.
+
+    :ivar calls: a number of calls
+    :ivar cumulative_time: a total time spent in the calls, in seconds
+    :ivar self_time: the same, excluding the time of the nested profiled calls
+    :ivar output_nodes: a total number of JSON values in the schemas and definitions
+        returned by the calls (see :func:`count_nodes`)
+    """
+    __slots__ = ('calls', 'cumulative_time', 'self_time', 'output_nodes')
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        self.output_nodes = 0
+
+
+class _Frame(object):
+    __slots__ = ('key', 'target', 'children_time')
+
+    def __init__(self, key, target):
+        self.key = key
+        self.target = target
+        self.children_time = 0.0
+
+
+class Profiler(object):
+    """Records timings of ``get_definitions_and_schema`` calls per document
+    and per field type made by the thread that has started the profiler.
+    Usually created by :func:`profile`.
+
+    :ivar stats:
+        A dictionary mapping keys to :class:`Stats`. A key is either
+        ``('document', <definition id>)`` or ``('field', <field class name>)``.
+    """
+    _active = None
+    _active_lock = threading.Lock()
+
+    def __init__(self, timer=timeit.default_timer):
+        self.stats = {}
+        self.stacks = {}
+        self._timer = timer
+        self._local = threading.local()
+        self._patches = []
+        self._thread = None
+
+    def _get_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _call(self, key, target, func, args, kwargs):
+        stack = self._get_stack()
+        if stack and stack[-1].target is target:
+            # a super() call from an overridden method, it's already being measured
+            return func(*args, **kwargs)
+        frame = _Frame(key, target)
+        stack.append(frame)
+        start = self._timer()
+        try:
+            rv = func(*args, **kwargs)
+        finally:
+            elapsed = self._timer() - start
+            stack.pop()
+            if stack:
+                stack[-1].children_time += elapsed
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = Stats()
+            stats.calls += 1
+            stats.cumulative_time += elapsed
+            stats.self_time += elapsed - frame.children_time
+            path = tuple(f.key for f in stack) + (key,)
+            self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - frame.children_time
+        definitions, schema = rv
+        stats.output_nodes += count_nodes(schema) + sum(count_nodes(d) for d in itervalues(definitions))
+        return rv
+
+    def _patch_document_cls(self, cls):
+        original = cls.__dict__[_METHOD_NAME]
+        func = original.__func__
+        profiler = self
+
+        def get_definitions_and_schema(document_cls, *args, **kwargs):
+            if threading.current_thread() is not profiler._thread:
+                return func(document_cls, *args, **kwargs)
+            key = ('document', document_cls.get_definition_id())
+            return profiler._call(key, document_cls, func, (document_cls,) + args, kwargs)
+        setattr(cls, _METHOD_NAME, classmethod(get_definitions_and_schema))
+        self._patches.append((cls, original))
+
+    def _patch_field_cls(self, cls):
+        original = cls.__dict__[_METHOD_NAME]
+        profiler = self
+
+        def get_definitions_and_schema(field, *args, **kwargs):
+            if threading.current_thread() is not profiler._thread:
+                return original(field, *args, **kwargs)
+            key = ('field', type(field).__name__)
+            return profiler._call(key, field, original, (field,) + args, kwargs)
+        setattr(cls, _METHOD_NAME, get_definitions_and_schema)
+        self._patches.append((cls, original))
+
+    def start(self):
+        """Installs the instrumentation. The instrumentation is process-wide,
+        but the calls made by the other threads are not recorded, so that
+        :attr:`stats` are only modified by the current thread.
+
+        :raises: RuntimeError if another profiler is active
+        """
+        with self._active_lock:
+            if Profiler._active is not None:
+                raise RuntimeError('Another profiler is already active.')
+            Profiler._active = self
+        self._thread = threading.current_thread()
+        for cls in _iter_subclasses(Document):
+            if _METHOD_NAME in cls.__dict__:
+                self._patch_document_cls(cls)
+        for cls in _iter_subclasses(BaseField):
+            if _METHOD_NAME in cls.__dict__:
+                self._patch_field_cls(cls)
+
+    def stop(self):
+        """Removes the instrumentation."""
+        while self._patches:
+            cls, original = self._patches.pop()
+            setattr(cls, _METHOD_NAME, original)
+        self._thread = None
+        with self._active_lock:
+            Profiler._active = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def format_table(self, sort_by='self_time'):
+        """Returns the statistics formatted as a text table,
+        sorted by the ``sort_by`` attribute of :class:`Stats` in descending order.
+        """
+        lines = ['{0:<8} {1:<40} {2:>8} {3:>12} {4:>12} {5:>12}'.format(
+            'kind', 'name', 'calls', 'cumul., ms', 'self, ms', 'out. nodes')]
+        items = sorted(iteritems(self.stats), key=lambda item: getattr(item[1], sort_by),
+                       reverse=True)
+        for (kind, name), stats in items:
+            lines.append('{0:<8} {1:<40} {2:>8} {3:>12.3f} {4:>12.3f} {5:>12}'.format(
+                kind, name, stats.calls, stats.cumulative_time * 1e3,
+                stats.self_time * 1e3, stats.output_nodes))
+        return '\n'.join(lines)
+
+    def format_collapsed_stacks(self):
+        """Returns the self time of every call stack (in microseconds) in the "collapsed"
+        format understood by flame graph tools: one ``frame;frame;frame value`` line per stack.
+        """
+        lines = []
+        for path, self_time in sorted(iteritems(self.stacks)):
+            frames = ';'.join('{0}:{1}'.format(kind, name) for kind, name in path)
+            lines.append('{0} {1}'.format(frames, int(round(self_time * 1e6))))
+        return '\n'.join(lines) + '\n'
+
+
+def profile(timer=timeit.default_timer):
+    """Returns a :class:`Profiler` to be used as a context manager."""
+    return Profiler(timer=timer)
@@ -0,0 +1,66 @@
+# coding: utf-8
+"""
+Projection of instances onto the properties a role sees, such as stripping
+the fields a role must not see from outgoing JSON.
+"""
+from ._compat import iteritems
+from ._compile import FieldCompiler
+from .roles import DEFAULT_ROLE
+
+
+def compile_projector(document_cls, role=DEFAULT_ROLE):
+    """Returns a function that, given an instance of the document, returns a new dict
+    containing only the properties present in the document schema for ``role``.
+    See :meth:`.Document.compile_projector`.
+    """
+    return _Compiler().compile_document(document_cls, role)
+
+
+class _Compiler(FieldCompiler):
+    """Builds a projector of every field: a function returning a new value
+    which contains only the properties the role sees.
+    """
+
+    def _make_dict_function(self, properties, declared, pattern_properties, allows_additional,
+                            additional_function):
+        properties = [(prop, projector) for prop, _, _, projector in properties]
+
+        def project(value):
+            if not isinstance(value, dict):
+                return value
+            result = {}
+            for prop, projector in properties:
+                if prop in value:
+                    result[prop] = value[prop] if projector is None else projector(value[prop])
+            if pattern_properties or allows_additional:
+                for prop, prop_value in iteritems(value):
+                    if prop in declared:
+                        continue
+                    for regex, projector in pattern_properties:
+                        if regex.search(prop):
+                            result[prop] = prop_value if projector is None else projector(prop_value)
+                            break
+                    else:
+                        if allows_additional:
+                            result[prop] = (prop_value if additional_function is None
+                                            else additional_function(prop_value))
+            return result
+        return project
+
+    def _make_tuple_function(self, item_functions, additional_function):
+        def project(value):
+            if not isinstance(value, list):
+                return value
+            result = []
+            for index, item in enumerate(value):
+                projector = item_functions[index] if index < len(item_functions) else additional_function
+                result.append(item if projector is None else projector(item))
+            return result
+        return project
+
+    def _make_list_function(self, function):
+        def project(value):
+            if not isinstance(value, list):
+                return value
+            return [function(item) for item in value]
+        return project
@@ -1,31 +1,93 @@
 # coding: utf-8
-from ._compat import itervalues
+"""
+A registry of documents, used to resolve documents referenced by name.
+
+Documents are referenced strongly by default. A document registered with
+``weak=True`` (as the documents created by :class:`.factory.DocumentFactory` are)
+is referenced weakly: once it is not used anywhere else, it is garbage-collected
+along with its cached schemas and leaves the registry.
+"""
+import functools
+import threading
+import weakref
 
 
 _documents_registry = {}
+_lock = threading.RLock()
+_version = 0
+
+
+def _mark_changed():
+    global _version
+    _version += 1
+
+
+def get_version():
+    """Returns a number that changes every time a bound name is rebound to another
+    document or removed. Registering a new name does not change it. Used to invalidate
+    values derived from the registered documents.
+    """
+    return _version
+
+
+def _release(name, reference):
+    # called when a weakly registered document is garbage-collected. A document
+    # resolved by name is kept alive by the fields that resolved it (see
+    # :meth:`.DocumentField.get_document_cls`), so nothing derived from it is left
+    # and the version stays the same
+    with _lock:
+        if _documents_registry.get(name) is reference:
+            del _documents_registry[name]
+
+
+def _resolve(value):
+    return value() if isinstance(value, weakref.ref) else value
 
 
 def get_document(name, module=None):
     if module:
         name = '{0}.{1}'.format(module, name)
-    return _documents_registry[name]
+    document_cls = _resolve(_documents_registry[name])
+    if document_cls is None:
+        # collected, but the callback has not removed the entry yet
+        raise KeyError(name)
+    return document_cls
+
 
+def put_document(name, document_cls, module=None, weak=False):
+    """Registers ``document_cls`` under ``name``.
 
-def put_document(name, document_cls, module=None):
+    :param weak:
+        If True, the registry references the document weakly.
+    :type weak: bool
+    """
     if module:
         name = '{0}.{1}'.format(module, name)
-    _documents_registry[name] = document_cls
+    with _lock:
+        existing_cls = _resolve(_documents_registry.get(name))
+        if existing_cls is not None and existing_cls is not document_cls:
+            _mark_changed()
+        if weak:
+            _documents_registry[name] = weakref.ref(document_cls, functools.partial(_release, name))
+        else:
+            _documents_registry[name] = document_cls
 
 
 def remove_document(name, module=None):
     if module:
         name = '{0}.{1}'.format(module, name)
-    del _documents_registry[name]
+    with _lock:
+        del _documents_registry[name]
+        _mark_changed()
 
 
 def iter_documents():
-    return itervalues(_documents_registry)
+    with _lock:
+        documents = [_resolve(value) for value in _documents_registry.values()]
+    return iter([document_cls for document_cls in documents if document_cls is not None])
 
 
 def clear():
-    _documents_registry.clear()
\ No newline at end of file
+    with _lock:
+        _documents_registry.clear()
+        _mark_changed()
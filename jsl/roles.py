@@ -1,5 +1,5 @@
 # coding: utf-8
-from ._compat import itervalues, OrderedDict, iteritems
+from ._compat import itervalues, OrderedDict, iteritems, string_types
 
 
 DEFAULT_ROLE = 'default'
@@ -7,6 +7,8 @@ DEFAULT_ROLE = 'default'
 
 
 class BaseVar(object):
+    __slots__ = ()
+
     def resolve(self, role):
         raise NotImplementedError()
 
@@ -15,6 +17,8 @@ class Var(BaseVar):
     """
     :type values: dict or list of key-value tuples
     """
+    __slots__ = ('values', 'roles_to_pass_down')
+
     def __init__(self, values=None, roles_to_pass_down=(), **kwargs):
         self.values = kwargs if values is None else values
         self.roles_to_pass_down = roles_to_pass_down
@@ -24,16 +28,18 @@ class Var(BaseVar):
             if isinstance(role, Not):
                 if role != role_to_resolve:
                     return value
-            elif isinstance(role, basestring) and role == role_to_resolve:
+            elif isinstance(role, string_types) and role == role_to_resolve:
                 return value
         return None
 
 
 class Not(str):
-    pass
+    __slots__ = ()
 
 
 class IfNot(BaseVar):
+    __slots__ = ('role', 'value', 'roles_to_pass_down')
+
     def __init__(self, role, value, roles_to_pass_down=()):
         self.role = role
         self.value = value
@@ -16,6 +16,8 @@ class ResolutionScope(object):
         the current schema.
     :type output: URI, string
     """
+    __slots__ = ('_base', '_current', '_output')
+
     def __init__(self, base='', current='', output=''):
         self._base, _ = urldefrag(base)
         self._current, _ = urldefrag(current)
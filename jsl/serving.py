@@ -0,0 +1,342 @@
+# coding: utf-8
+"""
+Utilities for serving schemas over HTTP.
+"""
+import hashlib
+import threading
+import weakref
+import zlib
+
+from . import modes, registry
+from .cache import SingleFlightCache
+from .roles import DEFAULT_ROLE
+from ._compat import iteritems, parse_qs, OrderedDict
+
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+ENCODINGS = (GZIP, DEFLATE)
+"""Content codings the bodies are precompressed with, in the order of preference."""
+
+
+def _compress(body, encoding, level):
+    if encoding == GZIP:
+        # a gzip container without a timestamp, so the output is deterministic
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif encoding == DEFLATE:
+        # the "deflate" content coding is the zlib format
+        compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS)
+    else:
+        raise ValueError('Unknown encoding: {0!r}'.format(encoding))
+    return compressor.compress(body) + compressor.flush()
+
+
+class SchemaArtifact(object):
+    """A serialized schema ready to be sent: the UTF-8 encoded JSON
+    and its precompressed variants.
+
+    :ivar fingerprint: a SHA-1 hex digest of the JSON
+    """
+    __slots__ = ('body', 'fingerprint', '_encoded_bodies')
+
+    def __init__(self, body, compression_level=6):
+        self.body = body
+        self.fingerprint = hashlib.sha1(body).hexdigest()
+        self._encoded_bodies = dict((encoding, _compress(body, encoding, compression_level))
+                                    for encoding in ENCODINGS)
+
+    @classmethod
+    def from_schema(cls, schema, mode=modes.DOCUMENTATION_MODE, compression_level=6):
+        """Serializes ``schema`` (see :func:`.modes.dumps`) into an artifact."""
+        return cls(modes.dumps(schema, mode=mode).encode('utf-8'),
+                   compression_level=compression_level)
+
+    def get_body(self, encoding=None):
+        """Returns the body encoded with ``encoding`` (one of :data:`ENCODINGS`)
+        or the identity body if ``encoding`` is None.
+        """
+        if encoding is None:
+            return self.body
+        try:
+            return self._encoded_bodies[encoding]
+        except KeyError:
+            raise ValueError('Unknown encoding: {0!r}'.format(encoding))
+
+    def get_etag(self, encoding=None):
+        """Returns a strong ETag of the body encoded with ``encoding``.
+        Every encoding gets its own ETag, as the encoded bodies differ.
+        """
+        if encoding is None:
+            return '"{0}"'.format(self.fingerprint)
+        if encoding not in self._encoded_bodies:
+            raise ValueError('Unknown encoding: {0!r}'.format(encoding))
+        return '"{0}-{1}"'.format(self.fingerprint, encoding)
+
+    @property
+    def size(self):
+        """The number of bytes taken by the body and its encoded variants."""
+        return len(self.body) + sum(len(body) for body in self._encoded_bodies.values())
+
+
+class SchemaArtifactCache(object):
+    """A cache of :class:`SchemaArtifact` s of document schemas keyed by
+    (document, role, mode). Least recently used artifacts are evicted once
+    any of the limits is exceeded. The cache is invalidated when a change of
+    the registry may change how the document names resolve (see
+    :func:`.registry.get_version`). The documents are referenced weakly.
+
+    :param maxsize:
+        The maximum number of artifacts.
+    :type maxsize: int
+    :param max_bytes:
+        The maximum total size of artifacts (see :attr:`SchemaArtifact.size`).
+        An artifact larger than that is returned, but not cached.
+    :type max_bytes: int
+    :param compression_level:
+        A zlib compression level, from 1 to 9.
+    :type compression_level: int
+    """
+
+    def __init__(self, maxsize=256, max_bytes=None, compression_level=6):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self._artifacts = OrderedDict()
+        self._version = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._generations = SingleFlightCache()
+
+    def get(self, document_cls, role=DEFAULT_ROLE, mode=modes.DOCUMENTATION_MODE):
+        """Returns an artifact of the schema of ``document_cls`` (see :meth:`.Document.get_schema`),
+        creating it if needed.
+        """
+        key = (weakref.ref(document_cls), role, mode)
+        version = registry.get_version()
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            artifact = self._artifacts.pop(key, None)
+            if artifact is not None:
+                # reinsert to mark the artifact as the most recently used
+                self._artifacts[key] = artifact
+                return artifact
+
+        # generating a schema may take a while, so it's done without holding the lock;
+        # concurrent callers wait for a single generation. The schema is not kept
+        # in the cache of the document, so only this cache's limits bound the memory
+        return self._generations.call(key, lambda: self._create(key, document_cls, role, mode, version))
+
+    def _create(self, key, document_cls, role, mode, version):
+        artifact = SchemaArtifact.from_schema(
+            document_cls.get_schema(role=role, mode=mode),
+            mode=mode, compression_level=self.compression_level)
+
+        with self._lock:
+            if version != self._version:
+                # the registry has changed in the meantime
+                return artifact
+            if self.max_bytes is not None and artifact.size > self.max_bytes:
+                return artifact
+            existing_artifact = self._artifacts.pop(key, None)
+            if existing_artifact is not None:
+                self._size -= existing_artifact.size
+            self._artifacts[key] = artifact
+            self._size += artifact.size
+            self._evict()
+        return artifact
+
+    def _evict(self):
+        while self._artifacts and (
+                len(self._artifacts) > self.maxsize or
+                (self.max_bytes is not None and self._size > self.max_bytes)):
+            _, artifact = self._artifacts.popitem(last=False)
+            self._size -= artifact.size
+
+    def _clear(self):
+        self._artifacts.clear()
+        self._size = 0
+
+    def clear(self):
+        """Removes all the cached artifacts."""
+        with self._lock:
+            self._clear()
+
+    @property
+    def size(self):
+        """The total size of the cached artifacts, in bytes."""
+        return self._size
+
+    def __len__(self):
+        return len(self._artifacts)
+
+
+def choose_encoding(accept_encoding):
+    """Returns the most preferred of :data:`ENCODINGS` acceptable according to
+    the ``Accept-Encoding`` header value or None if none of them is.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(','):
+        parts = item.split(';')
+        coding = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    best_encoding, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class SchemaServer(object):
+    """Serves schemas of the registered documents by their definition ids
+    (see :meth:`.Document.get_definition_id`): ``GET <prefix><definition_id>``.
+    The role and the mode can be specified in the query string:
+    ``?role=response&mode=wire``. Only the roles the server is created with
+    are served; requests for the others are answered with 404 Not Found.
+
+    Responses have strong ETags, are precompressed according to ``Accept-Encoding``
+    and ``If-None-Match`` requests are answered with 304 Not Modified.
+
+    The instance itself is a WSGI application; see :class:`jsl.asgi.ASGISchemaApp`
+    for an ASGI one.
+
+    :param cache:
+        A cache of artifacts. A new one is created if not specified.
+    :type cache: :class:`SchemaArtifactCache`
+    :param roles:
+        The roles to serve.
+    :type roles: iterable of strings
+    :param mode:
+        A default mode.
+    :type mode: str
+    :param prefix:
+        A path prefix the definition ids follow.
+    :type prefix: str
+    :param cache_control:
+        A value of the ``Cache-Control`` response header.
+    :type cache_control: str
+    """
+
+    def __init__(self, cache=None, roles=(DEFAULT_ROLE,), mode=modes.DOCUMENTATION_MODE, prefix='/',
+                 cache_control=None):
+        self.cache = cache if cache is not None else SchemaArtifactCache()
+        self.roles = frozenset(roles)
+        self.mode = mode
+        self.prefix = prefix
+        self.cache_control = cache_control
+        self._documents = {}
+        self._documents_version = None
+        self._documents_lock = threading.Lock()
+
+    def find_document(self, definition_id):
+        """Returns a registered document with ``definition_id`` or None if there is no such one."""
+        version = registry.get_version()
+        if version == self._documents_version:
+            reference = self._documents.get(definition_id)
+            document_cls = reference() if reference is not None else None
+            if document_cls is not None:
+                return document_cls
+        # the documents registered under new names do not change the registry version,
+        # so the documents are looked up again on every miss. They are referenced weakly
+        # not to keep alive the documents the registry may release
+        with self._documents_lock:
+            self._documents = dict((document_cls.get_definition_id(), weakref.ref(document_cls))
+                                   for document_cls in registry.iter_documents())
+            self._documents_version = version
+            reference = self._documents.get(definition_id)
+        return reference() if reference is not None else None
+
+    def warmup(self, roles=None, modes=None):
+        """Builds the artifacts of all the registered documents for every role
+        (the served ones if ``roles`` are not specified) and mode (the default
+        mode if ``modes`` are not specified), so that the first requests do not
+        have to wait for them.
+        """
+        for document_cls in registry.iter_documents():
+            for role in roles or self.roles:
+                for mode in modes or (self.mode,):
+                    self.cache.get(document_cls, role=role, mode=mode)
+
+    def handle(self, method, path, query_string='', headers=None):
+        """Handles a request.
+
+        :param path: a URL-decoded path
+        :param headers: a dictionary mapping lower-case header names to their values
+        :return: a tuple of a status line, a list of header name-value pairs and a body
+        """
+        headers = headers or {}
+        if method not in ('GET', 'HEAD'):
+            return self._error('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+        if not path.startswith(self.prefix):
+            return self._error('404 Not Found')
+        document_cls = self.find_document(path[len(self.prefix):])
+        if document_cls is None:
+            return self._error('404 Not Found')
+
+        query = parse_qs(query_string)
+        role = query.get('role', [DEFAULT_ROLE])[-1]
+        if role not in self.roles:
+            return self._error('404 Not Found')
+        mode = query.get('mode', [self.mode])[-1]
+        if mode not in modes.MODES:
+            return self._error('400 Bad Request')
+
+        artifact = self.cache.get(document_cls, role=role, mode=mode)
+        encoding = choose_encoding(headers.get('accept-encoding'))
+        response_headers = [
+            ('ETag', artifact.get_etag(encoding)),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if self.cache_control is not None:
+            response_headers.append(('Cache-Control', self.cache_control))
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None and _etag_matches(if_none_match, artifact.get_etag(encoding)):
+            return '304 Not Modified', response_headers, b''
+
+        body = artifact.get_body(encoding)
+        response_headers.append(('Content-Type', 'application/schema+json'))
+        response_headers.append(('Content-Length', str(len(body))))
+        if encoding is not None:
+            response_headers.append(('Content-Encoding', encoding))
+        return '200 OK', response_headers, body if method == 'GET' else b''
+
+    @staticmethod
+    def _error(status, headers=()):
+        body = status.encode('utf-8')
+        return status, [('Content-Type', 'text/plain'),
+                        ('Content-Length', str(len(body)))] + list(headers), body
+
+    def __call__(self, environ, start_response):
+        headers = dict((key[5:].replace('_', '-').lower(), value)
+                       for key, value in iteritems(environ) if key.startswith('HTTP_'))
+        status, response_headers, body = self.handle(
+            environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''),
+            query_string=environ.get('QUERY_STRING', ''), headers=headers)
+        start_response(status, response_headers)
+        return [body]
@@ -0,0 +1,101 @@
+# coding: utf-8
+"""
+Validation of streams of JSON documents (one per line, a.k.a. NDJSON or JSON Lines).
+"""
+import json
+import timeit
+
+from .roles import DEFAULT_ROLE
+from .validation import ValidationError
+
+
+class StreamStats(object):
+    """Counters of a stream validation, updated as the stream is consumed.
+
+    :ivar lines: the number of lines read
+    :ivar invalid: the number of invalid lines
+    :ivar bytes: the number of bytes read (characters, if the stream is a text one)
+    :ivar elapsed: the time spent, in seconds
+    """
+
+    def __init__(self, timer=timeit.default_timer):
+        self.lines = 0
+        self.invalid = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self._timer = timer
+
+    @property
+    def lines_per_second(self):
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return '<StreamStats: {0} lines ({1} invalid), {2:.0f} lines/s, {3:.0f} bytes/s>'.format(
+            self.lines, self.invalid, self.lines_per_second, self.bytes_per_second)
+
+
+def check_line(validator, line):
+    """Validates a line containing a JSON document. Returns a list of
+    :class:`.validation.ValidationError` s or None if the line is valid or blank.
+
+    :type validator: :class:`.validation.Validator`
+    """
+    try:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            return None
+        instance = json.loads(line)
+    except UnicodeDecodeError as e:
+        return [ValidationError('Invalid UTF-8: {0}'.format(e))]
+    except ValueError as e:
+        return [ValidationError('Invalid JSON: {0}'.format(e))]
+    if validator.is_valid(instance):
+        return None
+    return validator.get_errors(instance)
+
+
+def iter_errors(lines, document_cls, role=DEFAULT_ROLE, stats=None):
+    """Validates a stream of JSON documents against the schema of ``document_cls``
+    for ``role`` (see :meth:`.Document.get_validator`) and yields a pair of a line number
+    (starting from 1) and a list of :class:`.validation.ValidationError` s for every invalid line.
+    Blank lines are skipped.
+
+    The lines are read one at a time, so the memory usage does not depend on the stream size.
+
+    :param lines: an iterable of lines, such as a file opened in binary or text mode
+    :param stats: if specified, is updated as the stream is consumed
+    :type stats: :class:`StreamStats`
+    """
+    validator = document_cls.get_validator(role=role)
+    if stats is None:
+        stats = StreamStats()
+    timer = stats._timer
+    start = timer()
+    elapsed = stats.elapsed
+    try:
+        for line_number, line in enumerate(lines, 1):
+            stats.lines = line_number
+            stats.bytes += len(line)
+            errors = check_line(validator, line)
+            if errors is None:
+                continue
+            stats.invalid += 1
+            stats.elapsed = elapsed + timer() - start
+            yield line_number, errors
+            # the time the consumer takes to process the errors is not counted
+            start = timer()
+            elapsed = stats.elapsed
+    finally:
+        stats.elapsed = elapsed + timer() - start
+
+
+def iter_file_errors(path, document_cls, role=DEFAULT_ROLE, stats=None):
+    """The same as :func:`iter_errors`, but reads the lines from a file at ``path``."""
+    with open(path, 'rb') as f:
+        for line_number, errors in iter_errors(f, document_cls, role=role, stats=stats):
+            yield line_number, errors
@@ -0,0 +1,1018 @@
+# coding: utf-8
+"""
+Validation of instances against JSON schemas (draft v4).
+
+A schema is compiled once into a tree of checks which is then reused for every
+instance. The supported keywords are those jsl generates; ``format`` is checked
+only by a validator with a :class:`.formats.FormatChecker`.
+
+If the subschemas of ``anyOf`` or ``oneOf`` describe objects with a property whose
+``enum`` s are disjoint (such as a "type" or "kind" property of the documents of
+a :class:`.OneOfField`), an object is validated only against the subschema
+the value of the property selects.
+"""
+import decimal
+import numbers
+import re
+
+from ._compat import iteritems, string_types, integer_types, urldefrag, unquote
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class ValidationError(ValueError):
+    """An error found by a :class:`Validator`.
+
+    :ivar message: a description of the error
+    :ivar path: a tuple of keys and indexes leading to the invalid value
+    :ivar validator: the keyword whose check failed
+    """
+
+    def __init__(self, message, path=(), validator=None):
+        super(ValidationError, self).__init__(message)
+        self.message = message
+        self.path = tuple(path)
+        self.validator = validator
+
+    def __reduce__(self):
+        # keep the path and the keyword when passed between processes
+        return type(self), (self.message, self.path, self.validator)
+
+    def __repr__(self):
+        return '<ValidationError: {0!r} at {1!r}>'.format(self.message, self.path)
+
+
+def _is_number(instance):
+    return isinstance(instance, numbers.Number) and not isinstance(instance, bool)
+
+
+def _is_integer(instance):
+    return isinstance(instance, integer_types) and not isinstance(instance, bool)
+
+
+_TYPE_CHECKERS = {
+    'array': lambda instance: isinstance(instance, list),
+    'boolean': lambda instance: isinstance(instance, bool),
+    'integer': _is_integer,
+    'null': lambda instance: instance is None,
+    'number': _is_number,
+    'object': lambda instance: isinstance(instance, dict),
+    'string': lambda instance: isinstance(instance, string_types),
+}
+
+
+def json_equal(one, two):
+    """Returns if two JSON values are equal. Unlike in Python,
+    booleans are not equal to numbers.
+    """
+    if isinstance(one, bool) or isinstance(two, bool):
+        return isinstance(one, bool) and isinstance(two, bool) and one == two
+    if isinstance(one, dict):
+        return (isinstance(two, dict) and len(one) == len(two) and
+                all(key in two and json_equal(value, two[key]) for key, value in iteritems(one)))
+    if isinstance(one, list):
+        return (isinstance(two, list) and len(one) == len(two) and
+                all(json_equal(a, b) for a, b in zip(one, two)))
+    return one == two
+
+
+# tags of the keys of booleans and arrays, so they are not equal
+# to the keys of numbers and to each other
+_BOOLEAN_TAG = object()
+_ARRAY_TAG = object()
+
+
+def json_key(value):
+    """Returns a hashable key of a JSON value, such that the keys of two values
+    are equal if and only if the values are (see :func:`json_equal`): ``1`` and
+    ``1.0`` have the same key, ``True`` and ``1`` do not, and the keys of objects
+    do not depend on the order of their properties.
+
+    :raises: TypeError if the value contains an unhashable non-JSON value
+    """
+    if isinstance(value, bool):
+        return _BOOLEAN_TAG, value
+    if isinstance(value, dict):
+        return frozenset((key, json_key(item)) for key, item in iteritems(value))
+    if isinstance(value, list):
+        return (_ARRAY_TAG,) + tuple(json_key(item) for item in value)
+    hash(value)
+    return value
+
+
+def _to_decimal(number):
+    # a float is converted by its shortest representation, so that 0.01
+    # is converted to Decimal('0.01') rather than to the nearest binary fraction
+    if isinstance(number, float):
+        return decimal.Decimal(repr(number))
+    if isinstance(number, decimal.Decimal):
+        return number
+    return decimal.Decimal(number)
+
+
+def _is_decimal_multiple(number, multiple_of):
+    if not number.is_finite():
+        return False
+    with decimal.localcontext() as context:
+        # the remainder is exact only if the integer quotient fits into the precision
+        context.prec = max(context.prec, number.adjusted() - multiple_of.adjusted() + 2)
+        return number % multiple_of == 0
+
+
+def _fail(errors, message, path, validator):
+    # checks are called with ``errors`` being None when only the validity matters
+    if errors is not None:
+        errors.append(ValidationError(message, path, validator))
+    return False
+
+
+def _child_path(path, key):
+    return path + (key,) if path is not None else None
+
+
+class _Node(object):
+    """A compiled schema."""
+    __slots__ = ('checks',)
+
+    def __init__(self):
+        self.checks = []
+
+    def validate(self, instance, path, errors):
+        valid = True
+        for check in self.checks:
+            if not check(instance, path, errors):
+                if errors is None:
+                    return False
+                valid = False
+        return valid
+
+
+def _escape_pointer_part(part):
+    return str(part).replace('~', '~0').replace('/', '~1')
+
+
+def _iter_pointers(schema, pointer='#'):
+    """Yields pairs of JSON pointers and the subschemas of a schema."""
+    yield pointer, schema
+    for key, value in iteritems(schema) if isinstance(schema, dict) else enumerate(schema):
+        if isinstance(value, (dict, list)):
+            for pair in _iter_pointers(value, pointer + '/' + _escape_pointer_part(key)):
+                yield pair
+
+
+class _BranchStats(object):
+    """Tries the subschemas of "anyOf" in the order of how often they match."""
+    __slots__ = ('pointer', 'calls', 'hits', 'ordered_nodes', 'reorder_interval', 'countdown')
+
+    def __init__(self, pointer, nodes, reorder_interval):
+        self.pointer = pointer
+        self.calls = 0
+        self.hits = [0] * len(nodes)
+        self.ordered_nodes = list(enumerate(nodes))
+        self.reorder_interval = reorder_interval
+        self.countdown = reorder_interval
+
+    def match(self, instance):
+        """Returns if the instance is valid under any of the subschemas."""
+        self.calls += 1
+        matched = False
+        # the list is replaced, not changed, so that other threads can iterate over it
+        for index, node in self.ordered_nodes:
+            if node.validate(instance, None, None):
+                self.hits[index] += 1
+                matched = True
+                break
+        if self.reorder_interval:
+            self.countdown -= 1
+            if self.countdown <= 0:
+                self.countdown = self.reorder_interval
+                hits = self.hits
+                # ties are broken by the declaration order, so the order is deterministic
+                self.ordered_nodes = sorted(self.ordered_nodes, key=lambda item: (-hits[item[0]], item[0]))
+        return matched
+
+    def as_dict(self):
+        return {
+            'pointer': self.pointer,
+            'calls': self.calls,
+            'hits': list(self.hits),
+            'order': [index for index, _ in self.ordered_nodes],
+        }
+
+
+class Validator(object):
+    """A validator of instances against a JSON schema (draft v4).
+
+    References are resolved against the root schema, as jsl places all
+    the definitions there.
+
+    :param schema: a JSON schema
+    :type schema: dict
+    :param adaptive_branches:
+        If True, the validator counts how often every subschema of ``anyOf``
+        matches and tries them in the order of their hit counts, reordering them
+        every ``reorder_interval`` validations of the ``anyOf`` (see
+        :meth:`get_branch_stats`). An ``anyOf`` is valid if any of its subschemas
+        is, so the order does not change the results.
+    :type adaptive_branches: bool
+    :param reorder_interval:
+        If None or 0, the subschemas are always tried in the declaration order
+        and only the hit counts are collected.
+    :type reorder_interval: int
+    :param format_checker:
+        If specified, the ``format`` s the checker knows are checked.
+    :type format_checker: :class:`.formats.FormatChecker`
+    :raises: ValueError if the schema is invalid or has unresolvable references
+    """
+
+    def __init__(self, schema, adaptive_branches=False, reorder_interval=1000, format_checker=None):
+        self.schema = schema
+        self.format_checker = format_checker
+        self.adaptive_branches = adaptive_branches
+        self.reorder_interval = reorder_interval
+        self._branch_stats = []
+        self._pointers = {}
+        if adaptive_branches:
+            for pointer, subschema in _iter_pointers(schema):
+                self._pointers.setdefault(id(subschema), pointer)
+        self._nodes = {}
+        self._root = self.compile(schema)
+
+    def compile(self, schema):
+        """Compiles a subschema of the root schema (or returns the already compiled one)."""
+        key = id(schema)
+        node = self._nodes.get(key)
+        if node is not None:
+            return node
+        # the node is registered before compiling the nested schemas,
+        # so that recursive references resolve to it
+        node = self._nodes[key] = _Node()
+        if '$ref' in schema:
+            # the other keywords are ignored next to "$ref"
+            node.checks.append(self.compile(self.resolve(schema['$ref'])).validate)
+            return node
+        for keyword, build in self._builders:
+            if keyword in schema:
+                check = build(self, schema)
+                if check is not None:
+                    node.checks.append(check)
+        return node
+
+    def resolve(self, ref):
+        """Returns a subschema of the root schema ``ref`` points to.
+
+        :raises: ValueError
+        """
+        _, fragment = urldefrag(ref)
+        document = self.schema
+        for part in fragment.split('/')[1:] if fragment else ():
+            part = unquote(part).replace('~1', '/').replace('~0', '~')
+            try:
+                document = document[int(part) if isinstance(document, list) else part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise ValueError('Unresolvable reference: {0!r}'.format(ref))
+        if not isinstance(document, dict):
+            raise ValueError('Unresolvable reference: {0!r}'.format(ref))
+        return document
+
+    def get_errors(self, instance):
+        """Returns a list of :class:`ValidationError` s of the instance."""
+        errors = []
+        self._root.validate(instance, (), errors)
+        return errors
+
+    def is_valid(self, instance):
+        """Returns if the instance is valid. Faster than :meth:`get_errors`."""
+        return self._root.validate(instance, None, None)
+
+    def validate(self, instance):
+        """Raises the first :class:`ValidationError` of the instance, if there are any."""
+        errors = self.get_errors(instance)
+        if errors:
+            raise errors[0]
+
+    def get_branch_stats(self):
+        """Returns the statistics of the ``anyOf`` s collected if the validator
+        was created with ``adaptive_branches``: a list of dicts with keys
+
+        * ``pointer``: a JSON pointer to the ``anyOf`` within the schema;
+        * ``calls``: the number of instances validated against it;
+        * ``hits``: the number of instances matched by every subschema, in the declaration order;
+        * ``order``: indexes of the subschemas in the order they are currently tried.
+
+        The counters are updated without locking, so they may miss
+        a few validations made concurrently from several threads.
+        """
+        return [stats.as_dict() for stats in self._branch_stats]
+
+    def _build_type(self, schema):
+        types = schema['type']
+        if isinstance(types, string_types):
+            types = [types]
+        try:
+            checkers = [_TYPE_CHECKERS[type_] for type_ in types]
+        except KeyError as e:
+            raise ValueError('Unknown type: {0!r}'.format(e.args[0]))
+        description = ', '.join(repr(type_) for type_ in types)
+
+        def check(instance, path, errors):
+            for checker in checkers:
+                if checker(instance):
+                    return True
+            return _fail(errors, '{0!r} is not of type {1}'.format(instance, description), path, 'type')
+        return check
+
+    def _build_enum(self, schema):
+        enum = schema['enum']
+        try:
+            keys = frozenset(json_key(value) for value in enum)
+        except TypeError:
+            keys = None
+
+        def check(instance, path, errors):
+            try:
+                if keys is not None:
+                    if json_key(instance) in keys:
+                        return True
+                    return _fail(errors, '{0!r} is not one of {1!r}'.format(instance, enum), path, 'enum')
+            except TypeError:
+                pass
+            # the instance or the enum contains an unhashable non-JSON value
+            for value in enum:
+                if json_equal(instance, value):
+                    return True
+            return _fail(errors, '{0!r} is not one of {1!r}'.format(instance, enum), path, 'enum')
+        return check
+
+    def _build_minimum(self, schema):
+        minimum = schema['minimum']
+        if schema.get('exclusiveMinimum', False):
+            def check(instance, path, errors):
+                if _is_number(instance) and instance <= minimum:
+                    return _fail(errors, '{0!r} is less than or equal to the minimum of {1!r}'.format(
+                        instance, minimum), path, 'minimum')
+                return True
+        else:
+            def check(instance, path, errors):
+                if _is_number(instance) and instance < minimum:
+                    return _fail(errors, '{0!r} is less than the minimum of {1!r}'.format(
+                        instance, minimum), path, 'minimum')
+                return True
+        return check
+
+    def _build_maximum(self, schema):
+        maximum = schema['maximum']
+        if schema.get('exclusiveMaximum', False):
+            def check(instance, path, errors):
+                if _is_number(instance) and instance >= maximum:
+                    return _fail(errors, '{0!r} is greater than or equal to the maximum of {1!r}'.format(
+                        instance, maximum), path, 'maximum')
+                return True
+        else:
+            def check(instance, path, errors):
+                if _is_number(instance) and instance > maximum:
+                    return _fail(errors, '{0!r} is greater than the maximum of {1!r}'.format(
+                        instance, maximum), path, 'maximum')
+                return True
+        return check
+
+    def _build_multiple_of(self, schema):
+        multiple_of = schema['multipleOf']
+        decimal_multiple_of = _to_decimal(multiple_of)
+
+        def check(instance, path, errors):
+            if not _is_number(instance):
+                return True
+            if isinstance(instance, decimal.Decimal) or isinstance(multiple_of, decimal.Decimal):
+                # decimals can't be divided by floats, so both are compared as decimals
+                failed = not _is_decimal_multiple(_to_decimal(instance), decimal_multiple_of)
+            elif isinstance(multiple_of, float):
+                quotient = instance / multiple_of
+                try:
+                    failed = int(quotient) != quotient
+                except (OverflowError, ValueError):
+                    failed = True
+            else:
+                failed = instance % multiple_of
+            if failed:
+                return _fail(errors, '{0!r} is not a multiple of {1!r}'.format(
+                    instance, multiple_of), path, 'multipleOf')
+            return True
+        return check
+
+    def _build_min_length(self, schema):
+        min_length = schema['minLength']
+
+        def check(instance, path, errors):
+            if isinstance(instance, string_types) and len(instance) < min_length:
+                return _fail(errors, '{0!r} is too short'.format(instance), path, 'minLength')
+            return True
+        return check
+
+    def _build_max_length(self, schema):
+        max_length = schema['maxLength']
+
+        def check(instance, path, errors):
+            if isinstance(instance, string_types) and len(instance) > max_length:
+                return _fail(errors, '{0!r} is too long'.format(instance), path, 'maxLength')
+            return True
+        return check
+
+    def _build_pattern(self, schema):
+        pattern = schema['pattern']
+        regex = re.compile(pattern)
+
+        def check(instance, path, errors):
+            if isinstance(instance, string_types) and not regex.search(instance):
+                return _fail(errors, '{0!r} does not match {1!r}'.format(instance, pattern), path, 'pattern')
+            return True
+        return check
+
+    def checks_format(self, schema):
+        """Returns if the ``format`` of a schema is checked by the validator."""
+        return (self.format_checker is not None and 'format' in schema and
+                self.format_checker.get_checker(schema['format']) is not None)
+
+    def _build_format(self, schema):
+        if not self.checks_format(schema):
+            return None
+        format = schema['format']
+        checker = self.format_checker.get_checker(format)
+
+        def check(instance, path, errors):
+            if isinstance(instance, string_types) and not checker(instance):
+                return _fail(errors, '{0!r} is not a {1!r}'.format(instance, format), path, 'format')
+            return True
+        return check
+
+    def _build_items(self, schema):
+        items = schema['items']
+        if isinstance(items, dict):
+            node = self.compile(items)
+
+            def check(instance, path, errors):
+                if not isinstance(instance, list):
+                    return True
+                valid = True
+                for index, item in enumerate(instance):
+                    if not node.validate(item, _child_path(path, index), errors):
+                        if errors is None:
+                            return False
+                        valid = False
+                return valid
+            return check
+
+        nodes = [self.compile(item) for item in items]
+        additional_items = schema.get('additionalItems', True)
+        additional_node = self.compile(additional_items) if isinstance(additional_items, dict) else None
+
+        def check(instance, path, errors):
+            if not isinstance(instance, list):
+                return True
+            valid = True
+            for index, (node, item) in enumerate(zip(nodes, instance)):
+                if not node.validate(item, _child_path(path, index), errors):
+                    if errors is None:
+                        return False
+                    valid = False
+            if len(instance) > len(nodes):
+                if additional_items is False:
+                    extras = instance[len(nodes):]
+                    return _fail(errors, 'Additional items are not allowed ({0} {1} unexpected)'.format(
+                        ', '.join(repr(extra) for extra in extras),
+                        'was' if len(extras) == 1 else 'were'), path, 'additionalItems')
+                if additional_node is not None:
+                    for index in range(len(nodes), len(instance)):
+                        if not additional_node.validate(instance[index], _child_path(path, index), errors):
+                            if errors is None:
+                                return False
+                            valid = False
+            return valid
+        return check
+
+    def _build_min_items(self, schema):
+        min_items = schema['minItems']
+
+        def check(instance, path, errors):
+            if isinstance(instance, list) and len(instance) < min_items:
+                return _fail(errors, '{0!r} is too short'.format(instance), path, 'minItems')
+            return True
+        return check
+
+    def _build_max_items(self, schema):
+        max_items = schema['maxItems']
+
+        def check(instance, path, errors):
+            if isinstance(instance, list) and len(instance) > max_items:
+                return _fail(errors, '{0!r} is too long'.format(instance), path, 'maxItems')
+            return True
+        return check
+
+    def _build_unique_items(self, schema):
+        if not schema['uniqueItems']:
+            return None
+
+        def check(instance, path, errors):
+            if not isinstance(instance, list):
+                return True
+            try:
+                unique = len(set(map(json_key, instance))) == len(instance)
+            except TypeError:
+                unique = not any(json_equal(item, other_item)
+                                 for i, item in enumerate(instance) for other_item in instance[i + 1:])
+            if not unique:
+                return _fail(errors, '{0!r} has non-unique elements'.format(instance), path, 'uniqueItems')
+            return True
+        return check
+
+    def _build_properties(self, schema):
+        nodes = [(prop, self.compile(subschema)) for prop, subschema in iteritems(schema['properties'])]
+
+        def check(instance, path, errors):
+            if not isinstance(instance, dict):
+                return True
+            valid = True
+            for prop, node in nodes:
+                if prop in instance and not node.validate(instance[prop], _child_path(path, prop), errors):
+                    if errors is None:
+                        return False
+                    valid = False
+            return valid
+        return check
+
+    def _build_pattern_properties(self, schema):
+        nodes = [(re.compile(pattern), self.compile(subschema))
+                 for pattern, subschema in iteritems(schema['patternProperties'])]
+
+        def check(instance, path, errors):
+            if not isinstance(instance, dict):
+                return True
+            valid = True
+            for regex, node in nodes:
+                for prop, value in iteritems(instance):
+                    if regex.search(prop) and not node.validate(value, _child_path(path, prop), errors):
+                        if errors is None:
+                            return False
+                        valid = False
+            return valid
+        return check
+
+    def _build_additional_properties(self, schema):
+        additional_properties = schema['additionalProperties']
+        if additional_properties is True:
+            return None
+        properties = frozenset(schema.get('properties', ()))
+        regexes = [re.compile(pattern) for pattern in schema.get('patternProperties', ())]
+        node = self.compile(additional_properties) if isinstance(additional_properties, dict) else None
+
+        def iter_extras(instance):
+            for prop in instance:
+                if prop not in properties and not any(regex.search(prop) for regex in regexes):
+                    yield prop
+
+        def check(instance, path, errors):
+            if not isinstance(instance, dict):
+                return True
+            if node is None:
+                extras = list(iter_extras(instance))
+                if extras:
+                    return _fail(errors, 'Additional properties are not allowed ({0} {1} unexpected)'.format(
+                        ', '.join(repr(extra) for extra in extras),
+                        'was' if len(extras) == 1 else 'were'), path, 'additionalProperties')
+                return True
+            valid = True
+            for prop in iter_extras(instance):
+                if not node.validate(instance[prop], _child_path(path, prop), errors):
+                    if errors is None:
+                        return False
+                    valid = False
+            return valid
+        return check
+
+    def _build_required(self, schema):
+        required = schema['required']
+
+        def check(instance, path, errors):
+            if not isinstance(instance, dict):
+                return True
+            valid = True
+            for prop in required:
+                if prop not in instance:
+                    if errors is None:
+                        return False
+                    valid = _fail(errors, '{0!r} is a required property'.format(prop), path, 'required')
+            return valid
+        return check
+
+    def _build_min_properties(self, schema):
+        min_properties = schema['minProperties']
+
+        def check(instance, path, errors):
+            if isinstance(instance, dict) and len(instance) < min_properties:
+                return _fail(errors, '{0!r} does not have enough properties'.format(instance),
+                             path, 'minProperties')
+            return True
+        return check
+
+    def _build_max_properties(self, schema):
+        max_properties = schema['maxProperties']
+
+        def check(instance, path, errors):
+            if isinstance(instance, dict) and len(instance) > max_properties:
+                return _fail(errors, '{0!r} has too many properties'.format(instance),
+                             path, 'maxProperties')
+            return True
+        return check
+
+    def _build_all_of(self, schema):
+        nodes = [self.compile(subschema) for subschema in schema['allOf']]
+
+        def check(instance, path, errors):
+            valid = True
+            for node in nodes:
+                if not node.validate(instance, path, errors):
+                    if errors is None:
+                        return False
+                    valid = False
+            return valid
+        return check
+
+    def _deref(self, schema):
+        seen = set()
+        while '$ref' in schema and id(schema) not in seen:
+            seen.add(id(schema))
+            schema = self.resolve(schema['$ref'])
+        return schema
+
+    def _find_discriminator(self, subschemas):
+        """Looks for a property of the objects ``subschemas`` describe whose
+        ``enum`` s are disjoint, so that a value of the property determines
+        the only subschema an instance can be valid under.
+
+        Returns the property and a dict mapping the keys of the ``enum`` values
+        to indexes of the subschemas or None if there is no such property.
+        """
+        branches = [self._deref(subschema) for subschema in subschemas]
+        properties = [branch.get('properties') for branch in branches]
+        if len(branches) < 2 or not all(isinstance(p, dict) for p in properties):
+            return None
+        for prop in properties[0]:
+            table = {}
+            for index, branch_properties in enumerate(properties):
+                subschema = branch_properties.get(prop)
+                enum = self._deref(subschema).get('enum') if isinstance(subschema, dict) else None
+                if not isinstance(enum, list):
+                    break
+                try:
+                    keys = set(json_key(value) for value in enum)
+                except TypeError:
+                    break
+                if any(table.get(key, index) != index for key in keys):
+                    break
+                table.update((key, index) for key in keys)
+            else:
+                return prop, table
+        return None
+
+    def _compile_branches(self, subschemas):
+        """Compiles the subschemas of "anyOf" or "oneOf". Returns a list of nodes and
+        a function returning the index of the only node an object can be valid under
+        (None if the object is valid under none of them) or False if the nodes have
+        to be tried one by one.
+        """
+        nodes = [self.compile(subschema) for subschema in subschemas]
+        discriminator = self._find_discriminator(subschemas)
+        if discriminator is None:
+            return nodes, lambda instance: False
+        prop, table = discriminator
+
+        def dispatch(instance):
+            # any other subschema rejects the value of the property by its "enum"
+            if not isinstance(instance, dict) or prop not in instance:
+                return False
+            try:
+                return table.get(json_key(instance[prop]))
+            except TypeError:
+                return None
+        return nodes, dispatch
+
+    def _build_any_of(self, schema):
+        nodes, dispatch = self._compile_branches(schema['anyOf'])
+        if self.adaptive_branches:
+            pointer = self._pointers.get(id(schema))
+            stats = _BranchStats(pointer and pointer + '/anyOf', nodes, self.reorder_interval)
+            self._branch_stats.append(stats)
+            match = stats.match
+        else:
+            def match(instance):
+                for node in nodes:
+                    if node.validate(instance, None, None):
+                        return True
+                return False
+
+        def check(instance, path, errors):
+            index = dispatch(instance)
+            if index is False:
+                if match(instance):
+                    return True
+            elif index is not None and nodes[index].validate(instance, None, None):
+                return True
+            return _fail(errors, '{0!r} is not valid under any of the given schemas'.format(instance),
+                         path, 'anyOf')
+        return check
+
+    def _build_one_of(self, schema):
+        nodes, dispatch = self._compile_branches(schema['oneOf'])
+
+        def check(instance, path, errors):
+            index = dispatch(instance)
+            if index is False:
+                matches = 0
+                for node in nodes:
+                    if node.validate(instance, None, None):
+                        matches += 1
+                        if matches > 1:
+                            return _fail(errors, '{0!r} is valid under more than one of the given schemas'.format(
+                                instance), path, 'oneOf')
+                if matches:
+                    return True
+            elif index is not None and nodes[index].validate(instance, None, None):
+                return True
+            return _fail(errors, '{0!r} is not valid under any of the given schemas'.format(instance),
+                         path, 'oneOf')
+        return check
+
+    def _build_not(self, schema):
+        not_schema = schema['not']
+        node = self.compile(not_schema)
+
+        def check(instance, path, errors):
+            if node.validate(instance, None, None):
+                return _fail(errors, '{0!r} should not be valid under {1!r}'.format(instance, not_schema),
+                             path, 'not')
+            return True
+        return check
+
+    _builders = [
+        ('type', _build_type),
+        ('enum', _build_enum),
+        ('minimum', _build_minimum),
+        ('maximum', _build_maximum),
+        ('multipleOf', _build_multiple_of),
+        ('minLength', _build_min_length),
+        ('maxLength', _build_max_length),
+        ('pattern', _build_pattern),
+        ('format', _build_format),
+        ('items', _build_items),
+        ('minItems', _build_min_items),
+        ('maxItems', _build_max_items),
+        ('uniqueItems', _build_unique_items),
+        ('required', _build_required),
+        ('properties', _build_properties),
+        ('patternProperties', _build_pattern_properties),
+        ('additionalProperties', _build_additional_properties),
+        ('minProperties', _build_min_properties),
+        ('maxProperties', _build_max_properties),
+        ('allOf', _build_all_of),
+        ('anyOf', _build_any_of),
+        ('oneOf', _build_one_of),
+        ('not', _build_not),
+    ]
+
+    KEYWORDS = frozenset(['$ref', 'additionalItems', 'exclusiveMinimum', 'exclusiveMaximum'] +
+                         [keyword for keyword, _ in _builders])
+    """The keywords the validator checks. The other keywords are ignored."""
+
+
+# integers up to this magnitude are represented exactly by doubles
+_MAX_EXACT_INTEGER = 2 ** 53
+
+_COLUMN_KEYWORDS = {
+    'number': frozenset(['type', 'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum', 'multipleOf']),
+    'integer': frozenset(['type', 'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum', 'multipleOf']),
+    'string': frozenset(['type', 'minLength', 'maxLength']),
+}
+
+
+def _is_exact_number(value):
+    return isinstance(value, float) or (_is_integer(value) and abs(value) <= _MAX_EXACT_INTEGER)
+
+
+def _get_column_type(schema, validator):
+    """Returns the type of a property whose constraints can be checked
+    by vectorized operations or None if it's not such a property.
+    """
+    if validator.checks_format(schema):
+        return None
+    type_ = schema.get('type')
+    if not isinstance(type_, string_types) or type_ not in _COLUMN_KEYWORDS:
+        return None
+    for keyword, value in iteritems(schema):
+        if keyword in _COLUMN_KEYWORDS[type_]:
+            if keyword in ('minimum', 'maximum', 'multipleOf', 'minLength', 'maxLength') and \
+                    not _is_exact_number(value):
+                return None
+        elif keyword in Validator.KEYWORDS and keyword != 'format':
+            return None
+    return type_
+
+
+class _Column(object):
+    """A property of the records whose constraints are checked by vectorized operations."""
+    __slots__ = ('prop', 'type', 'schema', 'node')
+
+    def __init__(self, prop, type_, schema, node):
+        self.prop = prop
+        self.type = type_
+        self.schema = schema
+        self.node = node
+
+    def add(self, index, value, indexes, values):
+        """Adds a value to be checked. Returns False if the value
+        is invalid regardless of the constraints.
+        """
+        if self.type == 'string':
+            if not isinstance(value, string_types):
+                return False
+            value = len(value)
+        elif not (_is_integer(value) if self.type == 'integer' else _is_number(value)):
+            return False
+        elif not _is_exact_number(value):
+            # big integers, decimals and so on are checked one by one
+            return self.node.validate(value, None, None)
+        indexes.append(index)
+        values.append(value)
+        return True
+
+    def check(self, indexes, values, invalid):
+        """Marks the records whose values violate the constraints as invalid."""
+        if not indexes:
+            return
+        schema = self.schema
+        values = numpy.array(values, dtype=numpy.float64)
+        violations = numpy.zeros(len(values), dtype=bool)
+        # huge values overflow the quotients to inf, which is a violation
+        # the same as for Validator, not a reason to warn
+        with numpy.errstate(over='ignore', invalid='ignore'):
+            if self.type == 'string':
+                if 'minLength' in schema:
+                    violations |= values < schema['minLength']
+                if 'maxLength' in schema:
+                    violations |= values > schema['maxLength']
+            else:
+                if 'minimum' in schema:
+                    if schema.get('exclusiveMinimum', False):
+                        violations |= values <= schema['minimum']
+                    else:
+                        violations |= values < schema['minimum']
+                if 'maximum' in schema:
+                    if schema.get('exclusiveMaximum', False):
+                        violations |= values >= schema['maximum']
+                    else:
+                        violations |= values > schema['maximum']
+                multiple_of = schema.get('multipleOf')
+                if isinstance(multiple_of, float):
+                    quotients = values / multiple_of
+                    violations |= ~numpy.isfinite(quotients) | (numpy.trunc(quotients) != quotients)
+                elif multiple_of is not None:
+                    violations |= numpy.remainder(values, multiple_of) != 0
+        invalid[numpy.array(indexes, dtype=numpy.intp)[violations]] = True
+
+
+class BatchValidator(object):
+    """Validates many records against a :class:`Validator` schema at once.
+
+    If the schema describes an object, the records are transposed into columns:
+    numbers and strings constrained only by bounds, ``multipleOf`` and lengths
+    are checked for all the records by vectorized NumPy operations. The other
+    properties (and all of them, if NumPy is not installed) are validated
+    record by record. The results are the same as of :meth:`Validator.is_valid`.
+
+    :type validator: :class:`Validator`
+    """
+
+    _OBJECT_KEYWORDS = frozenset(['type', 'properties', 'required', 'additionalProperties'])
+
+    def __init__(self, validator):
+        self.validator = validator
+        schema = validator.schema
+        while '$ref' in schema:
+            schema = validator.resolve(schema['$ref'])
+        self._properties = None
+        if schema.get('type') == 'object' and \
+                isinstance(schema.get('additionalProperties', True), bool) and \
+                not any(keyword in Validator.KEYWORDS and keyword not in self._OBJECT_KEYWORDS
+                        for keyword in schema):
+            self._properties = frozenset(schema.get('properties', ()))
+            self._required = list(schema.get('required', ()))
+            self._additional_properties = schema.get('additionalProperties', True)
+            self._nodes = []
+            self._columns = []
+            for prop, subschema in iteritems(schema.get('properties', {})):
+                node = validator.compile(subschema)
+                column_type = _get_column_type(subschema, validator) if numpy is not None else None
+                if column_type is not None:
+                    self._columns.append(_Column(prop, column_type, subschema, node))
+                else:
+                    self._nodes.append((prop, node))
+
+    def validate(self, records):
+        """Validates the records.
+
+        :param records: a sequence of records
+        :rtype: :class:`BatchResult`
+        """
+        if not isinstance(records, (list, tuple)):
+            records = list(records)
+        invalid = numpy.zeros(len(records), dtype=bool) if numpy is not None else bytearray(len(records))
+
+        if self._properties is None:
+            is_valid = self.validator.is_valid
+            for index, record in enumerate(records):
+                if not is_valid(record):
+                    invalid[index] = True
+            return BatchResult(records, invalid, self.validator)
+
+        columns = [(column, [], []) for column in self._columns]
+        check_record = self._check_record
+        for index, record in enumerate(records):
+            if not check_record(index, record, columns):
+                invalid[index] = True
+        for column, indexes, values in columns:
+            column.check(indexes, values, invalid)
+        return BatchResult(records, invalid, self.validator)
+
+    def _check_record(self, index, record, columns):
+        """Checks everything but the column constraints, adds the column values."""
+        if not isinstance(record, dict):
+            return False
+        for prop in self._required:
+            if prop not in record:
+                return False
+        if not self._additional_properties:
+            properties = self._properties
+            for prop in record:
+                if prop not in properties:
+                    return False
+        for prop, node in self._nodes:
+            if prop in record and not node.validate(record[prop], None, None):
+                return False
+        for column, indexes, values in columns:
+            prop = column.prop
+            if prop in record and not column.add(index, record[prop], indexes, values):
+                return False
+        return True
+
+
+class BatchResult(object):
+    """Results of :meth:`BatchValidator.validate`.
+
+    :ivar mask:
+        A sequence with a true value for every invalid record: a NumPy boolean
+        array if NumPy is installed, a bytearray otherwise.
+    """
+
+    def __init__(self, records, mask, validator):
+        self.mask = mask
+        self._records = records
+        self._validator = validator
+
+    def __len__(self):
+        return len(self.mask)
+
+    @property
+    def invalid_count(self):
+        """The number of invalid records."""
+        if numpy is not None and isinstance(self.mask, numpy.ndarray):
+            return int(numpy.count_nonzero(self.mask))
+        return len(self.mask) - self.mask.count(0)
+
+    def is_valid(self, index):
+        """Returns if the record with ``index`` is valid."""
+        return not self.mask[index]
+
+    def iter_invalid_indexes(self):
+        """Yields indexes of the invalid records."""
+        if numpy is not None and isinstance(self.mask, numpy.ndarray):
+            for index in numpy.flatnonzero(self.mask):
+                yield int(index)
+        else:
+            for index, invalid in enumerate(self.mask):
+                if invalid:
+                    yield index
+
+    def get_errors(self, index):
+        """Returns a list of :class:`ValidationError` s of the record with ``index``.
+        The errors are found only when requested.
+        """
+        if not self.mask[index]:
+            return []
+        return self._validator.get_errors(self._records[index])
+
+    def iter_errors(self):
+        """Yields pairs of an index of an invalid record and its errors."""
+        for index in self.iter_invalid_indexes():
+            yield index, self.get_errors(index)
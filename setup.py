@@ -36,6 +36,9 @@ setup(
     author_email='anthony.romanovich@gmail.com',
     url='https://jsl.readthedocs.org',
     packages=find_packages(exclude=['tests']),
+    extras_require={
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -0,0 +1,8 @@
+# coding: utf-8
+import sys
+
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    # the ASGI application requires Python 3.7+
+    collect_ignore.append('test_asgi.py')
@@ -0,0 +1,92 @@
+# coding: utf-8
+import json
+
+from jsl import fields, registry
+from jsl.analysis import analyze, analyze_documents, format_reports, measure_schema, main
+from jsl.document import Document
+
+
+class Leaf(Document):
+    a = fields.StringField()
+    b = fields.IntField()
+
+
+class Node(Document):
+    left = fields.DocumentField(Leaf)
+    right = fields.DocumentField(Leaf)
+    ref = fields.DocumentField(Leaf, as_ref=True)
+
+
+class Tree(Document):
+    nodes = fields.ArrayField(fields.DocumentField(Node))
+    children = fields.ArrayField(fields.DocumentField('self'))
+
+
+def test_measure_schema():
+    assert measure_schema(Leaf.get_schema()) == (3, 0, 2)
+    assert measure_schema({
+        'definitions': {'x': {'type': 'string'}},
+        'oneOf': [{'$ref': '#/definitions/x'}, {'items': [{}, {'not': {}}]}],
+    }) == (7, 1, 4)
+
+
+def test_analyze():
+    report = analyze(Node)
+    assert report.fields == 2  # Leaf fields
+    assert report.nodes == 1 + 3 * 3 + 1
+    assert report.max_depth == 3
+    assert report.inlines == 2
+    assert report.refs == 1
+    assert report.definitions == 1
+    assert report.byte_size == len(json.dumps(Node.get_schema(), separators=(',', ':')))
+    assert report.generation_time > 0
+    assert report.expansion_factor == 11.0 / 2
+    assert not report.exceeds_threshold
+
+    report = analyze(Tree, threshold=1.0)
+    assert report.inlines == 3
+    assert report.refs == 3
+    assert report.definitions == 2
+    assert report.exceeds_threshold
+    assert report.as_dict()['document'] == 'test_analysis.Tree'
+
+    reports = analyze_documents([Leaf, Tree], roles=['default', 'other'])
+    assert [(r.document_cls, r.role) for r in reports] == [
+        (Leaf, 'default'), (Leaf, 'other'), (Tree, 'default'), (Tree, 'other')]
+    table = format_reports(reports)
+    assert len(table.splitlines()) == 5
+
+
+def test_analyze_inlines():
+    class B(Document):
+        leaf = fields.DocumentField(Leaf)
+
+    class Refs(Document):
+        first = fields.DocumentField(B, as_ref=True)
+        second = fields.DocumentField(B, as_ref=True)
+        third = fields.DocumentField(B, as_ref=True)
+
+    class Inlines(Document):
+        first = fields.DocumentField(B)
+        second = fields.DocumentField(B)
+
+    assert analyze(Refs).inlines == 1  # Leaf within the definition of B
+    assert analyze(Inlines).inlines == 4
+
+    for document_cls in (B, Refs, Inlines):
+        registry.remove_document(document_cls.__name__, module=document_cls.__module__)
+
+
+def test_main(capsys):
+    # the registry may have been cleared by the other tests
+    for document_cls in (Leaf, Node, Tree):
+        registry.put_document(document_cls.__name__, document_cls, module=document_cls.__module__)
+
+    assert main(['test_analysis', '--threshold', '100']) == 0
+    output = capsys.readouterr()[0]
+    assert 'test_analysis.Tree' in output
+
+    assert main(['test_analysis', '--threshold', '1', '--json']) == 1
+    reports = json.loads(capsys.readouterr()[0])
+    assert set(r['document'] for r in reports) == set([
+        'test_analysis.Leaf', 'test_analysis.Node', 'test_analysis.Tree'])
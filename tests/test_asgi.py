@@ -0,0 +1,72 @@
+# coding: utf-8
+import asyncio
+import threading
+
+from jsl import fields, Document
+from jsl.asgi import ASGISchemaApp
+from jsl.serving import SchemaServer
+
+
+def call_asgi(app, scope, messages=()):
+    messages = list(messages)
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def test_asgi_app():
+    class A(Document):
+        name = fields.StringField(title='Name')
+
+    app = ASGISchemaApp(SchemaServer())
+    start, body = call_asgi(app, {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/test_asgi.A',
+        'query_string': b'mode=wire',
+        'headers': [(b'Accept-Encoding', b'deflate')],
+    })
+    artifact = app.server.cache.get(A, mode='wire')
+    assert start['type'] == 'http.response.start'
+    assert start['status'] == 200
+    headers = dict(start['headers'])
+    assert headers[b'etag'] == artifact.get_etag('deflate').encode('latin-1')
+    assert headers[b'content-encoding'] == b'deflate'
+    assert body == {'type': 'http.response.body', 'body': artifact.get_body('deflate')}
+
+    start, body = call_asgi(app, {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/test_asgi.A',
+        'headers': [(b'if-none-match', app.server.cache.get(A).get_etag().encode('latin-1'))],
+    })
+    assert start['status'] == 304
+    assert body['body'] == b''
+
+    sent = call_asgi(app, {'type': 'lifespan'},
+                     [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    assert sent == [{'type': 'lifespan.startup.complete'}, {'type': 'lifespan.shutdown.complete'}]
+
+
+def test_asgi_app_executor():
+    class B(Document):
+        name = fields.StringField()
+
+    threads = []
+
+    class RecordingServer(SchemaServer):
+        def handle(self, *args, **kwargs):
+            threads.append(threading.current_thread())
+            return super(RecordingServer, self).handle(*args, **kwargs)
+
+    app = ASGISchemaApp(RecordingServer())
+    start, _ = call_asgi(app, {'type': 'http', 'method': 'GET', 'path': '/test_asgi.B'})
+    assert start['status'] == 200
+    assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,101 @@
+# coding: utf-8
+import pytest
+import jsonschema
+
+from jsl import fields
+from jsl.budget import ExpansionBudget, ExpansionBudgetExceeded
+from jsl.document import Document
+
+
+class Leaf(Document):
+    a = fields.StringField()
+    b = fields.IntField()
+
+
+class Middle(Document):
+    left = fields.DocumentField(Leaf)
+    right = fields.DocumentField(Leaf)
+
+
+class Top(Document):
+    first = fields.DocumentField(Middle)
+    second = fields.DocumentField(Middle)
+
+
+def test_no_budget_exceeded():
+    budget = ExpansionBudget(max_nodes=100, max_depth=3, max_time=60)
+    assert Top.get_schema(budget=budget) == Top.get_schema()
+
+
+def test_budget_exceeded():
+    with pytest.raises(ExpansionBudgetExceeded) as e:
+        Top.get_schema(budget=ExpansionBudget(max_depth=2))
+    assert e.value.path == ['test_budget.Top', 'test_budget.Middle', 'test_budget.Leaf']
+    assert str(e.value) == ('Schema expansion budget exceeded (max_depth=2) at '
+                            'test_budget.Top -> test_budget.Middle -> test_budget.Leaf')
+
+    # Top, Middle and Leaf dicts contribute 1 node each, Leaf fields contribute 2 more
+    with pytest.raises(ExpansionBudgetExceeded) as e:
+        Top.get_schema(budget=ExpansionBudget(max_nodes=1 + 1 + 3 * 2 + 1))
+    assert e.value.reason == 'max_nodes=9'
+    assert e.value.path == ['test_budget.Top', 'test_budget.Middle', 'test_budget.Leaf']
+
+    with pytest.raises(ExpansionBudgetExceeded) as e:
+        Top.get_schema(budget=ExpansionBudget(max_time=-1))
+    assert e.value.path == ['test_budget.Top', 'test_budget.Middle']
+
+
+def test_fallback_to_ref():
+    schema = Top.get_schema(budget=ExpansionBudget(max_depth=2, fallback_to_ref=True))
+    leaf_ref = {'$ref': '#/definitions/test_budget.Leaf'}
+    middle_schema = {
+        'type': 'object',
+        'additionalProperties': False,
+        'properties': {'left': leaf_ref, 'right': leaf_ref},
+    }
+    assert schema == {
+        '$schema': 'http://json-schema.org/draft-04/schema#',
+        'definitions': {
+            'test_budget.Leaf': Leaf.get_definitions_and_schema()[1],
+        },
+        'type': 'object',
+        'additionalProperties': False,
+        'properties': {'first': middle_schema, 'second': middle_schema},
+    }
+    jsonschema.Draft4Validator.check_schema(schema)
+
+    # once the node budget is exhausted, every document is referenced
+    schema = Top.get_schema(budget=ExpansionBudget(max_nodes=1, fallback_to_ref=True))
+    assert schema['properties']['first'] == {'$ref': '#/definitions/test_budget.Middle'}
+    assert schema['properties']['second'] == {'$ref': '#/definitions/test_budget.Middle'}
+    assert sorted(schema['definitions']) == ['test_budget.Leaf', 'test_budget.Middle']
+    assert schema['definitions']['test_budget.Middle'] == middle_schema
+
+
+def test_cached_schema_budget_key():
+    assert ExpansionBudget(max_depth=2) == ExpansionBudget(max_depth=2)
+    assert ExpansionBudget(max_depth=2) != ExpansionBudget(max_depth=2, fallback_to_ref=True)
+    assert len(set([ExpansionBudget(max_nodes=10), ExpansionBudget(max_nodes=10)])) == 1
+
+    schema = Top.get_cached_schema(budget=ExpansionBudget(max_depth=2, fallback_to_ref=True))
+    cache_size = len(Top._cache)
+    for _ in range(10):
+        assert Top.get_cached_schema(budget=ExpansionBudget(max_depth=2, fallback_to_ref=True)) is schema
+    assert len(Top._cache) == cache_size
+
+
+def test_budget_is_immutable():
+    budget = ExpansionBudget(max_depth=2)
+    with pytest.raises(AttributeError):
+        budget.max_depth = 3
+    assert budget.max_depth == 2
+    assert budget != (None, 2, None, False)
+
+
+def test_cached_schema_time_budget():
+    budget = ExpansionBudget(max_time=60, fallback_to_ref=True)
+    cache_size = len(Top._cache)
+    schema = Top.get_cached_schema(budget=budget)
+    assert schema == Top.get_schema()
+    assert Top.get_cached_schema(budget=budget) is not schema
+    assert len(Top._cache) == cache_size
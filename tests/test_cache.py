@@ -0,0 +1,214 @@
+# coding: utf-8
+import threading
+import time
+
+import mock
+import pytest
+
+from jsl import registry, fields, warmup
+from jsl.cache import SingleFlightCache
+from jsl.document import Document
+
+
+def run_in_threads(target, n=64):
+    start = threading.Event()
+    results = [None] * n
+    errors = []
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_single_flight():
+    cache = SingleFlightCache()
+    calls = []
+
+    def create():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results, errors = run_in_threads(lambda: cache.get('key', create))
+    assert not errors
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.peek('key') is results[0]
+    assert len(cache) == 1
+
+    cache.clear()
+    assert cache.peek('key') is None
+
+    # call() shares a result among the concurrent callers only
+    calls[:] = []
+    results, errors = run_in_threads(lambda: cache.call('other_key', create))
+    assert not errors
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.peek('other_key') is None
+    assert len(cache) == 0
+    assert cache.call('other_key', create) is not results[0]
+
+
+def test_single_flight_exception():
+    cache = SingleFlightCache()
+    calls = []
+
+    def create():
+        calls.append(1)
+        time.sleep(0.05)
+        raise ValueError('qwerty')
+
+    results, errors = run_in_threads(lambda: cache.get('key', create), n=16)
+    assert len(calls) == 1
+    assert len(errors) == 16
+    assert all(str(e) == 'qwerty' for e in errors)
+
+    with pytest.raises(ValueError):
+        cache.get('key', create)
+    assert len(calls) == 2
+
+
+def test_versioning_and_reentrancy():
+    version = [0]
+    cache = SingleFlightCache(get_version=lambda: version[0])
+    assert cache.get('a', lambda: 1) == 1
+    assert cache.get('a', lambda: 2) == 1
+    version[0] += 1
+    assert cache.peek('a') is None
+    assert cache.get('a', lambda: 2) == 2
+
+    def create():
+        return cache.get('b', lambda: 'inner') + '-outer'
+
+    assert cache.get('b', create) == 'inner-outer'
+
+
+class SlowStringField(fields.StringField):
+    calls = 0
+    lock = threading.Lock()
+
+    def get_definitions_and_schema(self, **kwargs):
+        with self.lock:
+            SlowStringField.calls += 1
+        time.sleep(0.01)
+        return super(SlowStringField, self).get_definitions_and_schema(**kwargs)
+
+
+def test_concurrent_schema_generation():
+    class A(Document):
+        name = SlowStringField()
+        b = fields.DocumentField('B')
+
+    class B(Document):
+        name = SlowStringField()
+        a = fields.DocumentField('A', as_ref=True)
+
+    SlowStringField.calls = 0
+
+    def generate():
+        a_cls = registry.get_document('A', module=__name__)
+        b_cls = registry.get_document('B', module=__name__)
+        return a_cls.get_cached_schema(), b_cls.get_cached_schema(ordered=True)
+
+    results, errors = run_in_threads(generate)
+    assert not errors
+    # every schema contains both documents, and each schema is generated once
+    assert SlowStringField.calls == 4
+    for a_schema, b_schema in results:
+        assert a_schema is results[0][0]
+        assert b_schema is results[0][1]
+    assert results[0][0] == A.get_schema()
+    assert results[0][1] == B.get_schema(ordered=True)
+
+    # a new document does not change how the names resolve
+    class C(Document):
+        pass
+    assert A.get_cached_schema() is results[0][0]
+
+    # rebinding a name invalidates the cached schemas
+    class B(Document):
+        name = fields.StringField()
+    assert A.get_cached_schema() is not results[0][0]
+    assert A.get_cached_schema() == A.get_schema()
+
+
+def test_registry_changes_invalidating_caches():
+    class A(Document):
+        b = fields.DocumentField('Missing')
+
+    version = registry.get_version()
+    with pytest.raises(KeyError):
+        A.get_cached_schema()
+
+    # binding a name which failed to resolve does not change the version:
+    # failures are not cached
+    class Missing(Document):
+        pass
+    assert registry.get_version() == version
+
+    schema = A.get_cached_schema()
+    registry.remove_document('Missing', module=__name__)
+    with pytest.raises(KeyError):
+        A.get_cached_schema()
+    registry.put_document('Missing', Missing, module=__name__)
+    assert A.get_cached_schema() == schema
+
+
+def test_warmup():
+    registry.clear()
+
+    class A(Document):
+        kind = fields.StringField(enum=['x', 'y'])
+        b = fields.DocumentField('B')
+
+    class B(Document):
+        name = fields.StringField(enum=['q'])
+
+    warmup(roles=['default', 'role_1'], orderings=[False, True])
+
+    # the schemas are not generated again
+    with mock.patch.object(fields.DictField, 'get_definitions_and_schema') as generate:
+        schemas = dict(((document_cls, role, ordered), document_cls.get_cached_schema(role=role, ordered=ordered))
+                       for document_cls in (A, B)
+                       for role in ('default', 'role_1')
+                       for ordered in (False, True))
+        assert not generate.called
+    for (document_cls, role, ordered), schema in schemas.items():
+        assert schema == document_cls.get_schema(role=role, ordered=ordered)
+        assert document_cls.get_cached_schema(role=role, ordered=ordered) is schema
+
+
+def test_warmup_validators():
+    registry.clear()
+
+    class A(Document):
+        kind = fields.StringField(enum=['x', 'y'])
+        count = fields.IntField(default=1)
+
+    warmup(roles=['default', 'role_1'], validators=True, projectors=True, defaults_fillers=True)
+    with mock.patch('jsl.validation.Validator') as compile_validator, \
+            mock.patch('jsl.projection.compile_projector') as compile_projector, \
+            mock.patch('jsl.defaults.compile_defaults_filler') as compile_defaults_filler:
+        compiled = dict((role, (A.get_validator(role=role), A.compile_projector(role=role),
+                                A.compile_defaults_filler(role=role)))
+                        for role in ('default', 'role_1'))
+        assert not compile_validator.called
+        assert not compile_projector.called
+        assert not compile_defaults_filler.called
+    for role, (validator, project, fill) in compiled.items():
+        assert validator.is_valid({'kind': 'x'})
+        assert not validator.is_valid({'kind': 'z'})
+        assert project({'kind': 'x', 'extra': 1}) == {'kind': 'x'}
+        assert fill({}) == {'count': 1}
@@ -0,0 +1,94 @@
+# coding: utf-8
+from jsl import fields, Document
+from jsl.roles import Var
+from jsl.defaults import compile_defaults_filler
+
+
+def test_compile_defaults_filler():
+    calls = []
+
+    def make_token():
+        calls.append(None)
+        return 'token-{0}'.format(len(calls))
+
+    class Settings(Document):
+        theme = fields.StringField(default='light')
+        tags = fields.ArrayField(fields.StringField(), default=['a'])
+
+    class User(Document):
+        login = fields.StringField(required=True)
+        active = fields.BooleanField(default=True)
+        limit = fields.IntField(default=Var({'admin': 100, 'user': 10}))
+        token = fields.StringField(default=make_token)
+        meta = fields.DictField(properties={'source': fields.StringField(default='web')}, default={})
+        settings = fields.DocumentField(Settings)
+        history = fields.ArrayField(fields.DocumentField(Settings))
+        pair = fields.ArrayField([fields.StringField(), fields.DocumentField(Settings)])
+
+    fill = User.compile_defaults_filler(role='user')
+    assert fill is User.compile_defaults_filler(role='user')
+    assert calls == []
+
+    user = {'login': 'john', 'settings': {}, 'history': [{'theme': 'dark'}, {}], 'pair': ['a', {}]}
+    assert fill(user) is user
+    assert user == {
+        'login': 'john',
+        'active': True,
+        'limit': 10,
+        'token': 'token-1',
+        'meta': {'source': 'web'},
+        'settings': {'theme': 'light', 'tags': ['a']},
+        'history': [{'theme': 'dark', 'tags': ['a']}, {'theme': 'light', 'tags': ['a']}],
+        'pair': ['a', {'theme': 'light', 'tags': ['a']}],
+    }
+
+    # the present values are not replaced, the mutable defaults are not shared
+    other_user = fill({'login': 'jane', 'active': False, 'token': 'x', 'settings': {}})
+    assert other_user['active'] is False
+    assert other_user['token'] == 'x'
+    assert calls == [None]
+    other_user['settings']['tags'].append('b')
+    other_user['meta']['source'] = 'api'
+    assert user['settings']['tags'] == ['a']
+    assert user['meta'] == {'source': 'web'}
+
+    assert compile_defaults_filler(User, role='admin')({})['limit'] == 100
+    assert 'limit' not in User.compile_defaults_filler()({})
+    assert fill([1]) == [1]
+
+
+def test_document_options_default():
+    class Address(Document):
+        class Options(object):
+            default = {'city': 'Moscow'}
+
+        city = fields.StringField()
+        street = fields.StringField(default='Main')
+
+    class User(Document):
+        address = fields.DocumentField(Address)
+
+    fill = User.compile_defaults_filler()
+    user = fill({})
+    # the default of the document is inserted and filled in turn
+    assert user == {'address': {'city': 'Moscow', 'street': 'Main'}}
+    assert fill({'address': {}}) == {'address': {'street': 'Main'}}
+    user['address']['city'] = 'Paris'
+    assert fill({})['address']['city'] == 'Moscow'
+    assert Address.compile_defaults_filler()({}) == {'street': 'Main'}
+
+
+def test_fill_defaults_many():
+    class Node(Document):
+        value = fields.IntField(default=0)
+        children = fields.ArrayField(fields.DocumentField('self'))
+
+    class Empty(Document):
+        value = fields.IntField()
+
+    records = [{}, {'value': 1, 'children': [{'children': [{}]}]}]
+    assert Node.fill_defaults_many(iter(records)) == [
+        {'value': 0},
+        {'value': 1, 'children': [{'value': 0, 'children': [{'value': 0}]}]},
+    ]
+    assert Empty.fill_defaults_many([{}]) == [{}]
@@ -3,7 +3,7 @@ import jsonschema
 
 from jsl.document import Document
 from jsl.fields import StringField, IntField, DocumentField, DateTimeField, ArrayField, OneOfField
-from jsl._compat import OrderedDict, iterkeys
+from jsl._compat import ordered_dict, iterkeys
 
 
 def check_field_schema(field):
@@ -74,6 +74,25 @@ def test_document_options():
     assert Child._options.additional_properties
 
 
+def test_properties_order():
+    class Parent(Document):
+        z = StringField()
+        a = StringField(required=True)
+
+    class Child(Parent):
+        y = IntField(required=True)
+        b = IntField()
+        a = StringField()
+
+    assert list(iterkeys(Child._fields)) == ['z', 'a', 'y', 'b']
+    schema = Child.get_schema(ordered=True)
+    assert isinstance(schema, ordered_dict)
+    assert list(iterkeys(schema)) == ['$schema', 'type', 'properties', 'required', 'additionalProperties']
+    assert list(iterkeys(schema['properties'])) == ['z', 'a', 'y', 'b']
+    assert schema['required'] == ['y']
+    assert schema == Child.get_schema()
+
+
 def test_recursive_definitions_1():
     class A(Document):
         class Options(object):
@@ -141,7 +160,7 @@ def test_recursive_definitions_1():
         '$ref': '#/definitions/test_document.A',
     }
     schema = A.get_schema(ordered=True)
-    assert isinstance(schema, OrderedDict)
+    assert isinstance(schema, ordered_dict)
     assert schema == expected_schema
     assert list(iterkeys(schema)) == ['id', '$schema', 'definitions', '$ref']
     check_field_schema(A)
@@ -79,3 +79,53 @@ def test_overriding_options_container():
     assert Parameter._options.repeated
     assert Parameter._options.location == 'query'
     assert Parameter._options.title == 'Parameter'
+
+
+def test_collect_options_from_options_class_hierarchy():
+    class BaseOptions(object):
+        title = 'Base'
+        description = 'Base description'
+
+    class A(Document):
+        class Options(BaseOptions):
+            title = 'A'
+            definition_id = None
+
+    assert A._options.title == 'A'
+    assert A._options.description == 'Base description'
+    assert A._options.definition_id is None
+
+    class B(A):
+        class Options(object):
+            additional_properties = True
+
+    assert DocumentMeta.collect_options((A,), {}) == {
+        'title': 'A',
+        'description': 'Base description',
+        'additional_properties': False,
+        'id': '',
+        'schema_uri': 'http://json-schema.org/draft-04/schema#',
+    }
+    assert B._options.title == 'A'
+    assert B._options.additional_properties
+
+    class C(Document):
+        class Options(BaseOptions):
+            title = None
+
+    assert C._options.title is None
+    assert C._options.description == 'Base description'
+
+
+def test_owners_are_set_on_first_use():
+    class A(Document):
+        a = fields.DocumentField('self')
+
+    assert A.a.owner_cls is None
+    assert A.is_recursive()
+    assert A.a.owner_cls is A
+
+    class B(A):
+        pass
+
+    assert A.a.get_document_cls() is B
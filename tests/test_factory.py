@@ -0,0 +1,135 @@
+# coding: utf-8
+import gc
+import weakref
+
+import pytest
+
+from jsl import registry, fields
+from jsl.document import Document
+from jsl.factory import DocumentFactory
+
+
+USER_SPEC = {
+    'options': {'title': 'User', 'additional_properties': True},
+    'fields': {
+        'login': {'type': 'string', 'required': True, 'max_length': 32},
+        'role': {'type': 'string', 'enum': ['admin', 'user']},
+        'tags': {'type': 'array', 'items': {'type': 'string'}, 'unique_items': True},
+        'address': {
+            'type': 'object',
+            'properties': {'city': {'type': 'string'}},
+            'additional_properties': {'type': 'integer'},
+        },
+        'manager': {'type': 'document', 'document': 'self', 'as_ref': True},
+        'contact': {'type': 'oneOf', 'fields': [{'type': 'email'}, {'type': 'uri'}]},
+    },
+}
+
+
+def test_create():
+    factory = DocumentFactory(module='tenants')
+    User = factory.create('User', USER_SPEC)
+
+    assert issubclass(User, Document)
+    assert registry.get_document('tenants.User') is User
+    assert User.get_definition_id() == 'tenants.User'
+    schema = User.get_schema()
+    assert schema['$ref'] == '#/definitions/tenants.User'
+    schema = schema['definitions']['tenants.User']
+    assert schema['title'] == 'User'
+    assert schema['additionalProperties'] is True
+    assert schema['required'] == ['login']
+    assert schema['properties']['login'] == {'type': 'string', 'maxLength': 32}
+    assert schema['properties']['tags'] == {
+        'type': 'array',
+        'items': {'type': 'string'},
+        'uniqueItems': True,
+    }
+    assert schema['properties']['address'] == {
+        'type': 'object',
+        'properties': {'city': {'type': 'string'}},
+        'additionalProperties': {'type': 'integer'},
+    }
+    assert schema['properties']['contact'] == {
+        'oneOf': [
+            {'type': 'string', 'format': 'email'},
+            {'type': 'string', 'format': 'uri'},
+        ],
+    }
+    assert schema['properties']['manager'] == {'$ref': '#/definitions/tenants.User'}
+
+    # equal specifications produce the same class
+    same_spec = dict(reversed(list(USER_SPEC.items())))
+    assert factory.create('User', same_spec) is User
+    assert len(factory) == 1
+    assert factory.create('Admin', USER_SPEC) is not User
+    assert len(factory) == 2
+
+    with pytest.raises(ValueError) as e:
+        factory.build_field({'type': 'qwerty'})
+    assert str(e.value) == "Unknown field type: 'qwerty'"
+
+
+def test_lru_eviction():
+    factory = DocumentFactory(maxsize=2, module='tenants')
+    a = factory.create('A', {})
+    b_ref = weakref.ref(factory.create('B', {}))
+    a.get_cached_schema()
+    assert factory.create('A', {}) is a  # A is now the most recently used
+
+    c = factory.create('C', {})
+    assert len(factory) == 2
+    assert registry.get_document('tenants.A') is a
+    assert registry.get_document('tenants.C') is c
+    # B is dropped by the factory and then released by the registry
+    gc.collect()
+    assert b_ref() is None
+    with pytest.raises(KeyError):
+        registry.get_document('tenants.B')
+    assert factory.create('B', {}) is not None
+
+    factory.clear()
+    assert not len(factory)
+    # the classes still in use stay registered
+    assert registry.get_document('tenants.A') is a
+    del a, c
+    gc.collect()
+    with pytest.raises(KeyError):
+        registry.get_document('tenants.A')
+
+
+def test_lru_eviction_keeps_caches():
+    class Hot(Document):
+        name = fields.StringField()
+
+    schema = Hot.get_cached_schema()
+    version = registry.get_version()
+    factory = DocumentFactory(maxsize=2, module='tenants')
+    for i in range(5):
+        factory.create('Tenant{0}'.format(i), {})
+    gc.collect()
+    assert registry.get_version() == version
+    assert Hot.get_cached_schema() is schema
+
+
+def test_lru_eviction_keeps_dependencies():
+    factory = DocumentFactory(maxsize=2, module='tenants')
+    address = factory.create('Address', {'fields': {'city': {'type': 'string'}}})
+    user = factory.create('User', {'fields': {'address': {'type': 'document', 'document': 'Address'}}})
+    factory.create('Other', {})
+
+    # User was evicted rather than Address it refers to
+    assert len(factory) == 2
+    assert factory.create('Address', {'fields': {'city': {'type': 'string'}}}) is address
+    assert factory.create('User', {'fields': {'address': {'type': 'document', 'document': 'Address'}}}) \
+        is not user
+    assert user.get_schema()['properties']['address']['properties'] == {'city': {'type': 'string'}}
+
+    # a document created before the document it refers to
+    factory = DocumentFactory(maxsize=2, module='tenants')
+    order = factory.create('Order', {'fields': {'item': {'type': 'document', 'document': 'Item'}}})
+    item = factory.create('Item', {})
+    assert factory.create('Order', {'fields': {'item': {'type': 'document', 'document': 'Item'}}}) is order
+    factory.create('Other', {})
+    assert registry.get_document('tenants.Item') is item
+    factory.clear()
@@ -5,7 +5,7 @@ import jsonschema
 
 from jsl import fields
 from jsl.document import Document
-from jsl._compat import OrderedDict
+from jsl._compat import ordered_dict
 
 
 def check_field_schema(field):
@@ -60,8 +60,8 @@ def test_string_field():
     definitions, schema = f.get_definitions_and_schema()
     assert (definitions, schema) == ({}, dict(expected_items))
     definitions, ordered_schema = f.get_definitions_and_schema(ordered=True)
-    assert isinstance(ordered_schema, OrderedDict)
-    assert ordered_schema == OrderedDict(expected_items)
+    assert isinstance(ordered_schema, ordered_dict)
+    assert list(ordered_schema.items()) == expected_items
     check_field_schema(f)
 
     with pytest.raises(ValueError) as e:
@@ -153,8 +153,8 @@ def test_array_field_to_schema():
                           additional_items=additional_items_mock)
     assert f.get_definitions_and_schema() == ({}, dict(expected_items))
     definitions, ordered_schema = f.get_definitions_and_schema(ordered=True)
-    assert isinstance(ordered_schema, OrderedDict)
-    assert ordered_schema == OrderedDict(expected_items)
+    assert isinstance(ordered_schema, ordered_dict)
+    assert list(ordered_schema.items()) == expected_items
 
     f = fields.ArrayField(items_mock, additional_items=True)
     assert f.get_definitions_and_schema() == ({}, {
@@ -382,3 +382,34 @@ def test_not_field():
         'not': {'type': 'string'},
     }
     assert f.get_schema() == expected_schema
+
+
+def test_enum_is_not_shared():
+    enum = ['a', 'b', 'c']
+    f = fields.StringField(enum=enum)
+    assert f.get_enum() is enum
+
+    schema = f.get_schema()
+    assert schema['enum'] == ['a', 'b', 'c']
+    schema['enum'].append('d')
+    assert f.get_schema()['enum'] == ['a', 'b', 'c']
+
+    enum.append('e')
+    assert f.get_schema()['enum'] == ['a', 'b', 'c', 'e']
+
+
+def test_slots():
+    for f in (fields.StringField(), fields.EmailField(), fields.IntField(),
+              fields.ArrayField(fields.StringField()), fields.DictField(),
+              fields.OneOfField([]), fields.NotField(fields.StringField()),
+              fields.DocumentField('self')):
+        assert not hasattr(f, '__dict__')
+
+    class CustomField(fields.StringField):
+        def __init__(self, extra=None, **kwargs):
+            self.extra = extra
+            super(CustomField, self).__init__(**kwargs)
+
+    f = CustomField(extra=1, min_length=1)
+    assert f.extra == 1
+    assert f.get_schema() == {'type': 'string', 'minLength': 1}
@@ -0,0 +1,131 @@
+# coding: utf-8
+import pytest
+
+from jsl import fields, Document
+from jsl.formats import FormatChecker, is_date_time, is_email, is_ipv4, is_uri
+from jsl.validation import Validator
+
+
+@pytest.mark.parametrize(('instance', 'expected'), [
+    ('1985-04-12T23:20:50.52Z', True),
+    ('1996-12-19T16:39:57-08:00', True),
+    ('1990-12-31T23:59:60Z', True),
+    ('2000-02-29t00:00:00.000001z', True),
+    ('1900-02-29T00:00:00Z', False),
+    ('1985-04-31T00:00:00Z', False),
+    ('1985-13-12T23:20:50Z', False),
+    ('1985-04-12T24:20:50Z', False),
+    ('1985-04-12T23:20:50.Z', False),
+    ('1985-04-12T23:20:50', False),
+    ('1985-04-12 23:20:50Z', False),
+    ('1985-04-12T23:20:50+24:00', False),
+    ('1985-04-12T23:20:50+01:00:00', False),
+    (u'１985-04-12T23:20:50Z', False),
+    ('', False),
+])
+def test_is_date_time(instance, expected):
+    assert is_date_time(instance) is expected
+
+
+@pytest.mark.parametrize(('instance', 'expected'), [
+    ('1.2.3.4', True),
+    ('0.0.0.0', True),
+    ('255.255.255.255', True),
+    ('256.1.1.1', False),
+    ('01.1.1.1', False),
+    ('1.1.1', False),
+    ('1.1.1.1.1', False),
+    ('1..1.1', False),
+    (' 1.1.1.1', False),
+    ('+1.1.1.1', False),
+    (u'١.1.1.1', False),
+])
+def test_is_ipv4(instance, expected):
+    assert is_ipv4(instance) is expected
+
+
+@pytest.mark.parametrize(('instance', 'expected'), [
+    ('john@example.com', True),
+    ('"john smith"@example.com', False),
+    ('john@', False),
+    ('@example.com', False),
+    ('john@example..com', False),
+    ('john@.example.com', False),
+    ('john', False),
+])
+def test_is_email(instance, expected):
+    assert is_email(instance) is expected
+
+
+@pytest.mark.parametrize(('instance', 'expected'), [
+    ('http://example.com/path?query=1#fragment', True),
+    ('urn:isbn:0451450523', True),
+    ('http://example.com/%7Euser', True),
+    ('http://example.com/%7', False),
+    ('http://example.com/a b', False),
+    ('//example.com', False),
+    ('1http://example.com', False),
+    ('example', False),
+])
+def test_is_uri(instance, expected):
+    assert is_uri(instance) is expected
+
+
+def test_format_checker():
+    checker = FormatChecker()
+    assert checker.conforms('1.2.3.4', 'ipv4')
+    assert not checker.conforms('1.2.3', 'ipv4')
+    assert checker.conforms('anything', 'unknown')
+
+    @checker.register('even')
+    def is_even(instance):
+        return instance.isdigit() and int(instance) % 2 == 0
+
+    assert checker.get_checker('even') is is_even
+    assert not checker.conforms('3', 'even')
+    assert FormatChecker().get_checker('even') is None
+    assert FormatChecker({}).get_checker('ipv4') is None
+
+
+def test_validator_format_checker():
+    class Host(Document):
+        address = fields.IPv4Type(required=True)
+        admin = fields.EmailField()
+        updated_at = fields.DateTimeField()
+        homepage = fields.UriField()
+        code = fields.StringField(format='even')
+
+    checker = FormatChecker()
+    checker.register('even', lambda instance: int(instance) % 2 == 0)
+    validator = Host.get_validator(format_checker=checker)
+    assert validator is Host.get_validator(format_checker=checker)
+
+    host = {'address': '10.0.0.1', 'admin': 'root@example.com', 'updated_at': '2015-01-01T00:00:00Z',
+            'homepage': 'http://example.com', 'code': '2'}
+    assert validator.is_valid(host)
+    invalid_host = {'address': '10.0.0.256', 'admin': 'root', 'updated_at': '2015-01-01',
+                    'homepage': 'example.com', 'code': '3'}
+    assert [(e.path, e.validator) for e in validator.get_errors(invalid_host)] == [
+        (('address',), 'format'), (('admin',), 'format'), (('updated_at',), 'format'),
+        (('homepage',), 'format'), (('code',), 'format'),
+    ]
+    assert validator.get_errors({'address': '1.2.3'})[0].message == "'1.2.3' is not a 'ipv4'"
+
+    # the formats are not checked by default
+    assert Host.get_validator().is_valid(invalid_host)
+    assert Validator(Host.get_schema(), format_checker=FormatChecker({})).is_valid(invalid_host)
+
+    result = Host.validate_many([host, invalid_host, {'address': 1}], format_checker=checker)
+    assert list(result.iter_invalid_indexes()) == [1, 2]
+    assert Host.validate_many([host, invalid_host]).invalid_count == 0
+
+    # checkers of the same functions share a validator, registering a function recompiles it
+    other_checker = FormatChecker(checker.checkers)
+    assert Host.get_validator(format_checker=other_checker) is validator
+    is_odd = other_checker.register('even', lambda instance: int(instance) % 2 == 1)
+    assert other_checker.get_checker('even') is is_odd
+    other_validator = Host.get_validator(format_checker=other_checker)
+    assert other_validator is not validator
+    assert not other_validator.is_valid(host)
+    assert Host.validate_many([host], format_checker=other_checker).invalid_count == 1
+    assert Host.validate_many([host], format_checker=checker).invalid_count == 0
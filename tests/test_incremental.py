@@ -0,0 +1,113 @@
+# coding: utf-8
+import io
+import json
+
+import mock
+import pytest
+
+from jsl import fields, Document
+from jsl import incremental
+from jsl.incremental import iter_events, iter_errors, IncrementalValidator
+
+
+JSON_TEXTS = [
+    '{"a": [1, -2.5, 3e2, true, false, null, "x"], "b": {}, "c": []}',
+    u'["\\u00e9\\ud83d\\ude00", "\\"\\\\\\/\\b\\f\\n\\r\\t", "бв", ""]',
+    '  12345678901234567890  ',
+    '"string"',
+    '[[[[]]], {"": {"x": [{}]}}]',
+]
+
+
+def build(events):
+    events = iter(events)
+    event, value = next(events)
+    return incremental._build(event, value, events)
+
+
+@pytest.mark.parametrize('text', JSON_TEXTS)
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 65536])
+def test_iter_events(text, chunk_size):
+    expected = json.loads(text)
+    assert build(iter_events(io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size)) == expected
+    assert build(iter_events(io.StringIO(text), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize('text', [
+    '', '[', '[1,]', '{"a" 1}', '{1: 2}', '[1 2]', '{"a": 1,}', 'tru', 'nul', '01',
+    '"abc', '"\\x"', '[1]]', '{} {}', '-', '"\x01"',
+])
+def test_iter_events_invalid_json(text):
+    with pytest.raises(ValueError):
+        list(iter_events(io.StringIO(text), chunk_size=2))
+
+
+class Item(Document):
+    sku = fields.StringField(required=True, pattern='^[A-Z]+$')
+    quantity = fields.IntField(minimum=1)
+    price = fields.NumberField(minimum=0)
+
+
+class Order(Document):
+    id = fields.IntField(required=True)
+    items = fields.ArrayField(fields.DocumentField(Item), min_items=1, max_items=3)
+    pair = fields.ArrayField([fields.StringField(), fields.IntField()], additional_items=False)
+    meta = fields.DictField(pattern_properties={'^x-': fields.StringField()},
+                            additional_properties=fields.IntField(), max_properties=2)
+    status = fields.StringField(enum=['new', 'paid'])
+    tags = fields.ArrayField(fields.StringField(), unique_items=True)
+    choice = fields.OneOfField([fields.IntField(), fields.DictField(properties={'a': fields.IntField()})])
+    parent = fields.DocumentField('self')
+
+
+ORDERS = [
+    {'id': 1, 'items': [{'sku': 'AB', 'quantity': 2, 'price': 1.5}]},
+    {'items': [{'sku': 'ab', 'quantity': 0}, {'price': -1}, 5, {}], 'extra': 1},
+    {'id': 1, 'items': {}, 'pair': ['a', 1, 2, 3], 'meta': {'x-a': 1, 'b': 'c', 'c': 2}},
+    {'id': 'x', 'status': 'old', 'tags': ['a', 'a'], 'choice': {'a': 'b'}},
+    {'id': 1, 'parent': {'id': 2, 'parent': {'items': []}}},
+    {'id': 1, 'pair': 'ab', 'meta': [], 'choice': 1},
+    [],
+    'order',
+]
+
+
+def summarize(errors):
+    return sorted((error.path, error.validator) for error in errors)
+
+
+@pytest.mark.parametrize('order', ORDERS)
+def test_iter_errors(order):
+    expected = summarize(Order.get_validator().get_errors(order))
+    text = json.dumps(order)
+    assert summarize(iter_errors(io.BytesIO(text.encode('utf-8')), Order, chunk_size=3)) == expected
+    validator = IncrementalValidator(Order.get_validator())
+    assert validator.is_valid(io.StringIO(text)) == (not expected)
+
+
+def test_iter_errors_does_not_build_streamable_values():
+    orders = {'id': 1, 'items': [{'sku': 'A', 'quantity': i, 'price': 1} for i in range(1000)]}
+    text = json.dumps(orders)
+    with mock.patch.object(incremental, '_build', wraps=incremental._build) as build_mock:
+        errors = list(iter_errors(io.StringIO(text), Order, chunk_size=1024))
+    assert not build_mock.called
+    assert summarize(errors) == [(('items',), 'maxItems'), (('items', 0, 'quantity'), 'minimum')]
+
+
+def test_iter_errors_is_lazy():
+    class Stream(object):
+        """Fails if read after the first invalid order."""
+        def __init__(self):
+            self.chunks = [b'{"orders": [{"id": "x"}, ', b'{"id": 1}]}']
+
+        def read(self, size):
+            if len(self.chunks) == 1:
+                raise AssertionError('Read too much')
+            return self.chunks.pop(0)
+
+    class Orders(Document):
+        orders = fields.ArrayField(fields.DocumentField(Order))
+
+    errors = iter_errors(Stream(), Orders)
+    error = next(errors)
+    assert (error.path, error.validator) == (('orders', 0, 'id'), 'type')
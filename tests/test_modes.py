@@ -0,0 +1,74 @@
+# coding: utf-8
+import json
+
+import pytest
+
+from jsl import fields, Document
+from jsl.modes import apply_mode, dumps, get_current_mode, DOCUMENTATION_MODE, WIRE_MODE
+
+
+def test_wire_mode():
+    class A(Document):
+        class Options(object):
+            title = 'A'
+            description = 'An A.'
+
+        name = fields.StringField(title='Name', description='A name.', default='x',
+                                  enum=['x', 'y'], required=True)
+        b = fields.DocumentField('B')
+
+    class B(Document):
+        class Options(object):
+            title = 'B'
+            default = {}
+
+        a = fields.DocumentField(A)
+        n = fields.IntField(minimum=1, title='N')
+
+    wire_schema = A.get_schema(mode=WIRE_MODE)
+    assert wire_schema == {
+        '$schema': 'http://json-schema.org/draft-04/schema#',
+        'definitions': {
+            'test_modes.A': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string', 'enum': ['x', 'y']},
+                    'b': {'$ref': '#/definitions/test_modes.B'},
+                },
+                'required': ['name'],
+                'additionalProperties': False,
+            },
+            'test_modes.B': {
+                'type': 'object',
+                'properties': {
+                    'a': {'$ref': '#/definitions/test_modes.A'},
+                    'n': {'type': 'integer', 'minimum': 1},
+                },
+                'additionalProperties': False,
+            },
+        },
+        '$ref': '#/definitions/test_modes.A',
+    }
+    assert get_current_mode() == DOCUMENTATION_MODE
+
+    schema = A.get_schema()
+    assert schema['definitions']['test_modes.A']['title'] == 'A'
+    assert schema['definitions']['test_modes.A']['properties']['name']['default'] == 'x'
+    assert schema == A.get_schema(mode=DOCUMENTATION_MODE)
+
+    assert A.get_cached_schema(mode=WIRE_MODE) == wire_schema
+    assert A.get_cached_schema() == schema
+
+    with apply_mode(WIRE_MODE):
+        assert A.name.get_schema() == {'type': 'string', 'enum': ['x', 'y']}
+    assert A.name.get_schema()['title'] == 'Name'
+
+    with pytest.raises(ValueError) as e:
+        A.get_schema(mode='docs')
+    assert str(e.value) == "Unknown mode: 'docs'"
+
+
+def test_dumps():
+    schema = {'type': 'object', 'properties': {'a': {'type': 'string'}}}
+    assert dumps(schema, mode=WIRE_MODE) == '{"type":"object","properties":{"a":{"type":"string"}}}'
+    assert json.loads(dumps(schema)) == schema
@@ -0,0 +1,79 @@
+# coding: utf-8
+from jsl import fields, Document
+from jsl import streaming
+from jsl.parallel import iter_file_errors, split_file
+
+
+class Event(Document):
+    name = fields.StringField(required=True, max_length=5)
+    count = fields.IntField(minimum=0)
+
+
+def write_events(tmpdir, n):
+    lines = []
+    for i in range(n):
+        if i % 7 == 0:
+            lines.append(b'{"count": -1}\n')
+        elif i % 11 == 0:
+            lines.append(b'{"name": \n')
+        elif i % 13 == 0:
+            lines.append(b'\n')
+        elif i % 17 == 0:
+            lines.append(b'{"name": "\xff"}\n')
+        else:
+            lines.append('{{"name": "e{0}", "count": {0}}}\n'.format(i % 100).encode('utf-8'))
+    path = tmpdir.join('events.ndjson')
+    path.write_binary(b''.join(lines).rstrip(b'\n'))
+    return str(path)
+
+
+def get_summary(results):
+    return [(line_number, [(e.path, e.validator, e.message) for e in errors])
+            for line_number, errors in results]
+
+
+def test_split_file(tmpdir):
+    path = tmpdir.join('lines')
+    path.write_binary(b'aaaa\nbb\ncccccc\n\nd')
+    assert split_file(str(path), chunk_size=3) == [(0, 5), (5, 8), (8, 15), (15, 17)]
+    assert split_file(str(path), chunk_size=8) == [(0, 8), (8, 16), (16, 17)]
+    assert split_file(str(path), chunk_size=100) == [(0, 17)]
+    path.write_binary(b'')
+    assert split_file(str(path)) == []
+
+
+def test_iter_file_errors(tmpdir):
+    path = write_events(tmpdir, 200)
+    expected = get_summary(streaming.iter_file_errors(path, Event))
+    assert len(expected) > 30
+    assert any(errors[0][2].startswith('Invalid UTF-8: ') for _, errors in expected)
+    assert get_summary(iter_file_errors(path, Event, processes=2, chunk_size=100)) == expected
+    assert get_summary(iter_file_errors(path, Event, processes=1, chunk_size=100)) == expected
+    assert get_summary(iter_file_errors(path, Event, processes=2)) == expected
+
+    empty_path = tmpdir.join('empty')
+    empty_path.write_binary(b'')
+    assert list(iter_file_errors(str(empty_path), Event, processes=2)) == []
+    assert list(iter_file_errors(str(empty_path), Event, processes=1)) == []
+
+
+def test_iter_file_errors_interleaved(tmpdir):
+    class Strict(Document):
+        name = fields.StringField(required=True, max_length=1)
+
+    path = write_events(tmpdir, 50)
+    expected = get_summary(streaming.iter_file_errors(path, Event))
+    strict_expected = get_summary(streaming.iter_file_errors(path, Strict))
+    assert expected != strict_expected
+
+    # the in-process validations of several files may be interleaved, like in threads
+    results = iter_file_errors(path, Event, processes=1, chunk_size=10)
+    strict_results = iter_file_errors(path, Strict, processes=1, chunk_size=10)
+    summary, strict_summary = [], []
+    for result, strict_result in zip(results, strict_results):
+        summary.extend(get_summary([result]))
+        strict_summary.extend(get_summary([strict_result]))
+    summary.extend(get_summary(results))
+    strict_summary.extend(get_summary(strict_results))
+    assert summary == expected
+    assert strict_summary == strict_expected
@@ -0,0 +1,84 @@
+# coding: utf-8
+import threading
+
+import pytest
+
+from jsl import fields
+from jsl.document import Document
+from jsl.profiling import profile, count_nodes
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += 1.0
+        return self.time
+
+
+def test_count_nodes():
+    assert count_nodes({'type': 'array', 'items': [{'type': 'string'}, {}]}) == 6
+
+
+def test_profile():
+    class CustomField(fields.StringField):
+        def get_definitions_and_schema(self, **kwargs):
+            return super(CustomField, self).get_definitions_and_schema(**kwargs)
+
+    class A(Document):
+        class Options(object):
+            definition_id = 'a'
+        name = fields.StringField()
+        custom = CustomField()
+
+    class B(Document):
+        class Options(object):
+            definition_id = 'b'
+        a = fields.DocumentField(A)
+        items = fields.ArrayField(fields.DocumentField(A))
+
+    original_method = fields.StringField.__dict__['get_definitions_and_schema']
+    with profile(timer=FakeTimer()) as profiler:
+        schema = B.get_schema()
+        with pytest.raises(RuntimeError):
+            profile().start()
+    assert schema == B.get_schema()
+    assert fields.StringField.__dict__['get_definitions_and_schema'] is original_method
+
+    stats = profiler.stats
+    assert stats['document', 'b'].calls == 1
+    assert stats['document', 'a'].calls == 2
+    assert stats['field', 'StringField'].calls == 2
+    assert stats['field', 'CustomField'].calls == 2
+    assert stats['field', 'DocumentField'].calls == 2
+    assert stats['field', 'DictField'].calls == 3
+    assert stats['field', 'StringField'].output_nodes == 4
+
+    # the timer ticks on entering and leaving every call
+    assert stats['field', 'StringField'].self_time == 2 * 1
+    assert stats['document', 'a'].self_time == 2 * 2
+    assert stats['document', 'a'].cumulative_time == 2 * 7
+    assert stats['document', 'b'].cumulative_time == sum(s.self_time for s in stats.values())
+
+    table = profiler.format_table()
+    assert table.splitlines()[0].split()[:3] == ['kind', 'name', 'calls']
+    assert len(table.splitlines()) == 1 + len(stats)
+
+    collapsed = profiler.format_collapsed_stacks().splitlines()
+    assert ('document:b;field:DictField;field:DocumentField;document:a;'
+            'field:DictField;field:CustomField 1000000') in collapsed
+
+
+def test_profile_other_threads():
+    class A(Document):
+        name = fields.StringField()
+
+    other_thread_schemas = []
+    with profile() as profiler:
+        thread = threading.Thread(target=lambda: other_thread_schemas.append(A.get_schema()))
+        thread.start()
+        thread.join()
+        assert other_thread_schemas == [A.get_schema()]
+    assert profiler.stats[('document', A.get_definition_id())].calls == 1
+    assert profiler.stats[('field', 'StringField')].calls == 1
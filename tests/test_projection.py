@@ -0,0 +1,87 @@
+# coding: utf-8
+import jsonschema
+
+from jsl import fields, Document
+from jsl.roles import Var, Not
+from jsl.projection import compile_projector
+
+
+REQUEST_ROLE = 'request'
+RESPONSE_ROLE = 'response'
+
+
+def test_compile_projector():
+    class Address(Document):
+        city = fields.StringField()
+        secret = Var({Not(RESPONSE_ROLE): fields.StringField()})
+
+    class User(Document):
+        login = fields.StringField(required=True)
+        password = Var({REQUEST_ROLE: fields.StringField()})
+        address = Var({
+            REQUEST_ROLE: fields.DocumentField(Address),
+            RESPONSE_ROLE: fields.DocumentField(Address),
+        }, roles_to_pass_down=[REQUEST_ROLE])
+        addresses = fields.ArrayField(fields.DocumentField(Address))
+        extra = fields.DictField(
+            properties={'visible': fields.IntField(), 'hidden': Var({REQUEST_ROLE: fields.IntField()})},
+            pattern_properties={'^x-': fields.DocumentField(Address)},
+            additional_properties=False)
+        pair = fields.ArrayField([fields.StringField(), fields.DocumentField(Address)])
+        anything = fields.DictField()
+
+    user = {
+        'login': 'john',
+        'password': 'qwerty',
+        'address': {'city': 'Moscow', 'secret': 's'},
+        'addresses': [{'city': 'Moscow', 'secret': 's'}, {'secret': 's', 'unknown': 1}],
+        'extra': {'visible': 1, 'hidden': 2, 'x-a': {'city': 'Kazan', 'secret': 's'}, 'y': 3},
+        'pair': ['a', {'city': 'Tver', 'secret': 's'}, 'b'],
+        'anything': {'a': {'secret': 's'}},
+        'unknown': 1,
+    }
+
+    project = User.compile_projector(role=RESPONSE_ROLE)
+    assert project is User.compile_projector(role=RESPONSE_ROLE)
+    assert project(user) == {
+        'login': 'john',
+        # the response role is not passed down to the address
+        'address': {'city': 'Moscow', 'secret': 's'},
+        'addresses': [{'city': 'Moscow'}, {}],
+        'extra': {'visible': 1, 'x-a': {'city': 'Kazan'}},
+        'pair': ['a', {'city': 'Tver'}, 'b'],
+        'anything': {'a': {'secret': 's'}},
+    }
+    jsonschema.validate(project(user), User.get_schema(role=RESPONSE_ROLE))
+    assert user['password'] == 'qwerty'
+    assert user['address'] == {'city': 'Moscow', 'secret': 's'}
+
+    project = compile_projector(User, role=REQUEST_ROLE)
+    assert project(user) == {
+        'login': 'john',
+        'password': 'qwerty',
+        'address': {'city': 'Moscow', 'secret': 's'},
+        'addresses': [{'city': 'Moscow', 'secret': 's'}, {'secret': 's'}],
+        'extra': {'visible': 1, 'hidden': 2, 'x-a': {'city': 'Kazan', 'secret': 's'}},
+        'pair': ['a', {'city': 'Tver', 'secret': 's'}, 'b'],
+        'anything': {'a': {'secret': 's'}},
+    }
+
+    # the values not matching the fields are left as they are
+    assert project({'login': 'john', 'address': None, 'addresses': 'a', 'pair': {}}) == {
+        'login': 'john', 'address': None, 'addresses': 'a', 'pair': {}}
+    assert project([1]) == [1]
+
+
+def test_compile_projector_recursive():
+    class Node(Document):
+        value = fields.IntField()
+        internal = Var({Not(RESPONSE_ROLE): fields.StringField()})
+        children = fields.ArrayField(fields.DocumentField('self'))
+
+    project = Node.compile_projector(role=RESPONSE_ROLE)
+    tree = {'value': 1, 'internal': 'x', 'children': [
+        {'value': 2, 'internal': 'y', 'children': [{'value': 3, 'internal': 'z'}]},
+    ]}
+    assert project(tree) == {'value': 1, 'children': [{'value': 2, 'children': [{'value': 3}]}]}
+    assert Node.compile_projector()(tree) == tree
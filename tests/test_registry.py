@@ -1,6 +1,10 @@
+import gc
+
 import pytest
 
-from jsl import registry
+from jsl import registry, fields
+from jsl.document import Document
+from jsl.factory import DocumentFactory
 
 
 def test_registry():
@@ -26,3 +30,87 @@ def test_registry():
         registry.remove_document('A')
 
     registry.remove_document('A', module='qwe.rty')
+
+
+def test_documents_are_referenced_weakly():
+    registry.clear()
+
+    class Kept(Document):
+        name = fields.StringField()
+
+    factory = DocumentFactory(maxsize=10, module=__name__)
+
+    def create_and_drop(i):
+        document_cls = factory.create('Dynamic{0}'.format(i), {'fields': {
+            'name': {'type': 'string', 'enum': ['a', 'b']},
+            'parent': {'type': 'document', 'document': 'self'},
+            'kept': {'type': 'document', 'document': 'Kept'},
+        }})
+        document_cls.get_cached_schema()
+        assert registry.get_document('Dynamic{0}'.format(i), module=__name__) is document_cls
+
+    for i in range(1000):
+        create_and_drop(i)
+    factory.clear()
+    gc.collect()
+
+    assert list(registry.iter_documents()) == [Kept]
+    assert registry.get_document('Kept', module=__name__) is Kept
+    with pytest.raises(KeyError):
+        registry.get_document('Dynamic0', module=__name__)
+    assert not fields._documents_to_set_owner
+
+
+def test_documents_resolved_by_name_are_kept():
+    class A(Document):
+        b = fields.DocumentField('B')
+
+    class B(Document):
+        name = fields.StringField()
+
+    del B
+    gc.collect()
+    assert A.get_schema()['properties']['b']['properties'] == {'name': {'type': 'string'}}
+
+    # a weakly registered document is kept by the fields which have resolved it
+    class User(Document):
+        address = fields.DocumentField('Address')
+
+    class Address(Document):
+        city = fields.StringField()
+
+    registry.put_document('Address', Address, module=__name__, weak=True)
+    User.get_schema()
+    del Address
+    gc.collect()
+    assert User.get_schema()['properties']['address']['properties'] == {'city': {'type': 'string'}}
+
+
+def test_version():
+    class A(Document):
+        name = fields.StringField()
+
+    schema = A.get_cached_schema()
+    validator = A.get_validator()
+    version = registry.get_version()
+
+    # new names do not change how the existing ones resolve
+    from jsl.factory import DocumentFactory
+    DocumentFactory().create('T', {'fields': {'name': {'type': 'string'}}})
+    assert registry.get_version() == version
+    assert A.get_cached_schema() is schema
+    assert A.get_validator() is validator
+
+    # rebinding a name does
+    class A(Document):
+        name = fields.IntField()
+    assert registry.get_version() != version
+
+    # collecting a weakly registered document and binding its name again does not
+    version = registry.get_version()
+    DocumentFactory(module=__name__).create('Released', {})
+    gc.collect()
+    with pytest.raises(KeyError):
+        registry.get_document('Released', module=__name__)
+    DocumentFactory(module=__name__).create('Released', {})
+    assert registry.get_version() == version
@@ -0,0 +1,232 @@
+# coding: utf-8
+import gc
+import gzip
+import io
+import json
+import weakref
+import zlib
+
+import pytest
+
+from jsl import fields, registry, Document
+from jsl.factory import DocumentFactory
+from jsl.modes import WIRE_MODE
+from jsl.serving import SchemaArtifact, SchemaArtifactCache, SchemaServer, choose_encoding, GZIP, DEFLATE
+
+
+class A(Document):
+    class Options(object):
+        title = 'A'
+
+    name = fields.StringField(required=True, title='Name')
+
+
+class B(Document):
+    a = fields.DocumentField(A)
+
+
+def test_schema_artifact():
+    schema = A.get_schema(mode=WIRE_MODE)
+    artifact = SchemaArtifact.from_schema(schema, mode=WIRE_MODE)
+    assert json.loads(artifact.body.decode('utf-8')) == schema
+    assert b' ' not in artifact.body
+    assert gzip.GzipFile(fileobj=io.BytesIO(artifact.get_body(GZIP))).read() == artifact.body
+    assert zlib.decompress(artifact.get_body(DEFLATE)) == artifact.body
+    assert artifact.get_body() is artifact.body
+    assert artifact.size == sum(len(artifact.get_body(e)) for e in (None, GZIP, DEFLATE))
+
+    assert len(artifact.fingerprint) == 40
+    assert artifact.get_etag() == '"{0}"'.format(artifact.fingerprint)
+    assert artifact.get_etag(GZIP) == '"{0}-gzip"'.format(artifact.fingerprint)
+    assert SchemaArtifact.from_schema(schema, mode=WIRE_MODE).get_body(GZIP) == artifact.get_body(GZIP)
+
+    with pytest.raises(ValueError) as e:
+        artifact.get_body('br')
+    assert str(e.value) == "Unknown encoding: 'br'"
+
+
+def test_schema_artifact_cache():
+    cache = SchemaArtifactCache()
+    artifact = cache.get(A)
+    assert json.loads(artifact.body.decode('utf-8')) == A.get_schema()
+    assert cache.get(A) is artifact
+    wire_artifact = cache.get(A, mode=WIRE_MODE)
+    assert wire_artifact is not artifact
+    assert len(wire_artifact.body) < len(artifact.body)
+    assert cache.get(A, role='response') is not artifact
+    assert len(cache) == 3
+    assert cache.size == sum(a.size for a in (artifact, wire_artifact, cache.get(A, role='response')))
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+    assert cache.get(A) is not artifact
+
+
+def test_schema_artifact_cache_invalidation():
+    cache = SchemaArtifactCache()
+    artifact = cache.get(A)
+
+    class C(Document):
+        pass
+
+    assert cache.get(A) is artifact
+
+    # rebinding a name invalidates the cached artifacts
+    class C(Document):
+        pass
+
+    assert cache.get(A) is not artifact
+    assert len(cache) == 1
+
+
+def test_schema_artifact_cache_eviction():
+    cache = SchemaArtifactCache(maxsize=2)
+    a_artifact = cache.get(A)
+    b_artifact = cache.get(B)
+    assert cache.get(A) is a_artifact
+    cache.get(A, mode=WIRE_MODE)
+    assert len(cache) == 2
+    assert cache.get(A) is a_artifact
+    assert cache.get(B) is not b_artifact
+
+    cache = SchemaArtifactCache(max_bytes=a_artifact.size + b_artifact.size)
+    a_artifact = cache.get(A)
+    b_artifact = cache.get(B)
+    assert len(cache) == 2
+    cache.get(A, mode=WIRE_MODE)
+    assert len(cache) == 2
+    assert cache.size <= cache.max_bytes
+    assert cache.get(B) is b_artifact
+    assert cache.get(A) is not a_artifact
+
+    cache = SchemaArtifactCache(max_bytes=1)
+    cache.get(A)
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def call_wsgi(app, path, query_string='', method='GET', **headers):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+    }
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper()] = value
+    responses = []
+
+    def start_response(status, response_headers):
+        responses.append((status, dict(response_headers)))
+
+    body = b''.join(app(environ, start_response))
+    status, response_headers = responses[0]
+    return status, response_headers, body
+
+
+def test_schema_server():
+    class A(Document):
+        class Options(object):
+            title = 'A'
+
+        name = fields.StringField(required=True, title='Name')
+
+    class B(Document):
+        a = fields.DocumentField(A)
+
+    app = SchemaServer(roles=('default', 'response'))
+    app.warmup()
+    assert len(app.cache) == 2 * len(list(registry.iter_documents()))
+
+    status, headers, body = call_wsgi(app, '/test_serving.A')
+    assert status == '200 OK'
+    assert json.loads(body.decode('utf-8')) == A.get_schema()
+    assert headers['Content-Type'] == 'application/schema+json'
+    assert headers['Content-Length'] == str(len(body))
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert 'Content-Encoding' not in headers
+    etag = headers['ETag']
+    assert etag == app.cache.get(A).get_etag()
+
+    status, headers, body = call_wsgi(app, '/test_serving.A', if_none_match=etag)
+    assert status == '304 Not Modified'
+    assert headers['ETag'] == etag
+    assert body == b''
+    status, _, _ = call_wsgi(app, '/test_serving.A', if_none_match='"other", W/' + etag)
+    assert status == '304 Not Modified'
+    status, _, _ = call_wsgi(app, '/test_serving.A', if_none_match='"other"')
+    assert status == '200 OK'
+
+    status, headers, body = call_wsgi(app, '/test_serving.A', query_string='mode=wire',
+                                      accept_encoding='deflate;q=0.5, gzip')
+    assert status == '200 OK'
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['ETag'] == app.cache.get(A, mode=WIRE_MODE).get_etag(GZIP)
+    assert json.loads(gzip.GzipFile(fileobj=io.BytesIO(body)).read().decode('utf-8')) == \
+        A.get_schema(mode=WIRE_MODE)
+
+    status, headers, body = call_wsgi(app, '/test_serving.A', method='HEAD')
+    assert status == '200 OK'
+    assert body == b''
+    assert int(headers['Content-Length']) == len(app.cache.get(A).body)
+
+    assert call_wsgi(app, '/test_serving.Z')[0] == '404 Not Found'
+    assert call_wsgi(app, '/test_serving.A', query_string='mode=x')[0] == '400 Bad Request'
+    status, headers, _ = call_wsgi(app, '/test_serving.A', method='POST')
+    assert status == '405 Method Not Allowed'
+    assert headers['Allow'] == 'GET, HEAD'
+
+    app = SchemaServer(roles=('response',), prefix='/schemas/', cache_control='max-age=60')
+    status, headers, _ = call_wsgi(app, '/schemas/test_serving.B', query_string='role=response')
+    assert status == '200 OK'
+    assert headers['Cache-Control'] == 'max-age=60'
+    assert call_wsgi(app, '/test_serving.B')[0] == '404 Not Found'
+
+    # the roles that are not served are not generated
+    assert call_wsgi(app, '/schemas/test_serving.B')[0] == '404 Not Found'
+    cache_size = len(A._cache)
+    for i in range(100):
+        assert call_wsgi(app, '/schemas/test_serving.A', query_string='role=r{0}'.format(i))[0] == \
+            '404 Not Found'
+    assert len(app.cache) == 1
+    assert len(A._cache) == cache_size
+
+
+def test_schema_server_new_documents():
+    class A(Document):
+        name = fields.StringField()
+
+    app = SchemaServer()
+    assert call_wsgi(app, '/test_serving.A')[0] == '200 OK'
+    assert call_wsgi(app, '/test_serving.New')[0] == '404 Not Found'
+
+    # registering a new name does not change the registry version
+    version = registry.get_version()
+
+    class New(Document):
+        name = fields.StringField()
+    assert registry.get_version() == version
+    assert app.find_document('test_serving.New') is New
+    assert call_wsgi(app, '/test_serving.New')[0] == '200 OK'
+
+    # the server does not keep the documents alive
+    factory = DocumentFactory(module='test_serving')
+    assert app.find_document('test_serving.Dynamic') is None
+    dynamic_ref = weakref.ref(factory.create('Dynamic', {}))
+    assert app.find_document('test_serving.Dynamic') is dynamic_ref()
+    factory.clear()
+    gc.collect()
+    assert dynamic_ref() is None
+    assert app.find_document('test_serving.Dynamic') is None
+
+
+def test_choose_encoding():
+    assert choose_encoding(None) is None
+    assert choose_encoding('') is None
+    assert choose_encoding('identity') is None
+    assert choose_encoding('gzip, deflate') == GZIP
+    assert choose_encoding('deflate, gzip;q=0.9') == DEFLATE
+    assert choose_encoding('gzip;q=0, deflate') == DEFLATE
+    assert choose_encoding('*') == GZIP
+    assert choose_encoding('*;q=0') is None
+    assert choose_encoding('GZIP;q=bad, br') is None
@@ -0,0 +1,73 @@
+# coding: utf-8
+import io
+import itertools
+import json
+
+import jsonschema
+
+from jsl import fields, Document
+from jsl.streaming import iter_errors, iter_file_errors, StreamStats
+
+
+class Event(Document):
+    name = fields.StringField(required=True, max_length=5)
+    count = fields.IntField(minimum=0)
+
+
+LINES = [
+    b'{"name": "a", "count": 1}\n',
+    b'{"name": "toolong"}\n',
+    b'\n',
+    b'{"count": -1}\n',
+    b'{"name": \n',
+    u'{"name": "аб"}\n'.encode('utf-8'),
+    b'[]',
+]
+
+
+def test_iter_errors():
+    stats = StreamStats()
+    results = list(iter_errors(io.BytesIO(b''.join(LINES)), Event, stats=stats))
+    assert [line_number for line_number, _ in results] == [2, 4, 5, 7]
+    assert [e.message for e in results[0][1]] == ["'toolong' is too long"]
+    assert [e.validator for e in results[1][1]] == ['required', 'minimum']
+    assert results[2][1][0].message.startswith('Invalid JSON: ')
+    assert stats.lines == 7
+    assert stats.invalid == 4
+    assert stats.bytes == sum(len(line) for line in LINES)
+    assert stats.elapsed > 0
+    assert stats.lines_per_second > 0
+
+    # the results match the schema-based validation
+    reference_validator = jsonschema.Draft4Validator(Event.get_schema())
+    for (line_number, errors) in results:
+        if line_number != 5:
+            instance = json.loads(LINES[line_number - 1].decode('utf-8'))
+            assert len(errors) == len(list(reference_validator.iter_errors(instance)))
+
+    text_results = list(iter_errors(io.StringIO(b''.join(LINES).decode('utf-8')), Event))
+    assert [line_number for line_number, _ in text_results] == [2, 4, 5, 7]
+
+
+def test_iter_errors_invalid_utf8():
+    lines = [b'{"name": "a"}\n', b'{"name": "\xff"}\n', b'{"name": "b"}\n']
+    results = list(iter_errors(lines, Event))
+    assert [line_number for line_number, _ in results] == [2]
+    assert results[0][1][0].message.startswith('Invalid UTF-8: ')
+
+
+def test_iter_errors_is_lazy():
+    def generate_lines():
+        for i in itertools.count():
+            yield b'{"name": "a"}\n' if i % 2 else b'{}\n'
+
+    results = iter_errors(generate_lines(), Event)
+    assert [line_number for line_number, _ in itertools.islice(results, 3)] == [1, 3, 5]
+
+
+def test_iter_file_errors(tmpdir):
+    path = tmpdir.join('events.ndjson')
+    path.write_binary(b''.join(LINES))
+    stats = StreamStats()
+    assert [n for n, _ in iter_file_errors(str(path), Event, stats=stats)] == [2, 4, 5, 7]
+    assert stats.lines == 7
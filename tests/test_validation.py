@@ -0,0 +1,338 @@
+# coding: utf-8
+import decimal
+
+import jsonschema
+import pytest
+
+from jsl import fields, Document
+from jsl import validation
+from jsl.validation import Validator, BatchValidator, ValidationError, json_equal, json_key
+
+
+SCHEMAS_AND_INSTANCES = [
+    ({'type': 'integer'}, [1, 1.0, True, 'a', None, 2 ** 70]),
+    ({'type': ['string', 'null']}, ['a', None, 1]),
+    ({'type': 'number', 'minimum': 1, 'maximum': 5.5},
+     [0, 1, 5.5, 5.6, True, 'x', decimal.Decimal('2')]),
+    ({'type': 'number', 'minimum': 1, 'exclusiveMinimum': True,
+      'maximum': 5, 'exclusiveMaximum': True}, [1, 1.5, 5, 4.99]),
+    ({'multipleOf': 3}, [9, 10, 9.0, 7.5, 'a']),
+    ({'multipleOf': 0.5}, [1.5, 1.2, 3]),
+    ({'type': 'string', 'minLength': 2, 'maxLength': 3, 'pattern': '^a'},
+     ['a', 'ab', 'abcd', 'ba', u'аб']),
+    ({'enum': [1, 'a', [1, 2], {'a': True}]}, [1, 1.0, True, 'a', [1, 2], [2, 1], {'a': True}, {'a': 1}]),
+    ({'type': 'array', 'items': {'type': 'string'}, 'minItems': 1, 'maxItems': 2},
+     [[], ['a'], ['a', 1], ['a', 'b', 'c'], 'a']),
+    ({'type': 'array', 'items': [{'type': 'string'}, {'type': 'integer'}], 'additionalItems': False},
+     [['a', 1], ['a', 1, 2], [1], []]),
+    ({'type': 'array', 'items': [{'type': 'string'}], 'additionalItems': {'type': 'integer'}},
+     [['a', 1, 2], ['a', 'b']]),
+    ({'uniqueItems': True}, [[1, 2], [1, 1], [1, True], [1, 1.0], [{'a': 1}, {'a': 1}], [[1], [True]],
+                             [{'a': 1, 'b': [2]}, {'b': [2.0], 'a': 1}], [{'a': [1]}, {'a': [True]}],
+                             [[], {}, None, False, 0, ''], [True, [True]], [[1, 2], [2, 1]]]),
+    ({'type': 'object', 'properties': {'a': {'type': 'integer'}}, 'required': ['a'],
+      'additionalProperties': False},
+     [{'a': 1}, {}, {'a': 'x'}, {'a': 1, 'b': 2}, []]),
+    ({'patternProperties': {'^x': {'type': 'integer'}}, 'additionalProperties': {'type': 'string'},
+      'minProperties': 1, 'maxProperties': 2},
+     [{'x1': 1, 'y': 'a'}, {'x1': 'a'}, {'y': 1}, {}, {'a': 'a', 'b': 'b', 'c': 'c'}]),
+    ({'allOf': [{'type': 'integer'}, {'minimum': 2}]}, [1, 2, 'a']),
+    ({'anyOf': [{'type': 'integer'}, {'type': 'string'}]}, [1, 'a', None]),
+    ({'oneOf': [{'type': 'integer'}, {'minimum': 2}]}, [1, 2, 2.5, 'a']),
+    ({'not': {'type': 'integer'}}, [1, 'a']),
+    ({'definitions': {'a': {'properties': {'k': {'enum': [1, 'a']}, 'v': {'type': 'string'}}},
+                      'b': {'properties': {'k': {'enum': [True, None]}, 'v': {'type': 'integer'}}}},
+      'oneOf': [{'$ref': '#/definitions/a'}, {'$ref': '#/definitions/b'}]},
+     [{'k': 1, 'v': 'x'}, {'k': 1.0, 'v': 'x'}, {'k': 1, 'v': 1}, {'k': True, 'v': 1}, {'k': None, 'v': 'x'},
+      {'k': 2}, {'k': [1]}, {'v': 'x'}, {'v': None}, 1]),
+    ({'anyOf': [{'properties': {'k': {'enum': ['a']}}, 'required': ['k']},
+                {'properties': {'k': {'enum': ['b']}, 'v': {'type': 'integer'}}}]},
+     [{'k': 'a', 'v': 'x'}, {'k': 'b', 'v': 'x'}, {'k': 'c'}, {'v': 1}, {'v': 'x'}, 'a']),
+]
+
+
+@pytest.mark.parametrize(('schema', 'instances'), SCHEMAS_AND_INSTANCES)
+def test_validator_matches_jsonschema(schema, instances):
+    validator = Validator(schema)
+    reference_validator = jsonschema.Draft4Validator(schema)
+    for instance in instances:
+        expected = reference_validator.is_valid(instance)
+        assert validator.is_valid(instance) == expected, instance
+        assert (not validator.get_errors(instance)) == expected, instance
+
+
+def test_validator_errors():
+    validator = Validator({
+        'type': 'object',
+        'properties': {
+            'a': {'type': 'array', 'items': {'type': 'integer', 'maximum': 3}},
+        },
+        'required': ['a', 'b'],
+    })
+    errors = validator.get_errors({'a': [1, 4, 'x']})
+    assert [(e.path, e.validator, e.message) for e in errors] == [
+        ((), 'required', "'b' is a required property"),
+        (('a', 1), 'maximum', '4 is greater than the maximum of 3'),
+        (('a', 2), 'type', "'x' is not of type 'integer'"),
+    ]
+    with pytest.raises(ValidationError) as e:
+        validator.validate({'a': []})
+    assert e.value.message == "'b' is a required property"
+    validator.validate({'a': [], 'b': None})
+
+
+def test_validator_references():
+    class Tree(Document):
+        class Options(object):
+            id = 'http://example.com/schema/'
+        value = fields.IntField(required=True)
+        children = fields.ArrayField(fields.DocumentField('Tree'))
+
+    validator = Validator(Tree.get_schema())
+    assert validator.is_valid({'value': 1, 'children': [{'value': 2, 'children': []}]})
+    errors = validator.get_errors({'value': 1, 'children': [{'value': 2, 'children': [{}]}]})
+    assert [e.path for e in errors] == [('children', 0, 'children', 0)]
+
+    with pytest.raises(ValueError) as e:
+        Validator({'$ref': '#/definitions/missing'})
+    assert str(e.value) == "Unresolvable reference: '#/definitions/missing'"
+    with pytest.raises(ValueError) as e:
+        Validator({'type': 'list'})
+    assert str(e.value) == "Unknown type: 'list'"
+
+
+def test_discriminator_dispatch():
+    class Circle(Document):
+        kind = fields.StringField(enum=['circle'], required=True)
+        radius = fields.NumberField(minimum=0, required=True)
+
+    class Square(Document):
+        kind = fields.StringField(enum=['square', 'box'], required=True)
+        side = fields.NumberField(minimum=0, required=True)
+
+    class Drawing(Document):
+        shapes = fields.ArrayField(fields.OneOfField([
+            fields.DocumentField(Circle, as_ref=True), fields.DocumentField(Square, as_ref=True),
+        ]))
+
+    schema = Drawing.get_schema()
+    validator = Validator(schema)
+    calls = []
+    for branch, name in zip(schema['properties']['shapes']['items']['oneOf'], ('circle', 'square')):
+        node = validator.compile(validator.resolve(branch['$ref']))
+        node.checks.insert(0, lambda instance, path, errors, name=name: calls.append(name) or True)
+
+    shapes = [{'kind': 'box', 'side': 1}, {'kind': 'circle', 'radius': 1}, {'kind': 'circle', 'side': 1},
+              {'kind': 'triangle'}, {'radius': 1}, 'circle']
+    assert [validator.is_valid({'shapes': [shape]}) for shape in shapes] == [
+        jsonschema.Draft4Validator(schema).is_valid({'shapes': [shape]}) for shape in shapes]
+    # only the shapes without a discriminating value are checked against both documents
+    assert calls == ['square', 'circle', 'circle', 'circle', 'square', 'circle', 'square']
+
+    errors = validator.get_errors({'shapes': [{'kind': 'circle', 'side': 1}]})
+    assert [(e.path, e.validator) for e in errors] == [(('shapes', 0), 'oneOf')]
+
+
+def test_adaptive_branches():
+    schema = {
+        'type': 'object',
+        'properties': {
+            'value': {'anyOf': [{'type': 'integer'}, {'type': 'string'}, {'type': 'null'}]},
+        },
+    }
+    validator = Validator(schema, adaptive_branches=True, reorder_interval=4)
+    assert validator.get_branch_stats() == [
+        {'pointer': '#/properties/value/anyOf', 'calls': 0, 'hits': [0, 0, 0], 'order': [0, 1, 2]}]
+
+    for value in ['a', None, 'b', 1.5]:
+        assert validator.is_valid({'value': value}) == (value != 1.5)
+    assert validator.get_branch_stats() == [
+        {'pointer': '#/properties/value/anyOf', 'calls': 4, 'hits': [0, 2, 1], 'order': [1, 2, 0]}]
+
+    # the order does not change the results
+    reference_validator = jsonschema.Draft4Validator(schema)
+    for value in [1, 'a', None, 1.5, [], 2, 'b', None]:
+        assert validator.is_valid({'value': value}) == reference_validator.is_valid({'value': value})
+        assert (not validator.get_errors({'value': value})) == reference_validator.is_valid({'value': value})
+
+    validator = Validator(schema, adaptive_branches=True, reorder_interval=None)
+    for value in ['a', 'b', None]:
+        validator.is_valid({'value': value})
+    assert validator.get_branch_stats()[0]['hits'] == [0, 2, 1]
+    assert validator.get_branch_stats()[0]['order'] == [0, 1, 2]
+
+    assert Validator(schema).get_branch_stats() == []
+
+
+def test_get_validator_adaptive_branches():
+    class A(Document):
+        value = fields.AnyOfField([fields.IntField(), fields.StringField()])
+
+    validator = A.get_validator(adaptive_branches=True)
+    assert validator is A.get_validator(adaptive_branches=True)
+    assert validator is not A.get_validator()
+    assert not A.get_validator().adaptive_branches
+    assert validator.is_valid({'value': 'a'})
+    assert validator.get_branch_stats()[0]['hits'] == [0, 1]
+
+
+def test_multiple_of_decimal():
+    validator = Validator({'multipleOf': 0.01})
+    assert validator.is_valid(decimal.Decimal('1.23'))
+    assert not validator.is_valid(decimal.Decimal('1.234'))
+    assert not validator.is_valid(decimal.Decimal('NaN'))
+    assert Validator({'multipleOf': 3}).is_valid(decimal.Decimal('3e40'))
+    assert not Validator({'multipleOf': 3}).is_valid(decimal.Decimal('1e40'))
+    validator = Validator({'multipleOf': decimal.Decimal('0.5')})
+    assert validator.is_valid(1.5)
+    assert validator.is_valid(2)
+    assert [e.validator for e in validator.get_errors(1.2)] == ['multipleOf']
+
+
+def test_enum():
+    validator = Validator({'enum': [1, 'a', [1, {'b': True}], {'c': None}]})
+    assert validator.is_valid(1.0)
+    assert validator.is_valid(decimal.Decimal('1'))
+    assert validator.is_valid({'c': None})
+    assert not validator.is_valid(True)
+    assert not validator.is_valid([1, {'b': 1}])
+    # falls back to comparing the values one by one if some are not hashable
+    assert not validator.is_valid(set([1]))
+    assert [e.validator for e in validator.get_errors(set([1]))] == ['enum']
+    assert Validator({'enum': [set([1]), 2]}).is_valid(set([1]))
+    assert not Validator({'enum': [set([1]), 2]}).is_valid(3)
+
+
+def test_json_key():
+    values = [1, 1.0, True, False, 0, None, 'a', [1], [True], [], {}, {'a': 1, 'b': [2]}, {'b': [2.0], 'a': 1},
+              {'a': True}, decimal.Decimal('1')]
+    for value in values:
+        for other_value in values:
+            assert (json_key(value) == json_key(other_value)) == json_equal(value, other_value), (value, other_value)
+
+
+def test_unique_items():
+    validator = Validator({'type': 'array', 'uniqueItems': True})
+    items = [{'id': i, 'tags': ['a', i % 7]} for i in range(20000)]
+    assert validator.is_valid(items)
+    assert not validator.is_valid(items + [{'tags': ['a', 5.0], 'id': 19997}])
+    errors = validator.get_errors([1, 1.0])
+    assert [(e.path, e.validator) for e in errors] == [((), 'uniqueItems')]
+    # falls back to comparing the items pairwise if some are not hashable
+    assert not validator.is_valid([set([1]), set([1])])
+    assert validator.is_valid([set([1]), set([2])])
+
+
+def test_json_equal():
+    assert json_equal(1, 1.0)
+    assert not json_equal(1, True)
+    assert not json_equal(False, 0)
+    assert json_equal({'a': [1, {'b': None}]}, {'a': [1.0, {'b': None}]})
+    assert not json_equal({'a': [1]}, {'a': [True]})
+    assert not json_equal([1], [1, 2])
+
+
+class Event(Document):
+    name = fields.StringField(required=True, min_length=1, max_length=5)
+    count = fields.IntField(minimum=0, maximum=100, multiple_of=5)
+    ratio = fields.NumberField(minimum=0, maximum=1, exclusive_maximum=True)
+    step = fields.NumberField(multiple_of=0.25)
+    tags = fields.ArrayField(fields.StringField(), unique_items=True)
+    kind = fields.StringField(enum=['a', 'b'])
+
+
+EVENTS = [
+    {'name': 'ok', 'count': 5, 'ratio': 0.5, 'step': 0.75, 'tags': ['x'], 'kind': 'a'},
+    {'name': 'ok'},
+    {'count': 5},
+    {'name': ''},
+    {'name': 'toolong'},
+    {'name': 5},
+    {'name': 'ok', 'count': -5},
+    {'name': 'ok', 'count': 105},
+    {'name': 'ok', 'count': 7},
+    {'name': 'ok', 'count': 5.0},
+    {'name': 'ok', 'count': True},
+    {'name': 'ok', 'count': 2 ** 60},
+    {'name': 'ok', 'ratio': 1},
+    {'name': 'ok', 'ratio': 0.99, 'step': 0.3},
+    {'name': 'ok', 'ratio': decimal.Decimal('0.5')},
+    {'name': 'ok', 'tags': ['x', 'x']},
+    {'name': 'ok', 'kind': 'c'},
+    {'name': 'ok', 'extra': 1},
+    [],
+    None,
+]
+
+
+def check_batch_result(document_cls, records):
+    result = document_cls.validate_many(records)
+    validator = document_cls.get_validator()
+    reference_validator = jsonschema.Draft4Validator(document_cls.get_schema())
+    assert len(result) == len(records)
+    for index, record in enumerate(records):
+        expected = reference_validator.is_valid(record)
+        assert result.is_valid(index) == expected, record
+        assert validator.is_valid(record) == expected, record
+    invalid_indexes = [i for i, record in enumerate(records) if not validator.is_valid(record)]
+    assert list(result.iter_invalid_indexes()) == invalid_indexes
+    assert result.invalid_count == len(invalid_indexes)
+    assert [index for index, errors in result.iter_errors() if errors] == invalid_indexes
+    return result
+
+
+def test_validate_many():
+    result = check_batch_result(Event, EVENTS)
+    assert result.get_errors(0) == []
+    assert [e.message for e in result.get_errors(4)] == ["'toolong' is too long"]
+    assert Event.validate_many(iter(EVENTS)).invalid_count == result.invalid_count
+
+
+def test_validate_many_without_numpy(monkeypatch):
+    monkeypatch.setattr(validation, 'numpy', None)
+    result = BatchValidator(Event.get_validator()).validate(EVENTS)
+    assert isinstance(result.mask, bytearray)
+    assert [result.is_valid(i) for i in range(len(EVENTS))] == \
+        [Event.get_validator().is_valid(event) for event in EVENTS]
+
+
+def test_validate_many_with_numpy():
+    numpy = pytest.importorskip('numpy')
+    result = check_batch_result(Event, EVENTS * 3)
+    assert isinstance(result.mask, numpy.ndarray)
+
+
+@pytest.mark.filterwarnings('error')
+def test_validate_many_huge_numbers():
+    pytest.importorskip('numpy')
+
+    class Measure(Document):
+        value = fields.NumberField(multiple_of=0.01)
+        count = fields.IntField(multiple_of=3, minimum=-2 ** 53)
+
+    records = [
+        {'value': 1e308, 'count': 2 ** 53},
+        {'value': -1e308, 'count': -2 ** 53},
+        {'value': 1e-320, 'count': 3},
+        {'value': 2, 'count': 2 ** 53 - 2},
+    ] * 3
+    result = Measure.validate_many(records)
+    validator = Measure.get_validator()
+    assert [result.is_valid(i) for i in range(len(records))] == \
+        [validator.is_valid(record) for record in records]
+
+
+def test_validate_many_non_object_schemas():
+    class Node(Document):
+        value = fields.IntField(minimum=0)
+        next = fields.DocumentField('Node')
+
+    check_batch_result(Node, [{'value': 1, 'next': {'value': -1}}, {'value': 1, 'next': {}}, 1])
+
+    class Either(Document):
+        value = fields.OneOfField([fields.IntField(), fields.StringField()])
+
+        class Options(object):
+            min_properties = 1
+
+    check_batch_result(Either, [{'value': 1}, {'value': None}, {}])